@@ -0,0 +1,2 @@
+# Benchmarks de desempenho do sistema
+# Executar a partir da raiz do projeto, ex.: python -m benchmarks.pose_benchmark
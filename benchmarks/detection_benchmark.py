@@ -0,0 +1,417 @@
+"""
+Benchmark da detecção de marcadores em cenas ArUco sintéticas.
+
+Renderiza sequências 1080p e 4K com N marcadores DICT_ARUCO_ORIGINAL em poses 3D conhecidas,
+projetados com a matriz da câmera configurada (escalada para cada resolução), com desfoque e
+ruído de sensor. Os marcadores se movem suavemente entre os frames, como gatos na cena, para
+que os modos que dependem do histórico (ROI) sejam medidos em condições reais. Para cada modo
+do MarkerDetector mede a vazão, a latência, o recall, os falsos positivos e o erro de posição,
+e gera um relatório em JSON que pode ser comparado com um relatório anterior.
+
+Uso:
+    python -m benchmarks.detection_benchmark [--resolutions 1080p,4k] [--modes full,roi_pyramid]
+        [--markers 8] [--frames 60] [--blur 1.0] [--noise 4.0] [--json] [--output relatorio.json]
+        [--baseline relatorio_anterior.json] [--tolerance 0.2]
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import contextlib
+
+import cv2
+import numpy as np
+
+from config.config import Config
+from src.core.marker_detector import MarkerDetector
+from src.core.pose_estimation import PoseEstimator
+from src.core.zone_registry import ZoneRegistry
+
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160)
+}
+
+# Modos do MarkerDetector comparados (configurações aplicadas sobre a Config)
+MODES = {
+    "full": dict(DETECTION_MODE="full", PYRAMID_ENABLED=False, TILED_DETECTION_ENABLED=False),
+    "full_pyramid": dict(DETECTION_MODE="full", PYRAMID_ENABLED=True, TILED_DETECTION_ENABLED=False),
+    "roi": dict(DETECTION_MODE="roi", PYRAMID_ENABLED=False, TILED_DETECTION_ENABLED=False),
+    "roi_pyramid": dict(DETECTION_MODE="roi", PYRAMID_ENABLED=True, TILED_DETECTION_ENABLED=False),
+    "tiled": dict(DETECTION_MODE="full", PYRAMID_ENABLED=False, TILED_DETECTION_ENABLED=True, TILE_MIN_FRAME_WIDTH=0)
+}
+
+# Filtros que reaproveitam ou suavizam resultados anteriores ficam desligados: cada frame é
+# medido pela detecção e pela pose do próprio frame
+BASE_OVERRIDES = dict(
+    MOTION_GATE_ENABLED=False,
+    POSE_FILTER_ENABLED=False,
+    BOWL_CACHE_ENABLED=False,
+    DEBUG_SHOW_TEST_MARKER=False,
+    SHOW_MARKER_VISUALIZATION=False
+)
+
+MARKER_IMAGE_PX = 210  # 7 módulos de 30 px (5x5 bits + borda preta)
+QUIET_ZONE_PX = 30  # Borda branca de um módulo em volta do marcador
+
+
+def parse_resolution(name):
+    """'1080p', '4k' ou 'LARGURAxALTURA'"""
+    key = name.strip().lower()
+    if key in RESOLUTIONS:
+        return key, RESOLUTIONS[key]
+    try:
+        width, height = (int(value) for value in key.split("x"))
+    except ValueError:
+        raise ValueError(f"Resolução inválida: {name} (use {', '.join(RESOLUTIONS)} ou LARGURAxALTURA)")
+    return key, (width, height)
+
+
+def scaled_camera_matrix(camera_matrix, width, height):
+    """
+    Adapta a matriz da câmera configurada à resolução do frame
+
+    O centro óptico configurado indica a resolução para a qual a matriz foi calibrada; a
+    distância focal e o centro são escalados na mesma proporção.
+    """
+    matrix = np.array(camera_matrix, dtype=np.float64)
+    scale_x = width / (2.0 * matrix[0, 2])
+    scale_y = height / (2.0 * matrix[1, 2])
+    matrix[0, :] *= scale_x
+    matrix[1, :] *= scale_y
+    return matrix
+
+
+class SyntheticArucoScene:
+    """
+    Sequência sintética com marcadores ArUco em poses 3D conhecidas
+
+    Cada marcador ocupa uma célula de uma grade sobre o frame (não se sobrepõem) e oscila em
+    posição e inclinação ao redor de uma pose base sorteada. O frame é renderizado em escala de
+    cinza sobre um fundo texturizado, desfocado (desfoque gaussiano, sigma em pixels de um frame
+    1080p) e com ruído gaussiano de sensor, e entregue em BGR como o de uma câmera.
+    """
+
+    def __init__(self, width, height, camera_matrix, dist_coeffs, marker_ids, marker_size=0.02,
+                 distance=(0.25, 1.0), blur=1.0, noise=4.0, fps=25.0, seed=0):
+        self.width = width
+        self.height = height
+        self.camera_matrix = scaled_camera_matrix(camera_matrix, width, height)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.marker_ids = [int(marker_id) for marker_id in marker_ids]
+        self.marker_size = marker_size
+        self.fps = fps
+        self.blur_sigma = blur * width / 1920.0
+        rng = np.random.default_rng(seed)
+
+        aruco_dict = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_ARUCO_ORIGINAL)
+        self._images = {
+            marker_id: cv2.copyMakeBorder(
+                cv2.aruco.generateImageMarker(aruco_dict, marker_id, MARKER_IMAGE_PX),
+                QUIET_ZONE_PX, QUIET_ZONE_PX, QUIET_ZONE_PX, QUIET_ZONE_PX, cv2.BORDER_CONSTANT, value=255
+            )
+            for marker_id in self.marker_ids
+        }
+        side = MARKER_IMAGE_PX + 2 * QUIET_ZONE_PX
+        # Cantos da imagem (centros dos pixels das bordas) na ordem dos cantos do ArUco
+        self._image_corners = np.array([[-0.5, -0.5], [side - 0.5, -0.5], [side - 0.5, side - 0.5], [-0.5, side - 0.5]],
+                                       dtype=np.float32)
+        estimator = PoseEstimator(self.camera_matrix, self.dist_coeffs)
+        self._marker_points = estimator.object_points(marker_size)
+        self._quiet_points = estimator.object_points(marker_size * side / MARKER_IMAGE_PX)
+
+        # Fundo com manchas suaves e textura fina (o detector não deve achar marcadores nele)
+        blobs = rng.integers(40, 215, (height // 48 + 2, width // 48 + 2)).astype(np.uint8)
+        background = cv2.resize(blobs, (width, height), interpolation=cv2.INTER_CUBIC)
+        texture = rng.normal(0, 6, (height, width))
+        self._background = np.clip(background + texture, 0, 255).astype(np.uint8)
+
+        # Ruído de sensor pré-sorteado, alternado entre os frames
+        self._noise = [rng.normal(0, noise, (height, width)).astype(np.int16) for _ in range(3)] if noise > 0 else []
+
+        self._motions = self._place_markers(rng, distance)
+
+    def _place_markers(self, rng, distance):
+        """Sorteia a pose base e o movimento de cada marcador dentro da sua célula da grade"""
+        count = len(self.marker_ids)
+        cols = max(1, math.ceil(math.sqrt(count * self.width / self.height)))
+        rows = max(1, math.ceil(count / cols))
+        cell_w, cell_h = self.width / cols, self.height / rows
+        fx, fy = self.camera_matrix[0, 0], self.camera_matrix[1, 1]
+        cx, cy = self.camera_matrix[0, 2], self.camera_matrix[1, 2]
+        quiet_side = self.marker_size * (MARKER_IMAGE_PX + 2 * QUIET_ZONE_PX) / MARKER_IMAGE_PX
+
+        motions = []
+        for slot in range(count):
+            u = (slot % cols + 0.5) * cell_w
+            v = (slot // cols + 0.5) * cell_h
+            # Perto o suficiente para o tamanho sorteado, longe o suficiente para caber na célula
+            min_z = 1.6 * fx * quiet_side / (0.5 * min(cell_w, cell_h))
+            z = max(rng.uniform(*distance), min_z)
+            amplitude_px = 0.12 * min(cell_w, cell_h)
+            motions.append({
+                "center": np.array([(u - cx) * z / fx, (v - cy) * z / fy, z]),
+                "amplitude": np.array([amplitude_px * z / fx, amplitude_px * z / fy, 0.1 * z]),
+                # Voltado para a câmera com inclinação de até ~35°
+                "tilt": rng.uniform(-0.6, 0.6, 3),
+                "phase": rng.uniform(0, 2 * np.pi, 3),
+                "period": rng.uniform(3.0, 6.0) * self.fps
+            })
+        return motions
+
+    def pose(self, slot, frame_index):
+        """Pose (rvec, tvec) do marcador `slot` no frame `frame_index`"""
+        motion = self._motions[slot]
+        angle = 2 * np.pi * frame_index / motion["period"] + motion["phase"]
+        tvec = motion["center"] + motion["amplitude"] * np.sin(angle)
+        rvec = np.array([np.pi, 0.0, 0.0]) + motion["tilt"] + 0.15 * np.sin(angle[::-1])
+        return rvec, tvec
+
+    def render(self, frame_index):
+        """
+        Renderiza um frame
+
+        Returns:
+            (frame BGR somente leitura, {id: {"tvec", "rvec", "corners"}} dos marcadores visíveis)
+        """
+        canvas = self._background.astype(np.float32)
+        truth = {}
+        for slot, marker_id in enumerate(self.marker_ids):
+            rvec, tvec = self.pose(slot, frame_index)
+            quiet, _ = cv2.projectPoints(self._quiet_points, rvec, tvec, self.camera_matrix, self.dist_coeffs)
+            quiet = quiet.reshape(4, 2)
+            if (quiet < 0).any() or (quiet[:, 0] > self.width - 1).any() or (quiet[:, 1] > self.height - 1).any():
+                continue
+
+            x0, y0 = np.floor(quiet.min(axis=0)).astype(int)
+            x1, y1 = np.ceil(quiet.max(axis=0)).astype(int) + 1
+            x1, y1 = min(x1, self.width), min(y1, self.height)
+            homography = cv2.getPerspectiveTransform(self._image_corners, (quiet - [x0, y0]).astype(np.float32))
+            size = (x1 - x0, y1 - y0)
+            image = self._images[marker_id]
+            warped = cv2.warpPerspective(image, homography, size, flags=cv2.INTER_AREA).astype(np.float32)
+            coverage = cv2.warpPerspective(np.ones_like(image, dtype=np.float32), homography, size, flags=cv2.INTER_LINEAR)
+            roi = canvas[y0:y1, x0:x1]
+            roi += coverage * (warped - roi)
+
+            corners, _ = cv2.projectPoints(self._marker_points, rvec, tvec, self.camera_matrix, self.dist_coeffs)
+            truth[marker_id] = {"rvec": rvec, "tvec": tvec, "corners": corners.reshape(4, 2)}
+
+        if self.blur_sigma > 0:
+            canvas = cv2.GaussianBlur(canvas, (0, 0), self.blur_sigma)
+        if self._noise:
+            canvas += self._noise[frame_index % len(self._noise)]
+        gray = np.clip(canvas, 0, 255).astype(np.uint8)
+        frame = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        # Somente leitura: o detector não desenha no frame compartilhado pelos modos
+        frame.flags.writeable = False
+        return frame, truth
+
+
+def benchmark_config(camera_matrix, width, height, marker_size, mode_overrides):
+    """Config de produção com os ajustes do modo e a câmera da cena"""
+    config = Config()
+    for key, value in dict(BASE_OVERRIDES, **mode_overrides).items():
+        setattr(config, key, value)
+    config.CAMERA_WIDTH, config.CAMERA_HEIGHT = width, height
+    config.camera_matrix = camera_matrix.astype(np.float32)
+    config.DEFAULT_MARKER_SIZE = marker_size
+    return config
+
+
+def summarize(latencies, matched, visible, false_positives, errors_mm, detection_stats):
+    latencies_ms = np.array(latencies) * 1000
+    total_seconds = float(np.sum(latencies))
+    return {
+        "frames": len(latencies),
+        "fps": len(latencies) / total_seconds if total_seconds > 0 else None,
+        "latency_ms_mean": float(latencies_ms.mean()),
+        "latency_ms_p50": float(np.percentile(latencies_ms, 50)),
+        "latency_ms_p95": float(np.percentile(latencies_ms, 95)),
+        "latency_ms_max": float(latencies_ms.max()),
+        "markers_visible": visible,
+        "markers_detected": matched,
+        "recall": matched / visible if visible else None,
+        "false_positives": false_positives,
+        "translation_error_mm_mean": float(np.mean(errors_mm)) if errors_mm else None,
+        "translation_error_mm_p95": float(np.percentile(errors_mm, 95)) if errors_mm else None,
+        "detection_stats": detection_stats
+    }
+
+
+def run_resolution(config, resolution, width, height, modes, num_markers, num_frames, warmup,
+                   marker_size, distance, blur, noise, seed):
+    """Mede todos os modos sobre a mesma sequência (cada frame é renderizado uma vez)"""
+    zone_ids = set(ZoneRegistry(config).ids())
+    marker_ids = [marker_id for marker_id in range(1, 1024) if marker_id not in zone_ids][:num_markers]
+    scene = SyntheticArucoScene(width, height, config.camera_matrix, config.dist_coeffs, marker_ids,
+                                marker_size, distance, blur, noise, seed=seed)
+
+    # Um detector por modo: cada um mantém o seu histórico (ROI, escala da pirâmide)
+    detectors = {
+        mode: MarkerDetector(benchmark_config(scene.camera_matrix, width, height, marker_size, MODES[mode]))
+        for mode in modes
+    }
+    measures = {mode: {"latencies": [], "matched": 0, "visible": 0, "false_positives": 0, "errors_mm": []}
+                for mode in modes}
+    try:
+        for frame_index in range(warmup + num_frames):
+            frame, truth = scene.render(frame_index)
+            for mode, detector in detectors.items():
+                # O detector anuncia cada gato novo com print(): mantém o stdout só para o relatório
+                with contextlib.redirect_stdout(sys.stderr):
+                    start = time.perf_counter()
+                    posicoes = detector.detect_markers(frame)
+                    elapsed = time.perf_counter() - start
+                if frame_index < warmup:
+                    continue
+
+                measure = measures[mode]
+                measure["latencies"].append(elapsed)
+                measure["visible"] += len(truth)
+                for key, dados in posicoes.items():
+                    expected = truth.get(dados.get("id"))
+                    if expected is None:
+                        measure["false_positives"] += 1
+                        continue
+                    measure["matched"] += 1
+                    measure["errors_mm"].append(float(np.linalg.norm(np.ravel(dados["pos"]) - expected["tvec"]) * 1000))
+
+        return [
+            dict(
+                resolution=resolution, width=width, height=height, mode=mode,
+                **summarize(measure["latencies"], measure["matched"], measure["visible"],
+                            measure["false_positives"], measure["errors_mm"], detectors[mode].get_detection_stats())
+            )
+            for mode, measure in measures.items()
+        ]
+    finally:
+        for detector in detectors.values():
+            detector.close()
+
+
+def run(resolutions=("1080p", "4k"), modes=tuple(MODES), num_markers=8, num_frames=60, warmup=5,
+        marker_size=0.02, distance=(0.25, 1.0), blur=1.0, noise=4.0, seed=0):
+    """Executa o benchmark e retorna o relatório (dicionário serializável em JSON)"""
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        raise ValueError(f"Modos desconhecidos: {unknown} (disponíveis: {', '.join(MODES)})")
+
+    config = Config()
+    results = []
+    for name in resolutions:
+        resolution, (width, height) = parse_resolution(name)
+        results.extend(run_resolution(config, resolution, width, height, modes, num_markers, num_frames, warmup,
+                                      marker_size, distance, blur, noise, seed))
+
+    return {
+        "benchmark": "detection",
+        "version": 1,
+        "environment": {
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "parameters": {
+            "markers_per_frame": num_markers,
+            "frames": num_frames,
+            "warmup_frames": warmup,
+            "marker_size_m": marker_size,
+            "distance_m": list(distance),
+            "blur_px_1080p": blur,
+            "noise_std": noise,
+            "seed": seed
+        },
+        "results": results
+    }
+
+
+def compare(report, baseline, tolerance=0.2, recall_tolerance=0.02):
+    """
+    Compara o relatório com um anterior
+
+    Returns:
+        list: Descrição de cada regressão (FPS menor que (1 - tolerance) vezes o anterior ou
+            recall menor que o anterior menos recall_tolerance)
+    """
+    previous = {(r["resolution"], r["mode"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get((result["resolution"], result["mode"]))
+        if old is None:
+            continue
+        label = f"{result['resolution']}/{result['mode']}"
+        if old.get("fps") and result["fps"] is not None and result["fps"] < old["fps"] * (1 - tolerance):
+            regressions.append(f"{label}: FPS {result['fps']:.1f} < {old['fps']:.1f}")
+        if old.get("recall") is not None and result["recall"] is not None \
+                and result["recall"] < old["recall"] - recall_tolerance:
+            regressions.append(f"{label}: recall {result['recall']:.3f} < {old['recall']:.3f}")
+    return regressions
+
+
+def _format(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da detecção de marcadores em cenas sintéticas")
+    parser.add_argument("--resolutions", default="1080p,4k", help="Resoluções (1080p, 4k, 720p ou LARGURAxALTURA)")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Modos do detector ({', '.join(MODES)})")
+    parser.add_argument("--markers", type=int, default=8, help="Marcadores por frame")
+    parser.add_argument("--frames", type=int, default=60, help="Frames medidos por resolução")
+    parser.add_argument("--warmup", type=int, default=5, help="Frames iniciais fora da medição")
+    parser.add_argument("--marker-size", type=float, default=0.02, help="Tamanho do marcador (metros)")
+    parser.add_argument("--min-distance", type=float, default=0.25, help="Menor distância até a câmera (metros)")
+    parser.add_argument("--max-distance", type=float, default=1.0, help="Maior distância até a câmera (metros)")
+    parser.add_argument("--blur", type=float, default=1.0, help="Desfoque gaussiano (sigma em pixels de um frame 1080p)")
+    parser.add_argument("--noise", type=float, default=4.0, help="Ruído gaussiano de sensor (níveis de cinza)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente da cena")
+    parser.add_argument("--json", action="store_true", help="Imprime o relatório em JSON")
+    parser.add_argument("--output", help="Grava o relatório em JSON neste arquivo")
+    parser.add_argument("--baseline", help="Relatório anterior para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Queda relativa de FPS tolerada")
+    parser.add_argument("--recall-tolerance", type=float, default=0.02, help="Queda absoluta de recall tolerada")
+    args = parser.parse_args(argv)
+
+    report = run(
+        [name for name in args.resolutions.split(",") if name],
+        [mode for mode in args.modes.split(",") if mode],
+        args.markers, args.frames, args.warmup, args.marker_size,
+        (args.min_distance, args.max_distance), args.blur, args.noise, args.seed
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        params = report["parameters"]
+        print(f"{params['markers_per_frame']} marcadores/frame, {params['frames']} frames, desfoque {params['blur_px_1080p']} px, ruído {params['noise_std']}")
+        print(f"{'resolução':<10} {'modo':<13} {'FPS':>7} {'ms p50':>8} {'ms p95':>8} {'recall':>7} {'falsos':>7} {'erro t (mm)':>12} {'p95 t':>8}")
+        for r in report["results"]:
+            print(
+                f"{r['resolution']:<10} {r['mode']:<13} {_format(r['fps'], '>7.1f')} {r['latency_ms_p50']:>8.2f} "
+                f"{r['latency_ms_p95']:>8.2f} {_format(r['recall'], '>7.3f')} {r['false_positives']:>7} "
+                f"{_format(r['translation_error_mm_mean'], '>12.2f')} {_format(r['translation_error_mm_p95'], '>8.2f')}"
+            )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.recall_tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
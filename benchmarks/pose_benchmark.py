@@ -0,0 +1,128 @@
+"""
+Benchmark de precisão e latência dos métodos de estimativa de pose.
+
+Gera poses conhecidas de marcadores, projeta os cantos com a matriz da câmera
+configurada, adiciona ruído e compara os métodos do PoseEstimator.
+
+Uso:
+    python -m benchmarks.pose_benchmark [--markers 12] [--frames 200] [--noise 0.3] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from config.config import Config
+from src.core.pose_estimation import PoseEstimator
+
+
+def generate_scene(config, num_markers, marker_size, rng):
+    """Gera poses aleatórias visíveis e os cantos projetados de cada marcador"""
+    width, height = config.CAMERA_WIDTH, config.CAMERA_HEIGHT
+    fx, fy = config.camera_matrix[0, 0], config.camera_matrix[1, 1]
+    cx, cy = config.camera_matrix[0, 2], config.camera_matrix[1, 2]
+
+    obj_pts = PoseEstimator(config.camera_matrix, config.dist_coeffs).object_points(marker_size)
+    rvecs, tvecs, corners = [], [], []
+    while len(corners) < num_markers:
+        z = rng.uniform(0.3, 1.5)
+        u, v = rng.uniform(0.1 * width, 0.9 * width), rng.uniform(0.1 * height, 0.9 * height)
+        tvec = np.array([(u - cx) * z / fx, (v - cy) * z / fy, z])
+        # Marcador voltado para a câmera com inclinação de até ~40°
+        rvec = np.array([np.pi, 0.0, 0.0]) + rng.uniform(-0.7, 0.7, 3)
+
+        img_pts, _ = cv2.projectPoints(obj_pts, rvec, tvec, config.camera_matrix, config.dist_coeffs)
+        img_pts = img_pts.reshape(4, 2)
+        if (img_pts < 0).any() or (img_pts[:, 0] >= width).any() or (img_pts[:, 1] >= height).any():
+            continue
+
+        rvecs.append(rvec)
+        tvecs.append(tvec)
+        corners.append(img_pts.reshape(1, 4, 2).astype(np.float32))
+    return np.array(rvecs), np.array(tvecs), corners
+
+
+def rotation_error_deg(rvec_true, rvec_est):
+    R_true = cv2.Rodrigues(rvec_true)[0]
+    R_est = cv2.Rodrigues(np.asarray(rvec_est, dtype=np.float64))[0]
+    cos_angle = np.clip((np.trace(R_true.T @ R_est) - 1) / 2, -1.0, 1.0)
+    return float(np.degrees(np.arccos(cos_angle)))
+
+
+def run(num_markers=12, num_frames=200, noise_px=0.3, marker_size=0.02, seed=0):
+    config = Config()
+    rng = np.random.default_rng(seed)
+    scenes = []
+    for _ in range(num_frames):
+        rvecs, tvecs, corners = generate_scene(config, num_markers, marker_size, rng)
+        noisy = [c + rng.normal(0, noise_px, c.shape).astype(np.float32) for c in corners]
+        scenes.append((rvecs, tvecs, noisy))
+
+    results = {}
+    for method in PoseEstimator.METHODS:
+        estimator = PoseEstimator(config.camera_matrix, config.dist_coeffs, method)
+        sizes = [marker_size] * num_markers
+        translation_errors, rotation_errors, failures = [], [], 0
+
+        start = time.perf_counter()
+        estimates = [estimator.estimate(corners, sizes) for _, _, corners in scenes]
+        elapsed = time.perf_counter() - start
+
+        for (rvecs, tvecs, _), poses in zip(scenes, estimates):
+            for rvec_true, tvec_true, (rvec, tvec) in zip(rvecs, tvecs, poses):
+                if tvec is None:
+                    failures += 1
+                    continue
+                translation_errors.append(np.linalg.norm(tvec.ravel() - tvec_true) * 1000)
+                rotation_errors.append(rotation_error_deg(rvec_true, rvec))
+
+        results[method] = {
+            "frame_latency_ms": elapsed / num_frames * 1000,
+            "marker_latency_us": elapsed / (num_frames * num_markers) * 1e6,
+            "translation_error_mm_mean": float(np.mean(translation_errors)),
+            "translation_error_mm_p95": float(np.percentile(translation_errors, 95)),
+            "rotation_error_deg_mean": float(np.mean(rotation_errors)),
+            "rotation_error_deg_p95": float(np.percentile(rotation_errors, 95)),
+            "failures": failures
+        }
+
+    return {
+        "markers_per_frame": num_markers,
+        "frames": num_frames,
+        "noise_px": noise_px,
+        "marker_size_m": marker_size,
+        "methods": results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos métodos de estimativa de pose")
+    parser.add_argument("--markers", type=int, default=12, help="Marcadores por frame")
+    parser.add_argument("--frames", type=int, default=200, help="Quantidade de frames")
+    parser.add_argument("--noise", type=float, default=0.3, help="Ruído gaussiano nos cantos (pixels)")
+    parser.add_argument("--marker-size", type=float, default=0.02, help="Tamanho do marcador (metros)")
+    parser.add_argument("--json", action="store_true", help="Imprime o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.markers, args.frames, args.noise, args.marker_size)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"{report['markers_per_frame']} marcadores/frame, {report['frames']} frames, ruído {report['noise_px']} px")
+    print(f"{'método':<12} {'ms/frame':>9} {'us/marcador':>12} {'erro t (mm)':>12} {'p95 t':>8} {'erro R (°)':>11} {'p95 R':>7} {'falhas':>7}")
+    for method, r in report["methods"].items():
+        print(
+            f"{method:<12} {r['frame_latency_ms']:>9.3f} {r['marker_latency_us']:>12.1f} "
+            f"{r['translation_error_mm_mean']:>12.2f} {r['translation_error_mm_p95']:>8.2f} "
+            f"{r['rotation_error_deg_mean']:>11.2f} {r['rotation_error_deg_p95']:>7.2f} {r['failures']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import numpy as np
 import os
+import json
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -15,10 +16,51 @@ class Config:
         self.API_TIMEOUT = 10  # Timeout em segundos
         self.API_ENABLED = True  # Flag para habilitar/desabilitar envio para API
 
+        # Cliente assíncrono (aiohttp) com pool de conexões keep-alive em um único loop asyncio
+        self.API_ASYNC_ENABLED = False
+        self.API_MAX_CONNECTIONS = 8  # Tamanho máximo do pool de conexões
+        self.API_MAX_CONCURRENCY = 4  # Requisições simultâneas
+
+        # Disjuntor (circuit breaker) da API: com a API fora do ar, as requisições falham na hora
+        # e os eventos ficam na fila local em vez de esperar API_TIMEOUT cada um
+        self.API_BREAKER_ENABLED = True
+        self.API_BREAKER_FAILURE_RATE = 0.5  # Fração de falhas na janela que abre o circuito
+        self.API_BREAKER_LATENCY_THRESHOLD = 5.0  # Latência (segundos) do percentil que abre o circuito (None = ignora)
+        self.API_BREAKER_LATENCY_PERCENTILE = 95.0
+        self.API_BREAKER_WINDOW = 20  # Requisições recentes consideradas
+        self.API_BREAKER_MIN_REQUESTS = 5  # Requisições mínimas na janela antes de avaliar
+        self.API_BREAKER_OPEN_SECONDS = 30.0  # Tempo aberto antes das requisições de teste
+        self.API_BREAKER_HALF_OPEN_CALLS = 1  # Requisições de teste simultâneas
+
+        # Fila durável de eventos de atividade (SQLite): sobrevive a quedas da API e reinícios
+        self.OUTBOX_ENABLED = True
+        self.OUTBOX_PATH = os.getenv("OUTBOX_PATH", "data/activity_outbox.db")
+        self.OUTBOX_BACKOFF_BASE = 1.0  # Espera inicial entre tentativas (segundos)
+        self.OUTBOX_BACKOFF_MAX = 300.0  # Espera máxima entre tentativas (segundos)
+        self.OUTBOX_MAX_ATTEMPTS = 100  # Tentativas antes de descartar um evento (None = nunca)
+        self.OUTBOX_DRAIN_TIMEOUT = 5.0  # Tempo para esvaziar a fila ao finalizar o sistema
+
+        # Envio em lote (POST /activities/bulk): requer suporte no backend
+        self.API_BULK_ENABLED = False
+        self.OUTBOX_BATCH_MAX_SIZE = 50  # Eventos por requisição
+        self.OUTBOX_BATCH_MAX_AGE = 2.0  # Tempo máximo (segundos) que um evento espera o lote
+
         # Configurações do Streaming via FastAPI
         self.STREAMING_ENABLED = True
         self.STREAMING_PORT = 8000
         self.STREAMING_HOST = "0.0.0.0"
+        self.STREAMING_JPEG_QUALITY = 75
+        self.STREAMING_MAX_FPS = 20.0  # Frames codificados por segundo (uma única vez para todos os clientes)
+        self.STREAMING_MAX_VARIANTS = 8  # Versões (largura/qualidade/FPS) do stream simultâneas
+        self.STREAMING_VARIANT_TTL = 30.0  # Tempo (segundos) que uma versão sem clientes fica em cache
+        # Servidor de streaming (HTTP e codificação JPEG) em um processo separado, recebendo os
+        # frames por memória compartilhada: não disputa o GIL com a detecção
+        self.STREAMING_SEPARATE_PROCESS = True
+        self.STREAMING_SHM_SLOTS = 4  # Slots do buffer compartilhado de cada câmera
+        # Histogramas de latência por etapa (captura, detecção, rastreamento, desenho, JPEG, API)
+        # expostos em /metrics no formato do Prometheus; desabilitado, cada ponto de medição
+        # custa apenas uma chamada que não faz nada
+        self.METRICS_ENABLED = True
 
         # Mapeamento de tipos de atividade (opcional)
         self.DISPLAY_INFO_ENABLED = False
@@ -38,12 +80,42 @@ class Config:
 
         # URL da câmera RTSP
         self.RTSP_URL = os.getenv("CAMERA_URL")
+
+        # ID da câmera enviado nas atividades (cameraId)
+        self.CAMERA_ID = int(os.getenv("CAMERA_ID", 1))
+
+        # Várias câmeras: cada uma roda captura, detecção e rastreamento em um processo próprio,
+        # supervisionado e reiniciado em caso de falha. Lista de dicionários com "id", "url" e,
+        # opcionalmente, configurações próprias da câmera em maiúsculas, por exemplo:
+        # [{"id": 1, "url": "rtsp://..."}, {"id": 2, "url": "rtsp://...", "CAMERA_WIDTH": 1280}]
+        # Vazia = modo de uma câmera. Pode ser carregada de um arquivo JSON (CAMERAS_FILE)
+        self.CAMERAS = self._load_cameras(os.getenv("CAMERAS_FILE"))
+        self.CAMERA_WORKER_RESTART_DELAY = 2.0  # Espera inicial antes de reiniciar um processo de câmera
+        self.CAMERA_WORKER_RESTART_MAX_DELAY = 60.0  # Espera máxima entre reinícios (dobra a cada falha)
+        self.CAMERA_WORKER_FRAME_QUEUE_SIZE = 2  # Frames por câmera aguardando o streaming (descarta os novos)
+        self.CAMERA_WORKER_START_METHOD = "spawn"  # Método de criação dos processos (multiprocessing)
+
+        # Fonte de frames: "rtsp" (câmera), "video" (arquivo gravado), "images" (diretório) ou "synthetic"
+        self.FRAME_SOURCE = os.getenv("FRAME_SOURCE", "rtsp")
+        self.FRAME_SOURCE_PATH = os.getenv("FRAME_SOURCE_PATH")  # Arquivo de vídeo ou diretório de imagens
+        self.FRAME_SOURCE_REALTIME = True  # Se False, replays rodam o mais rápido possível
+        self.FRAME_SOURCE_LOOP = False  # Reinicia o replay ao chegar no fim
+        self.FRAME_SOURCE_FPS = 25.0  # FPS de imagens e frames sintéticos
+        self.FRAME_SOURCE_NUM_FRAMES = None  # Quantidade de frames sintéticos (None = infinito)
+
+        # Inicialização rápida: o teste de conexão com a API roda em segundo plano e o loop
+        # principal começa sem esperar câmera, API ou servidor de streaming
+        self.FAST_STARTUP = True
         
         # Configurações da câmera
         self.CAMERA_WIDTH = 1920
         self.CAMERA_HEIGHT = 1080
         self.CAMERA_BUFFER_SIZE = 1
         self.CAMERA_MAX_DISCARD_FRAMES = 3  # Maximum number of frames to discard in capture loop
+        self.CAMERA_DECODE_ON_DEMAND = True  # Usa grab()/retrieve() para decodificar apenas o frame publicado
+        self.CAMERA_FRAME_RING_SLOTS = 4  # Slots pré-alocados do buffer circular de frames
+        self.CAMERA_CONNECT_RETRIES = 5  # Tentativas de conexão antes de desistir
+        self.CAMERA_CONNECT_RETRY_DELAY = 5.0  # Espera (segundos) entre tentativas, sem bloquear o loop
 
         # Quantidade de frames capturados para resetar a conexão da câmera
         self.CAMERA_RESET_FRAME_COUNT = 300
@@ -61,6 +133,21 @@ class Config:
             "size": 0.02
         }
 
+        # Zonas monitoradas por ID do marcador. O tipo da zona ("zona") define a atividade registrada;
+        # enter_thresh/exit_thresh opcionais sobrescrevem os thresholds globais
+        self.ZONES = {
+            self.POTE_RACAO_ID: dict(self.POTE_RACAO, zona="food"),
+            # 1: {"nome": "Bebedouro", "zona": "water", "size": 0.02},
+            # 2: {"nome": "Cama", "zona": "bed", "size": 0.02, "enter_thresh": 0.40, "exit_thresh": 0.50},
+        }
+
+        # Atividade registrada para cada tipo de zona
+        self.ZONE_ACTIVITY_TYPES = {
+            "food": "eating",
+            "water": "drinking",
+            "bed": "sleeping"
+        }
+
         # Tamanho padrão para marcadores de gatos detectados automaticamente
         self.DEFAULT_MARKER_SIZE = 0.02
 
@@ -70,6 +157,50 @@ class Config:
         self.BOWL_CACHE_MAX_AGE = 300.0  # Tempo máximo em segundos para usar posição em cache
         self.BOWL_CACHE_CONFIDENCE_THRESHOLD = 5  # Número mínimo de detecções para considerar posição confiável
 
+        # Filtro de movimento: pula a detecção ArUco enquanto a cena estiver parada
+        self.MOTION_GATE_ENABLED = True
+        self.MOTION_GATE_SIZE = (64, 36)  # Miniatura (largura, altura) usada na comparação
+        self.MOTION_GATE_PIXEL_THRESHOLD = 10  # Diferença de intensidade para considerar um pixel alterado
+        self.MOTION_GATE_CHANGED_RATIO = 0.002  # Fração de pixels alterados que indica movimento
+        self.MOTION_GATE_MAX_SKIP_SECONDS = 2.0  # Força uma detecção completa após este intervalo
+
+        # Modo de detecção dos marcadores: "full" (frame inteiro) ou "roi" (regiões ao redor dos marcadores já vistos)
+        self.DETECTION_MODE = "full"
+        self.ROI_FULL_SCAN_INTERVAL = 10  # Varredura completa a cada N frames para encontrar novos gatos
+        self.ROI_PADDING_RATIO = 1.0  # Margem da região em relação ao tamanho do marcador
+        self.ROI_PADDING_MIN_PX = 16  # Margem mínima da região em pixels
+
+        # Varreduras completas em pirâmide: detecção na imagem reduzida + refinamento sub-pixel em resolução cheia
+        self.PYRAMID_ENABLED = False
+        self.PYRAMID_SCALE = 0.5  # Escala inicial da imagem reduzida
+        self.PYRAMID_AUTO_SCALE = True  # Ajusta a escala pelo tamanho dos marcadores observados
+        self.PYRAMID_TARGET_MARKER_PX = 40  # Lado desejado do menor marcador na imagem reduzida
+        self.PYRAMID_MIN_SCALE = 0.25  # Menor escala permitida
+        self.PYRAMID_FULL_RES_INTERVAL = 50  # Varredura em resolução cheia a cada N varreduras completas (e sempre que um marcador rastreado some da imagem reduzida)
+
+        # Detecção em blocos sobrepostos em paralelo (útil para câmeras 4K)
+        self.TILED_DETECTION_ENABLED = False
+        self.TILE_GRID = (2, 2)  # Blocos (colunas, linhas)
+        self.TILE_OVERLAP_PX = 160  # Sobreposição entre blocos; deve ser maior que o maior marcador em pixels
+        self.TILE_WORKERS = None  # Threads do pool (None = número de CPUs)
+        self.TILE_MIN_FRAME_WIDTH = 2560  # Só divide frames com pelo menos esta largura (resolução cheia, mesmo com a pirâmide)
+
+        # Solver de pose: "ippe_square" (específico para marcadores quadrados), "homography" (lote em NumPy) ou "iterative"
+        self.POSE_METHOD = "ippe_square"
+
+        # Filtro de Kalman por marcador (velocidade constante): suaviza as poses e prevê os gatos
+        # entre detecções, permitindo taxas de detecção menores sem oscilar o estado das atividades
+        self.POSE_FILTER_ENABLED = True
+        self.POSE_FILTER_PROCESS_NOISE = 0.5  # Desvio padrão da aceleração dos gatos (m/s²)
+        self.POSE_FILTER_ZONE_PROCESS_NOISE = 0.005  # Zonas são fixas: ruído de processo quase nulo
+        self.POSE_FILTER_MEASUREMENT_NOISE = 0.01  # Desvio padrão da posição medida (m)
+        self.POSE_FILTER_MAX_PREDICT_SECONDS = 1.0  # Tempo máximo prevendo um gato não detectado
+        self.POSE_FILTER_MAX_POSITION_STD = 0.10  # Incerteza máxima (m) para manter a previsão
+
+        # Pipeline do loop principal (detecção -> rastreamento -> renderização/streaming)
+        self.PIPELINE_TRACK_QUEUE_SIZE = 64  # Frames aguardando o rastreador (nunca descartados)
+        self.PIPELINE_RENDER_QUEUE_SIZE = 1  # Frames aguardando desenho (descarta o mais antigo)
+
         # Thresholds para detecção de atividade
         self.ENTER_THRESH = 0.80
         self.EXIT_THRESH = 0.85
@@ -99,3 +230,10 @@ class Config:
         # Flag para visualizar marcadores ArUco detectados (contornos, eixos e IDs)
         self.SHOW_MARKER_VISUALIZATION = False  # Se False, remove as marcações visuais dos marcadores detectados
 
+    @staticmethod
+    def _load_cameras(path):
+        """Carrega a lista de câmeras de um arquivo JSON (lista vazia sem arquivo)"""
+        if not path:
+            return []
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
@@ -1,12 +1,15 @@
+import time
 import requests
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import logging
+from ..core import metrics
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
 
 class APIClient:
     """Cliente para comunicação com a API de atividades dos gatos"""
     
-    def __init__(self, base_url: str, api_key: str, timeout: int = 10):
+    def __init__(self, base_url: str, api_key: str, timeout: int = 10, breaker: Optional[CircuitBreaker] = None):
         """
         Inicializa o cliente da API
         
@@ -14,9 +17,11 @@ class APIClient:
             base_url: URL base da API
             api_key: Token de autenticação da API
             timeout: Timeout para requisições em segundos
+            breaker: Disjuntor (opcional); com o circuito aberto as requisições falham na hora
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.breaker = breaker
         self.session = requests.Session()
         
         # Configura headers padrão incluindo o token de autenticação
@@ -29,7 +34,8 @@ class APIClient:
         # Configura logging
         self.logger = logging.getLogger(__name__)
     
-    def create_activity(self, cat_id: int, activity_title: str, timestamp: datetime = None) -> Optional[int]:
+    def create_activity(self, cat_id: int, activity_title: str, timestamp: datetime = None,
+                        camera_id: int = 1) -> Optional[int]:
         """
         Cria uma nova atividade na API
 
@@ -37,6 +43,7 @@ class APIClient:
             cat_id: ID do gato
             activity_title: Título da atividade (eat, drink, etc.)
             timestamp: Timestamp do início da atividade (padrão: agora)
+            camera_id: ID da câmera que registrou a atividade
 
         Returns:
             int: ID da atividade criada ou None se falhou
@@ -44,24 +51,88 @@ class APIClient:
         if timestamp is None:
             timestamp = datetime.now()
 
-        # Garante que o timestamp tenha o formato correto com 'Z'
-        started_at = timestamp.isoformat()
-        if not started_at.endswith('Z'):
-            started_at += 'Z'
+        payload = self.activity_payload(cat_id, activity_title, timestamp, camera_id=camera_id)
+        return self._create_activity_request(payload)
 
-        # Converte cat_id para int Python nativo para evitar problemas de serialização JSON
-        # com tipos numpy (como numpy.intc)
-        cat_id = int(cat_id)
+    @staticmethod
+    def format_timestamp(timestamp: datetime) -> str:
+        """Garante que o timestamp tenha o formato correto com 'Z'"""
+        formatted = timestamp.isoformat()
+        if not formatted.endswith('Z'):
+            formatted += 'Z'
+        return formatted
 
-        payload = {
-            'cameraId': 1,
-            'catId': cat_id,
+    @staticmethod
+    def activity_payload(cat_id: int, activity_title: str, started_at: datetime,
+                         ended_at: datetime = None, camera_id: int = 1) -> Dict[str, Any]:
+        """
+        Monta o corpo de criação de uma atividade
+
+        Args:
+            cat_id: ID do gato
+            activity_title: Título da atividade
+            started_at: Início da atividade
+            ended_at: Fim da atividade (padrão: igual ao início, atividade em andamento)
+            camera_id: ID da câmera que registrou a atividade
+        """
+        started = APIClient.format_timestamp(started_at)
+        return {
+            'cameraId': int(camera_id),
+            # Converte cat_id para int Python nativo para evitar problemas de serialização JSON
+            # com tipos numpy (como numpy.intc)
+            'catId': int(cat_id),
             'title': activity_title,
-            'startedAt': started_at,
-            'endedAt': started_at  # Inicialmente igual ao startedAt
+            'startedAt': started,
+            'endedAt': APIClient.format_timestamp(ended_at) if ended_at is not None else started
         }
 
-        return self._create_activity_request(payload)
+    def bulk_activities(self, operations: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Envia várias operações de atividade em uma única requisição
+
+        Cada operação é {"op": "create", ...corpo de criação...} ou
+        {"op": "finish", "id": activity_id, "endedAt": ...}. Uma atividade já encerrada é
+        criada de uma vez com "create" e endedAt preenchido.
+
+        Args:
+            operations: Operações na ordem em que devem ser aplicadas
+
+        Returns:
+            list: Um resultado por operação ({"status": "ok", "id": ...} ou {"status": "error", ...})
+                  ou None se a requisição falhou como um todo
+        """
+        url = f"{self.base_url}/activities/bulk"
+
+        try:
+            response = self._send('POST', url, {'operations': operations})
+            response.raise_for_status()
+
+            results = response.json().get('data')
+            if not isinstance(results, list) or len(results) != len(operations):
+                self.logger.error("Resposta do envio em lote não corresponde às operações enviadas")
+                return None
+
+            self.logger.info(f"Lote de {len(operations)} operações de atividade enviado")
+            return results
+
+        except CircuitOpenError:
+            self.logger.debug(f"Circuito aberto - envio em lote recusado: {url}")
+            return None
+        except requests.exceptions.Timeout:
+            self.logger.error(f"Timeout no envio em lote: {url}")
+            return None
+        except requests.exceptions.ConnectionError:
+            self.logger.error(f"Erro de conexão no envio em lote: {url}")
+            return None
+        except requests.exceptions.HTTPError as e:
+            self.logger.error(f"Erro HTTP no envio em lote: {url} - Status: {e.response.status_code}")
+            return None
+        except ValueError as e:
+            self.logger.error(f"Erro ao decodificar JSON da resposta: {str(e)}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Erro inesperado no envio em lote: {url} - {str(e)}")
+            return None
     
     def finish_activity(self, activity_id: int, end_time: datetime = None) -> bool:
         """
@@ -77,10 +148,7 @@ class APIClient:
         if end_time is None:
             end_time = datetime.now()
 
-        # Garante que o timestamp tenha o formato correto com 'Z'
-        ended_at = end_time.isoformat()
-        if not ended_at.endswith('Z'):
-            ended_at += 'Z'
+        ended_at = self.format_timestamp(end_time)
 
         # Converte activity_id para int Python nativo para evitar problemas de serialização JSON
         activity_id = int(activity_id)
@@ -104,7 +172,7 @@ class APIClient:
         url = f"{self.base_url}/activities/"
         
         try:
-            response = self.session.post(url, json=data, timeout=self.timeout)
+            response = self._send('POST', url, data)
             response.raise_for_status()
             
             # Extrai o ID da resposta
@@ -118,6 +186,9 @@ class APIClient:
                 self.logger.error("Resposta da API não contém ID da atividade")
                 return None
                 
+        except CircuitOpenError:
+            self.logger.debug(f"Circuito aberto - criação de atividade recusada: {url}")
+            return None
         except requests.exceptions.Timeout:
             self.logger.error(f"Timeout na criação de atividade: {url}")
             return None
@@ -136,6 +207,37 @@ class APIClient:
             self.logger.error(f"Erro inesperado na criação de atividade: {url} - {str(e)}")
             return None
     
+    def _send(self, method: str, url: str, data: Dict[Any, Any] = None) -> requests.Response:
+        """
+        Envia a requisição passando pelo disjuntor, se houver
+
+        Timeouts, erros de conexão e respostas 5xx contam como falha; qualquer outra resposta
+        indica que a API está no ar e conta como sucesso, com a latência medida.
+
+        Raises:
+            CircuitOpenError: Se o circuito está aberto (nenhuma requisição é feita)
+        """
+        if self.breaker is None:
+            with metrics.timer("api_request"):
+                return self.session.request(method, url, json=data, timeout=self.timeout)
+
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"{method} {url}")
+
+        start = time.monotonic()
+        try:
+            with metrics.timer("api_request"):
+                response = self.session.request(method, url, json=data, timeout=self.timeout)
+        except Exception:
+            self.breaker.record_failure(time.monotonic() - start)
+            raise
+
+        if response.status_code >= 500:
+            self.breaker.record_failure(time.monotonic() - start)
+        else:
+            self.breaker.record_success(time.monotonic() - start)
+        return response
+
     def _make_request(self, method: str, endpoint: str, data: Dict[Any, Any] = None) -> bool:
         """
         Faz uma requisição HTTP para a API
@@ -152,11 +254,11 @@ class APIClient:
         
         try:
             if method.upper() == 'POST' and data:
-                response = self.session.post(url, json=data, timeout=self.timeout)
+                response = self._send('POST', url, data)
             elif method.upper() == 'PATCH' and data:
-                response = self.session.patch(url, json=data, timeout=self.timeout)
+                response = self._send('PATCH', url, data)
             elif method.upper() == 'GET':
-                response = self.session.get(url, timeout=self.timeout)
+                response = self._send('GET', url)
             else:
                 self.logger.error(f"Método HTTP não suportado: {method}")
                 return False
@@ -172,6 +274,9 @@ class APIClient:
             
             return True
             
+        except CircuitOpenError:
+            self.logger.debug(f"Circuito aberto - requisição recusada: {method} {url}")
+            return False
         except requests.exceptions.Timeout:
             self.logger.error(f"Timeout na requisição: {method} {url}")
             return False
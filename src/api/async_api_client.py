@@ -0,0 +1,202 @@
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from ..core import metrics
+from .api_client import APIClient
+from .circuit_breaker import CircuitBreaker
+
+
+class AsyncAPIClient:
+    """
+    Cliente assíncrono para a API de atividades dos gatos.
+
+    Usa um pool limitado de conexões HTTP keep-alive, prazo por requisição e um limite de
+    requisições simultâneas. Mantém a mesma semântica de create_activity/finish_activity do
+    APIClient, mas os métodos são corrotinas e devem ser executados sempre no mesmo loop.
+    """
+
+    # Corpo das requisições idêntico ao do cliente síncrono
+    format_timestamp = staticmethod(APIClient.format_timestamp)
+    activity_payload = staticmethod(APIClient.activity_payload)
+
+    def __init__(self, base_url: str, api_key: str, timeout: float = 10, max_connections: int = 8,
+                 max_concurrency: int = 4, keepalive_timeout: float = 30.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Inicializa o cliente assíncrono da API
+
+        Args:
+            base_url: URL base da API
+            api_key: Token de autenticação da API
+            timeout: Prazo padrão de cada requisição em segundos
+            max_connections: Tamanho máximo do pool de conexões
+            max_concurrency: Requisições simultâneas permitidas
+            keepalive_timeout: Tempo que uma conexão ociosa fica aberta para reutilização
+            breaker: Disjuntor (opcional); com o circuito aberto as requisições falham na hora
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.keepalive_timeout = keepalive_timeout
+        self.breaker = breaker
+        self.headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'x-api-key': api_key or ''
+        }
+        self.logger = logging.getLogger(__name__)
+
+        # Sessão e semáforo são criados no loop que executa as requisições
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _request(self, method: str, endpoint: str, data: Dict[Any, Any] = None,
+                       timeout: float = None) -> Optional[Any]:
+        """
+        Faz uma requisição e retorna o JSON da resposta ({} se vazia) ou None se falhou
+
+        Args:
+            method: Método HTTP
+            endpoint: Endpoint da API
+            data: Corpo JSON
+            timeout: Prazo desta requisição (padrão: self.timeout)
+        """
+        url = f"{self.base_url}{endpoint}"
+        if self.breaker is not None and not self.breaker.allow_request():
+            self.logger.debug(f"Circuito aberto - requisição recusada: {method} {url}")
+            return None
+
+        session = self._get_session()
+        deadline = aiohttp.ClientTimeout(total=timeout if timeout is not None else self.timeout)
+
+        try:
+            async with self._semaphore:
+                start = time.monotonic()
+                try:
+                    with metrics.timer("api_request"):
+                        response = await session.request(method, url, json=data, timeout=deadline)
+                except Exception:
+                    self._record(False, start)
+                    raise
+                self._record(response.status < 500, start)
+                async with response:
+                    if response.status >= 400:
+                        text = await response.text()
+                        self.logger.error(f"Erro HTTP: {method} {url} - Status: {response.status}")
+                        self.logger.error(f"Resposta do erro: {text}")
+                        return None
+                    self.logger.info(f"Requisição bem-sucedida: {method} {url} - Status: {response.status}")
+                    body = await response.read()
+                    return await response.json(content_type=None) if body else {}
+        except asyncio.TimeoutError:
+            self.logger.error(f"Timeout na requisição: {method} {url}")
+            return None
+        except aiohttp.ClientConnectionError:
+            self.logger.error(f"Erro de conexão: {method} {url}")
+            return None
+        except ValueError as e:
+            self.logger.error(f"Erro ao decodificar JSON da resposta: {str(e)}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Erro inesperado na requisição: {method} {url} - {str(e)}")
+            return None
+
+    def _record(self, success: bool, start: float):
+        """Registra o resultado da requisição no disjuntor (5xx, timeout e erro de conexão são falhas)"""
+        if self.breaker is None:
+            return
+        if success:
+            self.breaker.record_success(time.monotonic() - start)
+        else:
+            self.breaker.record_failure(time.monotonic() - start)
+
+    async def create_activity(self, cat_id: int, activity_title: str, timestamp: datetime = None,
+                              timeout: float = None, camera_id: int = 1) -> Optional[int]:
+        """
+        Cria uma nova atividade na API
+
+        Returns:
+            int: ID da atividade criada ou None se falhou
+        """
+        if timestamp is None:
+            timestamp = datetime.now()
+
+        payload = self.activity_payload(cat_id, activity_title, timestamp, camera_id=camera_id)
+        response_data = await self._request('POST', '/activities/', payload, timeout)
+        if response_data is None:
+            return None
+
+        # Extrai o ID da resposta
+        activity_id = (response_data.get('data') or {}).get('id')
+        if activity_id:
+            self.logger.info(f"Atividade criada com sucesso - ID: {activity_id}")
+            return int(activity_id)
+
+        self.logger.error("Resposta da API não contém ID da atividade")
+        return None
+
+    async def finish_activity(self, activity_id: int, end_time: datetime = None, timeout: float = None) -> bool:
+        """
+        Finaliza uma atividade existente
+
+        Returns:
+            bool: True se a requisição foi bem-sucedida
+        """
+        if end_time is None:
+            end_time = datetime.now()
+
+        payload = {'endedAt': self.format_timestamp(end_time)}
+        return await self._request('PATCH', f'/activities/{int(activity_id)}', payload, timeout) is not None
+
+    async def bulk_activities(self, operations: List[Dict[str, Any]],
+                              timeout: float = None) -> Optional[List[Dict[str, Any]]]:
+        """Envia várias operações de atividade em uma única requisição (ver APIClient.bulk_activities)"""
+        response_data = await self._request('POST', '/activities/bulk', {'operations': operations}, timeout)
+        if response_data is None:
+            return None
+
+        results = response_data.get('data')
+        if not isinstance(results, list) or len(results) != len(operations):
+            self.logger.error("Resposta do envio em lote não corresponde às operações enviadas")
+            return None
+        return results
+
+    async def test_connection(self) -> bool:
+        """
+        Testa a conexão com a API
+
+        Returns:
+            bool: True se a conexão está funcionando
+        """
+        url = f"{self.base_url}/"
+        try:
+            async with self._get_session().get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                return response.status in [200, 404, 401]  # 404 também indica que a API está respondendo
+        except asyncio.TimeoutError:
+            self.logger.error(f"Timeout ao testar conexão com API: {self.base_url}")
+            return False
+        except aiohttp.ClientConnectionError:
+            self.logger.error(f"Erro de conexão ao testar API: {self.base_url}")
+            return False
+        except Exception as e:
+            self.logger.error(f"Erro ao testar conexão com API: {e}")
+            return False
+
+    async def close(self):
+        """Fecha a sessão e as conexões do pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
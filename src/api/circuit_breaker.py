@@ -0,0 +1,182 @@
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    """Requisição recusada sem chamar a API porque o circuito está aberto"""
+
+
+class CircuitBreaker:
+    """
+    Disjuntor (circuit breaker) para as chamadas à API de atividades.
+
+    Estados:
+        closed: requisições liberadas; o resultado e a latência das últimas `window_size`
+            chamadas são registrados
+        open: requisições recusadas imediatamente por `open_seconds` segundos
+        half_open: até `half_open_max_calls` requisições de teste; sucesso fecha o circuito,
+            falha o abre novamente
+
+    O circuito abre quando, com pelo menos `min_requests` chamadas na janela, a taxa de
+    falhas chega a `failure_rate_threshold` ou o percentil `latency_percentile` das latências
+    passa de `latency_threshold` segundos.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_rate_threshold: float = 0.5, latency_threshold: Optional[float] = None,
+                 latency_percentile: float = 95.0, window_size: int = 20, min_requests: int = 5,
+                 open_seconds: float = 30.0, half_open_max_calls: int = 1,
+                 on_state_change: Optional[Callable[[str, str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Inicializa o disjuntor
+
+        Args:
+            failure_rate_threshold: Fração de falhas na janela que abre o circuito
+            latency_threshold: Latência (segundos) do percentil que abre o circuito (None = ignora latência)
+            latency_percentile: Percentil das latências comparado a latency_threshold
+            window_size: Número de chamadas recentes consideradas
+            min_requests: Chamadas mínimas na janela antes de avaliar as taxas
+            open_seconds: Tempo em que o circuito fica aberto antes das chamadas de teste
+            half_open_max_calls: Chamadas de teste simultâneas no estado half_open
+            on_state_change: Função chamada com (estado_anterior, novo_estado)
+            clock: Relógio monotônico (substituível em testes)
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.latency_threshold = latency_threshold
+        self.latency_percentile = latency_percentile
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.on_state_change = on_state_change
+        self.clock = clock
+        self.logger = logging.getLogger(__name__)
+
+        # Reentrante: o callback de mudança de estado pode consultar o disjuntor
+        self._lock = threading.RLock()
+        self._outcomes = deque(maxlen=window_size)  # (sucesso, latência)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+        # Contadores para monitoramento
+        self.trip_count = 0
+        self.rejected_count = 0
+        self.state_changes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def retry_in(self) -> float:
+        """Segundos até o circuito aceitar chamadas de teste (0 se já aceita requisições)"""
+        with self._lock:
+            self._refresh()
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.open_seconds - self.clock())
+
+    def allow_request(self) -> bool:
+        """Reserva a passagem de uma requisição (False = recusar imediatamente)"""
+        with self._lock:
+            self._refresh()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self.rejected_count += 1
+            return False
+
+    def record_success(self, latency: float = 0.0):
+        """Registra uma chamada concluída (a API respondeu)"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._half_open_calls = max(0, self._half_open_calls - 1)
+                if self.latency_threshold is not None and latency > self.latency_threshold:
+                    self._trip()
+                else:
+                    self._transition(self.CLOSED)
+                    self._outcomes.clear()
+                return
+            self._outcomes.append((True, latency))
+            self._evaluate()
+
+    def record_failure(self, latency: float = 0.0):
+        """Registra uma chamada que falhou (timeout, erro de conexão ou erro 5xx)"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._half_open_calls = max(0, self._half_open_calls - 1)
+                self._trip()
+                return
+            self._outcomes.append((False, latency))
+            self._evaluate()
+
+    def stats(self) -> Dict:
+        """Estado e contadores para monitoramento"""
+        with self._lock:
+            self._refresh()
+            return {
+                "state": self._state,
+                "trip_count": self.trip_count,
+                "rejected_count": self.rejected_count,
+                "state_changes": self.state_changes,
+                "failure_rate": self._failure_rate(),
+                "latency_percentile": self._latency_percentile(),
+                "window_requests": len(self._outcomes)
+            }
+
+    def _failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for success, _ in self._outcomes if not success) / len(self._outcomes)
+
+    def _latency_percentile(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        latencies = sorted(latency for _, latency in self._outcomes)
+        index = min(len(latencies) - 1, int(round(self.latency_percentile / 100.0 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def _evaluate(self):
+        if self._state != self.CLOSED or len(self._outcomes) < self.min_requests:
+            return
+        if self._failure_rate() >= self.failure_rate_threshold:
+            self._trip()
+        elif self.latency_threshold is not None and self._latency_percentile() > self.latency_threshold:
+            self._trip()
+
+    def _trip(self):
+        self.trip_count += 1
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+        self._transition(self.OPEN)
+
+    def _refresh(self):
+        """Passa de open para half_open quando o tempo de espera termina"""
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._half_open_calls = 0
+            self._transition(self.HALF_OPEN)
+
+    def _transition(self, new_state: str):
+        if new_state == self._state:
+            return
+        old_state, self._state = self._state, new_state
+        self.state_changes += 1
+        if new_state == self.OPEN:
+            self.logger.warning(f"Circuito da API aberto (abertura nº {self.trip_count}); requisições recusadas por {self.open_seconds:.0f}s")
+        else:
+            self.logger.info(f"Circuito da API: {old_state} -> {new_state}")
+        if self.on_state_change is not None:
+            try:
+                self.on_state_change(old_state, new_state)
+            except Exception as e:
+                self.logger.error(f"Erro no callback de mudança de estado do circuito: {e}")
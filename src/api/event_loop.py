@@ -0,0 +1,27 @@
+import asyncio
+import threading
+from typing import Awaitable, Optional
+
+
+class EventLoopThread:
+    """Loop asyncio único executado em uma thread de fundo"""
+
+    def __init__(self, name: str = "asyncio-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coroutine: Awaitable, timeout: Optional[float] = None):
+        """Executa a corrotina no loop e aguarda o resultado na thread chamadora"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def stop(self):
+        if not self._thread.is_alive():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
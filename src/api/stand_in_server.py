@@ -0,0 +1,168 @@
+"""
+Servidor local que imita a API de atividades para testes e desenvolvimento.
+
+Implementa POST /activities/, PATCH /activities/{id} e POST /activities/bulk, guardando
+as atividades em memória e contando as requisições recebidas.
+
+Uso:
+    python -m src.api.stand_in_server [--host 127.0.0.1] [--port 3000]
+"""
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInActivityAPI:
+    """Estado em memória da API simulada"""
+
+    def __init__(self):
+        self.activities = {}
+        self.requests = []
+        self.connections = 0  # Conexões TCP aceitas (com keep-alive, menor que o número de requisições)
+        self.online = True  # Com False todas as requisições recebem 503
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def create(self, payload):
+        missing = [field for field in ("catId", "title", "startedAt", "endedAt") if field not in payload]
+        if missing:
+            return {"status": "error", "message": f"Campos ausentes: {', '.join(missing)}"}
+        with self._lock:
+            activity_id = self._next_id
+            self._next_id += 1
+            self.activities[activity_id] = {key: value for key, value in payload.items() if key != "op"}
+        return {"status": "ok", "id": activity_id}
+
+    def finish(self, activity_id, ended_at):
+        with self._lock:
+            activity = self.activities.get(activity_id)
+            if activity is None:
+                return {"status": "error", "message": f"Atividade {activity_id} não encontrada"}
+            activity["endedAt"] = ended_at
+        return {"status": "ok", "id": activity_id}
+
+    def bulk(self, operations):
+        results = []
+        for operation in operations:
+            if operation.get("op") == "create":
+                results.append(self.create(operation))
+            elif operation.get("op") == "finish":
+                results.append(self.finish(operation.get("id"), operation.get("endedAt")))
+            else:
+                results.append({"status": "error", "message": f"Operação desconhecida: {operation.get('op')}"})
+        return results
+
+
+def _make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 mantém a conexão aberta entre requisições (keep-alive)
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with api._lock:
+                api.connections += 1
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status, body=None):
+            data = json.dumps(body if body is not None else {}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _record(self):
+            with api._lock:
+                api.requests.append((self.command, self.path))
+            if not api.online:
+                # Descarta o corpo para a próxima requisição da conexão keep-alive
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._reply(503, {"message": "Indisponível"})
+                return False
+            return True
+
+        def do_GET(self):
+            if self._record():
+                self._reply(200, {"status": "ok"})
+
+        def do_POST(self):
+            if not self._record():
+                return
+            body = self._read_json()
+            if self.path.rstrip("/") == "/activities/bulk":
+                self._reply(200, {"data": api.bulk(body.get("operations", []))})
+            elif self.path.rstrip("/") == "/activities":
+                result = api.create(body)
+                if result["status"] != "ok":
+                    self._reply(400, result)
+                else:
+                    self._reply(201, {"data": {"id": result["id"]}})
+            else:
+                self._reply(404, {"message": "Não encontrado"})
+
+        def do_PATCH(self):
+            if not self._record():
+                return
+            parts = self.path.strip("/").split("/")
+            if len(parts) != 2 or parts[0] != "activities" or not parts[1].isdigit():
+                self._reply(404, {"message": "Não encontrado"})
+                return
+            result = api.finish(int(parts[1]), self._read_json().get("endedAt"))
+            self._reply(200 if result["status"] == "ok" else 404, {"data": result})
+
+    return Handler
+
+
+class StandInServer:
+    """Executa a API simulada em uma thread de fundo"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.api = StandInActivityAPI()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self.api))
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API de atividades simulada para testes locais")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    server = StandInServer(args.host, args.port)
+    print(f"API simulada em {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import time
+import threading
+import numpy as np
+
+
+class FrameLease:
+    """Empréstimo somente leitura de um slot do buffer circular de frames"""
+
+    __slots__ = ("frame", "seq", "timestamp", "published_at", "_ring", "_index", "_generation", "_released")
+
+    def __init__(self, ring, index, generation, frame, seq, timestamp, published_at=None):
+        self.frame = frame
+        self.seq = seq
+        self.timestamp = timestamp
+        self.published_at = published_at  # Instante da publicação (time.perf_counter())
+        self._ring = ring
+        self._index = index
+        self._generation = generation
+        self._released = False
+
+    def release(self):
+        """Devolve o slot ao buffer (chamadas repetidas são ignoradas)"""
+        if self._released:
+            return
+        self._released = True
+        self._ring._release(self._index, self._generation)
+        self.frame = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+
+class FrameRingBuffer:
+    """
+    Buffer circular de frames pré-alocados compartilhado entre a thread de captura e os consumidores.
+
+    A thread de captura (único escritor) decodifica diretamente em um slot livre e o publica
+    com um número de sequência. Os consumidores pegam emprestado o último frame publicado
+    como uma view somente leitura, sem cópia; enquanto o empréstimo existir o slot não é
+    sobrescrito.
+    """
+
+    def __init__(self, num_slots: int = 4):
+        if num_slots < 2:
+            raise ValueError("O buffer circular precisa de pelo menos 2 slots")
+
+        self.num_slots = num_slots
+        self._lock = threading.Lock()
+
+        self._slots = None
+        self._shape = None
+        self._dtype = None
+        self._generation = 0
+
+        self._refcounts = [0] * num_slots
+        self._seqs = [-1] * num_slots
+        self._timestamps = [None] * num_slots
+        self._published_at = [None] * num_slots
+
+        self._latest_index = None
+        self._latest_seq = -1
+        self._write_index = None
+
+        # Estatísticas
+        self.frames_published = 0
+        self.frames_dropped = 0
+        self.frames_copied = 0
+
+    @property
+    def latest_seq(self) -> int:
+        """Número de sequência do último frame publicado (-1 se nenhum)"""
+        with self._lock:
+            return self._latest_seq
+
+    def _allocate(self, shape, dtype):
+        """(Re)aloca todos os slots para o formato informado"""
+        self._slots = [np.empty(shape, dtype=dtype) for _ in range(self.num_slots)]
+        self._shape = shape
+        self._dtype = dtype
+        self._generation += 1
+        self._refcounts = [0] * self.num_slots
+        self._seqs = [-1] * self.num_slots
+        self._timestamps = [None] * self.num_slots
+        self._published_at = [None] * self.num_slots
+        self._latest_index = None
+        self._write_index = None
+
+    def _reserve_slot(self):
+        """Reserva um slot que não é o último publicado e não está emprestado"""
+        if self._write_index is not None:
+            return self._write_index
+
+        start = 0 if self._latest_index is None else self._latest_index + 1
+        for offset in range(self.num_slots):
+            index = (start + offset) % self.num_slots
+            if index != self._latest_index and self._refcounts[index] == 0:
+                self._write_index = index
+                return index
+        return None
+
+    def writable_slot(self):
+        """
+        Retorna o array do próximo slot livre para escrita direta pelo decodificador
+
+        Returns:
+            np.ndarray: Slot reservado ou None se o buffer ainda não foi alocado ou está todo emprestado
+        """
+        with self._lock:
+            if self._slots is None:
+                return None
+            index = self._reserve_slot()
+            return None if index is None else self._slots[index]
+
+    def publish(self, frame, timestamp: float = None):
+        """
+        Publica um frame no buffer
+
+        Se `frame` for o próprio slot obtido em `writable_slot()` nenhuma cópia é feita;
+        caso contrário o frame é copiado para o slot reservado.
+
+        Args:
+            frame: Frame decodificado
+            timestamp: Instante de captura (padrão: agora)
+
+        Returns:
+            int: Número de sequência do frame ou None se foi descartado
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._lock:
+            if self._slots is None or frame.shape != self._shape or frame.dtype != self._dtype:
+                self._allocate(frame.shape, frame.dtype)
+
+            index = self._reserve_slot()
+            if index is None:
+                self.frames_dropped += 1
+                return None
+            slot = self._slots[index]
+
+        if frame is not slot:
+            np.copyto(slot, frame)
+            self.frames_copied += 1
+
+        with self._lock:
+            self._latest_seq += 1
+            self._seqs[index] = self._latest_seq
+            self._timestamps[index] = timestamp
+            self._published_at[index] = time.perf_counter()
+            self._latest_index = index
+            self._write_index = None
+            self.frames_published += 1
+            return self._latest_seq
+
+    def acquire(self, after_seq: int = -1):
+        """
+        Pega emprestado o último frame publicado
+
+        Args:
+            after_seq: Só retorna o frame se a sequência for maior que este valor
+
+        Returns:
+            FrameLease: Empréstimo com view somente leitura, ou None se não há frame novo
+        """
+        with self._lock:
+            index = self._latest_index
+            if index is None or self._latest_seq <= after_seq:
+                return None
+            self._refcounts[index] += 1
+            view = self._slots[index].view()
+            view.flags.writeable = False
+            return FrameLease(
+                self, index, self._generation, view,
+                self._seqs[index], self._timestamps[index], self._published_at[index]
+            )
+
+    def _release(self, index, generation):
+        with self._lock:
+            # Empréstimos de uma alocação anterior não afetam os slots atuais
+            if generation == self._generation and self._refcounts[index] > 0:
+                self._refcounts[index] -= 1
+
+    def get_stats(self):
+        """Retorna estatísticas de uso do buffer"""
+        with self._lock:
+            return {
+                "slots": self.num_slots,
+                "latest_seq": self._latest_seq,
+                "leased_slots": sum(1 for count in self._refcounts if count > 0),
+                "frames_published": self.frames_published,
+                "frames_dropped": self.frames_dropped,
+                "frames_copied": self.frames_copied
+            }
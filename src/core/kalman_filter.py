@@ -0,0 +1,123 @@
+import numpy as np
+
+
+class ConstantVelocityKalman:
+    """
+    Filtro de Kalman 3D com modelo de velocidade constante.
+
+    Estado: [x, y, z, vx, vy, vz]. A aceleração desconhecida entra como ruído de processo
+    (aceleração branca), de modo que a incerteza da posição cresce enquanto o marcador não é visto.
+    """
+
+    __slots__ = ("x", "P", "last_time", "process_noise", "measurement_noise", "updates")
+
+    _H = np.hstack([np.eye(3), np.zeros((3, 3))])
+
+    def __init__(self, position, timestamp, process_noise, measurement_noise, initial_velocity_std=0.5):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.x = np.zeros(6)
+        self.x[:3] = position
+        self.P = np.diag([measurement_noise ** 2] * 3 + [initial_velocity_std ** 2] * 3)
+        self.last_time = timestamp
+        self.updates = 1
+
+    def _propagate(self, dt):
+        """Retorna o estado e a covariância propagados por dt segundos (sem alterar o filtro)"""
+        if dt <= 0:
+            return self.x, self.P
+
+        F = np.eye(6)
+        F[:3, 3:] = np.eye(3) * dt
+
+        # Ruído de processo para aceleração branca com desvio padrão process_noise (m/s²)
+        q = self.process_noise ** 2
+        Q = np.zeros((6, 6))
+        Q[:3, :3] = np.eye(3) * (dt ** 4 / 4) * q
+        Q[:3, 3:] = np.eye(3) * (dt ** 3 / 2) * q
+        Q[3:, :3] = Q[:3, 3:]
+        Q[3:, 3:] = np.eye(3) * (dt ** 2) * q
+
+        return F @ self.x, F @ self.P @ F.T + Q
+
+    def update(self, position, timestamp):
+        """Incorpora uma nova medição de posição e retorna a posição filtrada"""
+        x, P = self._propagate(timestamp - self.last_time)
+
+        H = self._H
+        R = np.eye(3) * self.measurement_noise ** 2
+        S = H @ P @ H.T + R
+        K = P @ H.T @ np.linalg.inv(S)
+
+        self.x = x + K @ (np.asarray(position, dtype=np.float64) - H @ x)
+        self.P = (np.eye(6) - K @ H) @ P
+        self.last_time = max(self.last_time, timestamp)
+        self.updates += 1
+        return self.x[:3].copy()
+
+    def predict(self, timestamp):
+        """Retorna (posição, covariância 3x3) previstas para o instante informado"""
+        x, P = self._propagate(timestamp - self.last_time)
+        return x[:3].copy(), P[:3, :3].copy()
+
+    @property
+    def position(self):
+        return self.x[:3].copy()
+
+    @property
+    def position_covariance(self):
+        return self.P[:3, :3].copy()
+
+
+class MarkerFilterBank:
+    """
+    Conjunto de filtros de Kalman, um por marcador.
+
+    Entre detecções as posições são previstas pelo filtro; a previsão é abandonada quando o
+    marcador fica tempo demais sem ser visto ou quando a incerteza ultrapassa o limite.
+    """
+
+    def __init__(self, process_noise=0.5, measurement_noise=0.01, max_predict_seconds=1.0,
+                 max_position_std=0.10):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.max_predict_seconds = max_predict_seconds
+        self.max_position_std = max_position_std
+        self.filters = {}
+
+    def update(self, marker_id, position, timestamp, process_noise=None):
+        """Atualiza (ou cria) o filtro do marcador e retorna (posição filtrada, covariância)"""
+        kalman = self.filters.get(marker_id)
+        if kalman is None:
+            kalman = ConstantVelocityKalman(
+                position, timestamp,
+                self.process_noise if process_noise is None else process_noise,
+                self.measurement_noise
+            )
+            self.filters[marker_id] = kalman
+            return kalman.position, kalman.position_covariance
+
+        kalman.update(position, timestamp)
+        return kalman.position, kalman.position_covariance
+
+    def predict(self, marker_id, timestamp):
+        """Retorna (posição, covariância) previstas ou None se a previsão não for confiável"""
+        kalman = self.filters.get(marker_id)
+        if kalman is None:
+            return None
+        if timestamp - kalman.last_time > self.max_predict_seconds:
+            return None
+
+        position, covariance = kalman.predict(timestamp)
+        if np.sqrt(np.max(np.diag(covariance))) > self.max_position_std:
+            return None
+        return position, covariance
+
+    def ids(self):
+        return list(self.filters.keys())
+
+    def remove(self, marker_id):
+        self.filters.pop(marker_id, None)
+
+    def reset(self):
+        self.filters.clear()
@@ -1,7 +1,14 @@
+import os
 import cv2
 import numpy as np
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from . import metrics
+from .kalman_filter import MarkerFilterBank
+from .motion_gate import MotionGate
+from .pose_estimation import PoseEstimator
+from .zone_registry import ZoneRegistry
 
 class MarkerDetector:
     """Classe responsável pela detecção de marcadores ArUco"""
@@ -13,42 +20,78 @@ class MarkerDetector:
         self.detector = cv2.aruco.ArucoDetector(self.aruco_dict, self.parameters)
         self.logger = logging.getLogger(__name__)
 
+        # Estimativa de pose em lote para todos os marcadores do frame
+        self.pose_estimator = PoseEstimator(
+            config.camera_matrix, config.dist_coeffs, getattr(config, "POSE_METHOD", "ippe_square")
+        )
+
         # Cache para armazenar gatos detectados dinamicamente
         self.detected_cats = {}
         # Registro do tempo da última detecção de cada gato
         self.cat_last_seen = {}
 
-        # Cache de posição do pote de ração
-        self.bowl_position_cache = {
-            "position": None,
-            "last_detected": None,
-            "last_updated": None,
-            "detection_count": 0,
-            "is_reliable": False
+        # Zonas monitoradas (potes, bebedouros, camas) identificadas pelo ID do marcador
+        self.zone_registry = ZoneRegistry(config)
+
+        # Cache de posição de cada zona (as zonas são objetos fixos)
+        self.zone_position_caches = {zone_id: self._new_zone_cache() for zone_id in self.zone_registry.ids()}
+
+        # Filtro de Kalman por marcador: suaviza as poses e prevê os gatos entre detecções
+        self.pose_filters = None
+        if getattr(config, "POSE_FILTER_ENABLED", False):
+            self.pose_filters = MarkerFilterBank(
+                process_noise=config.POSE_FILTER_PROCESS_NOISE,
+                measurement_noise=config.POSE_FILTER_MEASUREMENT_NOISE,
+                max_predict_seconds=config.POSE_FILTER_MAX_PREDICT_SECONDS,
+                max_position_std=config.POSE_FILTER_MAX_POSITION_STD
+            )
+
+        # Filtro de movimento: reutiliza as últimas posições enquanto a cena estiver parada
+        self.motion_gate = None
+        if getattr(config, "MOTION_GATE_ENABLED", False):
+            self.motion_gate = MotionGate(
+                size=config.MOTION_GATE_SIZE,
+                pixel_threshold=config.MOTION_GATE_PIXEL_THRESHOLD,
+                changed_ratio=config.MOTION_GATE_CHANGED_RATIO,
+                max_skip_seconds=config.MOTION_GATE_MAX_SKIP_SECONDS
+            )
+        self._last_posicoes = None
+
+        # Estratégia de busca dos marcadores: "full" (frame inteiro) ou "roi" (regiões rastreadas)
+        self.detection_mode = getattr(config, "DETECTION_MODE", "full")
+
+        # Estado do modo "roi": cantos da última detecção por ID e frames desde a última varredura completa
+        self._tracked_corners = {}
+        self._frames_since_full_scan = 0
+        self.detection_stats = {
+            "full_scans": 0,
+            "roi_scans": 0,
+            "roi_misses": 0,
+            "pyramid_full_res_scans": 0,
+            "pyramid_misses": 0
         }
+
+        # Varredura completa em pirâmide: detecta na imagem reduzida e refina os cantos em resolução cheia
+        self.pyramid_enabled = getattr(config, "PYRAMID_ENABLED", False)
+        self.pyramid_scale = getattr(config, "PYRAMID_SCALE", 0.5)
+        self._pyramid_scans = 0
+        self._pyramid_ids = set()  # IDs encontrados na última varredura em pirâmide
+        self._subpix_criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.01)
+
+        # Detecção em blocos sobrepostos processados em paralelo (o OpenCV libera o GIL)
+        self.tiled_enabled = getattr(config, "TILED_DETECTION_ENABLED", False)
+        self._tile_pool = None
+        self._tile_detectors = []
     
     def estimate_pose(self, corners, marker_size):
         """Estima a pose do marcador no espaço 3D"""
-        # Define objeto em 3D (cantos do quadrado)
-        obj_pts = np.array([
-            [-marker_size/2, marker_size/2, 0],
-            [marker_size/2, marker_size/2, 0],
-            [marker_size/2, -marker_size/2, 0],
-            [-marker_size/2, -marker_size/2, 0]
-        ], dtype=np.float32)
-        
-        img_pts = corners.reshape(4, 2).astype(np.float32)
-        success, rvec, tvec = cv2.solvePnP(
-            obj_pts, img_pts, 
-            self.config.camera_matrix, 
-            self.config.dist_coeffs
-        )
-        return (rvec, tvec) if success else (None, None)
+        return self.pose_estimator.estimate([corners], [marker_size])[0]
     
     def _get_marker_info(self, marker_id):
         """Retorna informações do marcador baseado no ID"""
-        if marker_id == self.config.POTE_RACAO_ID:
-            return self.config.POTE_RACAO
+        zone = self.zone_registry.get(marker_id)
+        if zone is not None:
+            return zone
         else:
             # Todos os outros IDs são considerados gatos
             current_time = time.time()
@@ -65,48 +108,60 @@ class MarkerDetector:
 
             return self.detected_cats[marker_id]
 
-    def _update_bowl_cache(self, position):
-        """Atualiza o cache de posição do pote"""
+    @staticmethod
+    def _new_zone_cache():
+        return {
+            "position": None,
+            "last_detected": None,
+            "last_updated": None,
+            "detection_count": 0,
+            "is_reliable": False
+        }
+
+    def _update_zone_cache(self, zone_id, position):
+        """Atualiza o cache de posição de uma zona"""
         current_time = time.time()
+        cache = self.zone_position_caches[zone_id]
+        zone_name = self.zone_registry.get(zone_id)["nome"]
 
         # Incrementa contador de detecções
-        self.bowl_position_cache["detection_count"] += 1
+        cache["detection_count"] += 1
 
         # Para evitar overflow e impacto no desempenho, resetamos o contador
         # quando ele atinge um valor muito alto, mas mantemos o status de confiável
         MAX_DETECTION_COUNT = 100000  # 100 mil detecções é mais do que suficiente
-        if self.bowl_position_cache["detection_count"] >= MAX_DETECTION_COUNT:
+        if cache["detection_count"] >= MAX_DETECTION_COUNT:
             # Resetamos o contador mas mantemos o status de confiável
-            self.bowl_position_cache["detection_count"] = MAX_DETECTION_COUNT // 2
-            self.logger.debug(f"Contador de detecções resetado para evitar overflow: {self.bowl_position_cache['detection_count']}")
+            cache["detection_count"] = MAX_DETECTION_COUNT // 2
+            self.logger.debug(f"Contador de detecções resetado para evitar overflow: {cache['detection_count']}")
 
-        self.bowl_position_cache["last_detected"] = current_time
+        cache["last_detected"] = current_time
 
         # Verifica se deve atualizar a posição em cache
         should_update = (
-            self.bowl_position_cache["position"] is None or
-            self.bowl_position_cache["last_updated"] is None or
-            (current_time - self.bowl_position_cache["last_updated"]) >= self.config.BOWL_CACHE_UPDATE_INTERVAL
+            cache["position"] is None or
+            cache["last_updated"] is None or
+            (current_time - cache["last_updated"]) >= self.config.BOWL_CACHE_UPDATE_INTERVAL
         )
 
         if should_update:
-            self.bowl_position_cache["position"] = position.copy()
-            self.bowl_position_cache["last_updated"] = current_time
+            cache["position"] = position.copy()
+            cache["last_updated"] = current_time
 
             # Marca como confiável se tiver detecções suficientes
-            if self.bowl_position_cache["detection_count"] >= self.config.BOWL_CACHE_CONFIDENCE_THRESHOLD:
-                if not self.bowl_position_cache["is_reliable"]:
-                    self.bowl_position_cache["is_reliable"] = True
-                    self.logger.info(f"Cache de posição do pote agora é confiável (detecções: {self.bowl_position_cache['detection_count']})")
+            if cache["detection_count"] >= self.config.BOWL_CACHE_CONFIDENCE_THRESHOLD:
+                if not cache["is_reliable"]:
+                    cache["is_reliable"] = True
+                    self.logger.info(f"Cache de posição de {zone_name} agora é confiável (detecções: {cache['detection_count']})")
 
-            self.logger.debug(f"Cache de posição do pote atualizado: {position}")
+            self.logger.debug(f"Cache de posição de {zone_name} atualizado: {position}")
 
-    def _get_cached_bowl_position(self):
-        """Retorna a posição em cache do pote se disponível e válida"""
+    def _get_cached_zone_position(self, zone_id):
+        """Retorna a posição em cache da zona se disponível e válida"""
         if not self.config.BOWL_CACHE_ENABLED:
             return None
 
-        cache = self.bowl_position_cache
+        cache = self.zone_position_caches[zone_id]
 
         # Verifica se há posição em cache
         if cache["position"] is None or not cache["is_reliable"]:
@@ -119,14 +174,15 @@ class MarkerDetector:
 
         age = current_time - cache["last_detected"]
         if age > self.config.BOWL_CACHE_MAX_AGE:
-            self.logger.warning(f"Cache de posição do pote expirado (idade: {age:.1f}s)")
+            zone_name = self.zone_registry.get(zone_id)["nome"]
+            self.logger.warning(f"Cache de posição de {zone_name} expirado (idade: {age:.1f}s)")
             return None
 
         return cache["position"]
 
-    def get_bowl_cache_info(self):
-        """Retorna informações sobre o estado do cache do pote"""
-        cache = self.bowl_position_cache
+    def get_zone_cache_info(self, zone_id):
+        """Retorna informações sobre o estado do cache de posição de uma zona"""
+        cache = self.zone_position_caches[zone_id]
         current_time = time.time()
 
         info = {
@@ -138,9 +194,23 @@ class MarkerDetector:
         }
 
         return info
+
+    def get_bowl_cache_info(self):
+        """Retorna informações sobre o estado do cache do pote de ração principal"""
+        zone_id = self.config.POTE_RACAO_ID
+        if zone_id not in self.zone_position_caches:
+            zone_id = self.zone_registry.ids()[0]
+        return self.get_zone_cache_info(zone_id)
     
-    def detect_markers(self, frame):
-        """Detecta marcadores no frame e retorna suas posições"""
+    def detect_markers(self, frame, timestamp=None):
+        """
+        Detecta marcadores no frame e retorna suas posições
+
+        Args:
+            frame: Frame BGR
+            timestamp: Instante de captura do frame (padrão: agora); usado pelo filtro de pose,
+                para que a previsão dependa do intervalo entre os frames e não da hora da detecção
+        """
         # Se a flag de debug estiver ativada, desenha marcador ArUco ID 0 um pouco afastado do canto superior esquerdo
         if getattr(self.config, 'DEBUG_SHOW_TEST_MARKER', False):
             marker_id = 0
@@ -151,29 +221,41 @@ class MarkerDetector:
             # Insere o marcador com offset
             frame[offset_y:offset_y+marker_size_px, offset_x:offset_x+marker_size_px] = marker_img_bgr
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        corners, ids, _ = self.detector.detectMarkers(gray)
+        # Cena sem movimento desde a última detecção completa: reutiliza o resultado anterior
+        if self.motion_gate is not None:
+            if not self.motion_gate.should_detect(frame) and self._last_posicoes is not None:
+                return self._reuse_last_posicoes()
+
+        with metrics.timer("detect_grayscale"):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        with metrics.timer("detect_markers"):
+            corners, ids = self._find_markers(gray)
         posicoes = {}
-        bowl_detected = False
+        detected_zones = set()
+        current_time = timestamp if timestamp is not None else time.time()
+
+        # Frames emprestados do buffer circular são somente leitura: não desenha neles
+        draw_enabled = frame.flags.writeable
 
         if ids is not None:
             # Desenha marcadores detectados se habilitado
-            if self.config.SHOW_MARKER_VISUALIZATION:
+            if self.config.SHOW_MARKER_VISUALIZATION and draw_enabled:
                 cv2.aruco.drawDetectedMarkers(frame, corners, ids)
 
-            for i, marker_id in enumerate(ids.flatten()):
-                # Converte marker_id para int Python nativo para evitar problemas de serialização
-                marker_id = int(marker_id)
+            # Converte marker_id para int Python nativo para evitar problemas de serialização
+            marker_ids = [int(marker_id) for marker_id in ids.flatten()]
 
-                # Obtém informações do marcador (pote ou gato)
-                info = self._get_marker_info(marker_id)
-                rvec, tvec = self.estimate_pose(corners[i], info["size"])
+            # Obtém informações dos marcadores (zona ou gato) e estima todas as poses de uma vez
+            infos = [self._get_marker_info(marker_id) for marker_id in marker_ids]
+            with metrics.timer("detect_pose"):
+                poses = self.pose_estimator.estimate(corners, [info["size"] for info in infos])
 
+            for i, (marker_id, info, (rvec, tvec)) in enumerate(zip(marker_ids, infos, poses)):
                 if tvec is None:
                     continue
 
                 # Desenha eixos do marcador se habilitado
-                if self.config.SHOW_MARKER_VISUALIZATION:
+                if self.config.SHOW_MARKER_VISUALIZATION and draw_enabled:
                     cv2.drawFrameAxes(
                         frame,
                         self.config.camera_matrix,
@@ -189,41 +271,369 @@ class MarkerDetector:
                         cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 2
                     )
 
+                position = tvec.flatten()
+                covariance = None
+                if self.pose_filters is not None:
+                    # Zonas são fixas: quase nenhum ruído de processo, o filtro apenas faz a média das medições
+                    process_noise = None if info["tipo"] == "gato" else self.config.POSE_FILTER_ZONE_PROCESS_NOISE
+                    position, covariance = self.pose_filters.update(marker_id, position, current_time, process_noise)
+
                 # Usa o ID do marcador como chave em vez do nome
                 if info["tipo"] == "gato":
                     key = marker_id  # Para gatos, usa o ID diretamente
+                    posicoes[key] = {
+                        "tipo": info["tipo"],
+                        "pos": position,
+                        "id": marker_id
+                    }
+                    if covariance is not None:
+                        posicoes[key]["pos_cov"] = covariance
                 else:
-                    key = info["nome"]  # Para o pote, mantém o nome
-                    bowl_detected = True
-                    # Atualiza cache de posição do pote
-                    self._update_bowl_cache(tvec.flatten())
-
-                posicoes[key] = {
-                    "tipo": info["tipo"],
-                    "pos": tvec.flatten(),
-                    "id": marker_id
-                }
+                    key = info["nome"]  # Para zonas, mantém o nome
+                    detected_zones.add(marker_id)
+                    # Atualiza cache de posição da zona
+                    self._update_zone_cache(marker_id, position)
+                    posicoes[key] = self._zone_entry(info, marker_id, position)
+                    if covariance is not None:
+                        posicoes[key]["pos_cov"] = covariance
+
+        # Gatos não detectados neste frame: usa a posição prevista pelo filtro enquanto ela for confiável
+        if self.pose_filters is not None:
+            self._add_predicted_cats(posicoes, current_time)
+
+        # Zonas não detectadas neste frame usam a posição em cache, se houver
+        if self.config.BOWL_CACHE_ENABLED:
+            for zone_id in self.zone_registry.ids():
+                if zone_id in detected_zones:
+                    continue
+                cached_position = self._get_cached_zone_position(zone_id)
+                if cached_position is None:
+                    continue
 
-        # Se o pote não foi detectado, tenta usar posição em cache
-        if not bowl_detected and self.config.BOWL_CACHE_ENABLED:
-            cached_position = self._get_cached_bowl_position()
-            if cached_position is not None:
-                bowl_name = self.config.POTE_RACAO["nome"]
-                posicoes[bowl_name] = {
-                    "tipo": "pote",
-                    "pos": cached_position,
-                    "id": self.config.POTE_RACAO_ID,
-                    "from_cache": True  # Indica que veio do cache
-                }
+                zone = self.zone_registry.get(zone_id)
+                posicoes[zone["nome"]] = self._zone_entry(zone, zone_id, cached_position, from_cache=True)
 
                 # Desenha indicador visual de que está usando cache
-                self._draw_cached_bowl_indicator(frame, cached_position)
+                if draw_enabled:
+                    self._draw_cached_bowl_indicator(frame, cached_position)
 
-                cache_info = self.get_bowl_cache_info()
-                self.logger.debug(f"Usando posição em cache do pote (idade: {cache_info['age_seconds']:.1f}s)")
+                cache_info = self.get_zone_cache_info(zone_id)
+                self.logger.debug(f"Usando posição em cache de {zone['nome']} (idade: {cache_info['age_seconds']:.1f}s)")
 
+        self._last_posicoes = posicoes
         return posicoes
 
+    def _add_predicted_cats(self, posicoes, current_time):
+        """Inclui nas posições os gatos rastreados que não foram detectados neste frame"""
+        for marker_id in self.pose_filters.ids():
+            if marker_id in posicoes or self.zone_registry.is_zone(marker_id):
+                continue
+            prediction = self.pose_filters.predict(marker_id, current_time)
+            if prediction is None:
+                continue
+            position, covariance = prediction
+            posicoes[marker_id] = {
+                "tipo": "gato",
+                "pos": position,
+                "id": marker_id,
+                "pos_cov": covariance,
+                "predicted": True  # Indica que veio da previsão do filtro
+            }
+
+    @staticmethod
+    def _zone_entry(zone, zone_id, position, from_cache=False):
+        """Monta a entrada de posições de uma zona"""
+        entry = {
+            "tipo": "zona",
+            "zona": zone["zona"],
+            "pos": position,
+            "id": zone_id
+        }
+        if from_cache:
+            entry["from_cache"] = True  # Indica que veio do cache
+        return entry
+
+    def _find_markers(self, gray):
+        """Localiza os marcadores na imagem em escala de cinza segundo o modo de detecção"""
+        if self.detection_mode == "roi":
+            return self._find_markers_roi(gray)
+        return self._find_markers_full(gray)
+
+    def _find_markers_full(self, gray):
+        """Detecta marcadores no frame inteiro"""
+        if self.pyramid_enabled:
+            corners, ids = self._find_markers_pyramid(gray)
+        else:
+            corners, ids = self._detect_image(gray)
+        self.detection_stats["full_scans"] += 1
+        return corners, ids
+
+    def _detect_image(self, image, scale=1.0):
+        """
+        Detecta marcadores em uma imagem inteira, dividindo-a em blocos quando o frame for grande
+
+        `scale` é a redução da imagem em relação ao frame (pirâmide): TILE_MIN_FRAME_WIDTH e
+        TILE_OVERLAP_PX valem para o frame em resolução cheia.
+        """
+        if self.tiled_enabled and image.shape[1] / scale >= self.config.TILE_MIN_FRAME_WIDTH:
+            return self._detect_tiled(image, scale)
+        corners, ids, _ = self.detector.detectMarkers(image)
+        return corners, ids
+
+    def _tile_layout(self, shape, scale=1.0):
+        """Divide a imagem em TILE_GRID blocos (x0, y0, x1, y1) com TILE_OVERLAP_PX de sobreposição"""
+        height, width = shape[:2]
+        cols, rows = self.config.TILE_GRID
+        overlap = int(np.ceil(self.config.TILE_OVERLAP_PX * scale))
+        tiles = []
+        for row in range(rows):
+            for col in range(cols):
+                x0 = col * width // cols
+                x1 = (col + 1) * width // cols
+                y0 = row * height // rows
+                y1 = (row + 1) * height // rows
+                tiles.append((
+                    max(x0 - overlap // 2, 0), max(y0 - overlap // 2, 0),
+                    min(x1 + overlap // 2, width), min(y1 + overlap // 2, height)
+                ))
+        return tiles
+
+    def _detect_tiled(self, image, scale=1.0):
+        """
+        Detecta cada bloco em uma thread do pool e junta os resultados
+
+        Marcadores na área de sobreposição aparecem em mais de um bloco; fica a detecção
+        mais afastada das bordas do seu bloco.
+        """
+        tiles = self._tile_layout(image.shape, scale)
+        if self._tile_pool is None:
+            workers = self.config.TILE_WORKERS or os.cpu_count() or 1
+            self._tile_pool = ThreadPoolExecutor(max_workers=min(workers, len(tiles)), thread_name_prefix="aruco-tile")
+        # Um detector por bloco para que nenhuma instância seja usada por duas threads ao mesmo tempo
+        while len(self._tile_detectors) < len(tiles):
+            self._tile_detectors.append(cv2.aruco.ArucoDetector(self.aruco_dict, self.parameters))
+
+        futures = [
+            self._tile_pool.submit(self._detect_tile, self._tile_detectors[i], image, tile)
+            for i, tile in enumerate(tiles)
+        ]
+        candidates = []
+        for future in futures:
+            candidates.extend(future.result())
+
+        kept = []
+        for marker_id, corner, margin in sorted(candidates, key=lambda candidate: -candidate[2]):
+            center = corner.reshape(4, 2).mean(axis=0)
+            side = np.linalg.norm(corner[0, 1] - corner[0, 0])
+            duplicate = any(
+                marker_id == other_id and np.linalg.norm(center - other.reshape(4, 2).mean(axis=0)) < side
+                for other_id, other in kept
+            )
+            if not duplicate:
+                kept.append((marker_id, corner))
+
+        if not kept:
+            return (), None
+        ids = np.array([marker_id for marker_id, _ in kept], dtype=np.int32).reshape(-1, 1)
+        return tuple(corner for _, corner in kept), ids
+
+    @staticmethod
+    def _detect_tile(detector, image, tile):
+        """Detecta um bloco e retorna (id, cantos no frame, distância até a borda do bloco)"""
+        x0, y0, x1, y1 = tile
+        corners, ids, _ = detector.detectMarkers(image[y0:y1, x0:x1])
+        if ids is None:
+            return []
+
+        offset = np.array([x0, y0], dtype=np.float32)
+        results = []
+        for corner, marker_id in zip(corners, ids.flatten()):
+            pts = corner.reshape(4, 2)
+            margin = min(pts[:, 0].min(), pts[:, 1].min(), (x1 - x0) - pts[:, 0].max(), (y1 - y0) - pts[:, 1].max())
+            results.append((int(marker_id), corner + offset, float(margin)))
+        return results
+
+    def _find_markers_pyramid(self, gray):
+        """
+        Detecta marcadores na imagem reduzida por `pyramid_scale` e refina os cantos em resolução cheia
+
+        A primeira varredura e uma a cada PYRAMID_FULL_RES_INTERVAL são feitas em resolução cheia
+        para encontrar marcadores pequenos demais para a escala atual. Se a imagem reduzida perde
+        um marcador que estava sendo rastreado, o mesmo frame é varrido de novo em resolução cheia.
+        """
+        scale = self.pyramid_scale
+        full_res = scale >= 1.0 or self._pyramid_scans % self.config.PYRAMID_FULL_RES_INTERVAL == 0
+        self._pyramid_scans += 1
+
+        if not full_res:
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            corners, ids = self._detect_image(small, scale)
+            found = set() if ids is None else {int(marker_id) for marker_id in ids.flatten()}
+            if (self._pyramid_ids | set(self._tracked_corners)) - found:
+                # Marcador pequeno demais para a escala atual: não espera a próxima varredura cheia
+                self.detection_stats["pyramid_misses"] += 1
+                full_res = True
+            elif ids is not None:
+                corners = self._refine_corners(gray, corners, scale)
+
+        if full_res:
+            corners, ids = self._detect_image(gray)
+            self.detection_stats["pyramid_full_res_scans"] += 1
+
+        self._pyramid_ids = set() if ids is None else {int(marker_id) for marker_id in ids.flatten()}
+        if ids is not None and self.config.PYRAMID_AUTO_SCALE:
+            self._adapt_pyramid_scale(corners)
+        return corners, ids
+
+    def _refine_corners(self, gray, corners, scale):
+        """Leva os cantos da imagem reduzida para a resolução cheia e refina com precisão sub-pixel"""
+        pts = np.concatenate([c.reshape(4, 2) for c in corners]).astype(np.float32)
+        # Converte coordenadas considerando o centro dos pixels em cada escala
+        pts = (pts + 0.5) / scale - 0.5
+
+        # A janela de busca cobre o erro de quantização da escala reduzida
+        half_window = int(np.ceil(1.0 / scale)) + 2
+        pts = cv2.cornerSubPix(
+            gray, pts.reshape(-1, 1, 2), (half_window, half_window), (-1, -1), self._subpix_criteria
+        )
+        return tuple(pts.reshape(-1, 1, 4, 2))
+
+    def _adapt_pyramid_scale(self, corners):
+        """Ajusta a escala para que o menor marcador visto tenha cerca de PYRAMID_TARGET_MARKER_PX na imagem reduzida"""
+        sides = [
+            np.linalg.norm(np.roll(c.reshape(4, 2), 1, axis=0) - c.reshape(4, 2), axis=1).min()
+            for c in corners
+        ]
+        smallest = min(sides)
+        if smallest <= 0:
+            return
+
+        desired = np.clip(self.config.PYRAMID_TARGET_MARKER_PX / smallest, self.config.PYRAMID_MIN_SCALE, 1.0)
+        if desired > self.pyramid_scale:
+            # Marcador menor que o alvo: sobe a escala de uma vez para não perdê-lo nos próximos frames
+            self.pyramid_scale = float(min(np.ceil(desired * 20) / 20, 1.0))
+            return
+        # Reduções são suavizadas e arredondadas para passos de 0.05 para evitar oscilar entre frames
+        scale = 0.7 * self.pyramid_scale + 0.3 * desired
+        self.pyramid_scale = float(np.clip(round(scale * 20) / 20, self.config.PYRAMID_MIN_SCALE, 1.0))
+
+    def _find_markers_roi(self, gray):
+        """
+        Detecta marcadores apenas em regiões ao redor dos marcadores do frame anterior
+
+        Uma varredura completa é feita a cada ROI_FULL_SCAN_INTERVAL frames, quando não há
+        marcadores rastreados ou quando algum marcador rastreado não é encontrado nas regiões.
+        """
+        self._frames_since_full_scan += 1
+        if not self._tracked_corners or self._frames_since_full_scan >= self.config.ROI_FULL_SCAN_INTERVAL:
+            return self._full_scan_and_track(gray)
+
+        found = {}
+        for x0, y0, x1, y1 in self._build_rois(gray.shape):
+            roi_corners, roi_ids, _ = self.detector.detectMarkers(gray[y0:y1, x0:x1])
+            if roi_ids is None:
+                continue
+            offset = np.array([x0, y0], dtype=np.float32)
+            for corner, marker_id in zip(roi_corners, roi_ids.flatten()):
+                found.setdefault(int(marker_id), corner + offset)
+        self.detection_stats["roi_scans"] += 1
+
+        # Marcador rastreado sumiu das regiões: procura no frame inteiro
+        if not set(self._tracked_corners).issubset(found):
+            self.detection_stats["roi_misses"] += 1
+            return self._full_scan_and_track(gray, found)
+
+        self._tracked_corners = found
+        return self._pack_markers(found)
+
+    def _full_scan_and_track(self, gray, roi_found=None):
+        """
+        Varredura completa que atualiza os marcadores rastreados
+
+        Os marcadores já reencontrados nas regiões neste frame (`roi_found`) continuam
+        rastreados mesmo que a varredura completa não os encontre; os novos IDs da varredura
+        são acrescentados.
+        """
+        corners, ids = self._find_markers_full(gray)
+        self._frames_since_full_scan = 0
+        tracked = {}
+        if ids is not None:
+            for corner, marker_id in zip(corners, ids.flatten()):
+                tracked.setdefault(int(marker_id), corner)
+        if not roi_found or set(roi_found).issubset(tracked):
+            self._tracked_corners = tracked
+            return corners, ids
+
+        for marker_id, corner in roi_found.items():
+            tracked.setdefault(marker_id, corner)
+        self._tracked_corners = tracked
+        return self._pack_markers(tracked)
+
+    def _build_rois(self, shape):
+        """Monta as regiões de busca (x0, y0, x1, y1) ao redor dos marcadores rastreados, unindo as sobrepostas"""
+        height, width = shape[:2]
+        rois = []
+        for corner in self._tracked_corners.values():
+            pts = corner.reshape(4, 2)
+            x_min, y_min = pts.min(axis=0)
+            x_max, y_max = pts.max(axis=0)
+            pad = max(x_max - x_min, y_max - y_min) * self.config.ROI_PADDING_RATIO + self.config.ROI_PADDING_MIN_PX
+            rois.append([
+                max(int(x_min - pad), 0), max(int(y_min - pad), 0),
+                min(int(x_max + pad) + 1, width), min(int(y_max + pad) + 1, height)
+            ])
+
+        # Une regiões sobrepostas para não detectar o mesmo trecho duas vezes
+        merged = True
+        while merged and len(rois) > 1:
+            merged = False
+            for i in range(len(rois)):
+                for j in range(i + 1, len(rois)):
+                    a, b = rois[i], rois[j]
+                    if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                        rois[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                        del rois[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        return rois
+
+    @staticmethod
+    def _pack_markers(markers):
+        """Converte {id: cantos} para o formato (corners, ids) retornado por detectMarkers"""
+        if not markers:
+            return (), None
+        ids = np.array(list(markers.keys()), dtype=np.int32).reshape(-1, 1)
+        return tuple(markers.values()), ids
+
+    def close(self):
+        """Encerra o pool de threads da detecção em blocos"""
+        if self._tile_pool is not None:
+            self._tile_pool.shutdown(wait=False)
+            self._tile_pool = None
+
+    def get_detection_stats(self):
+        """Retorna contadores das varreduras feitas pelo detector"""
+        stats = dict(self.detection_stats, mode=self.detection_mode)
+        if self.pyramid_enabled:
+            stats["pyramid_scale"] = self.pyramid_scale
+        return stats
+
+    def _reuse_last_posicoes(self):
+        """Retorna uma cópia das últimas posições detectadas, mantendo os gatos como ativos"""
+        current_time = time.time()
+        for dados in self._last_posicoes.values():
+            if dados["tipo"] == "gato" and dados["id"] in self.cat_last_seen:
+                self.cat_last_seen[dados["id"]] = current_time
+        return {key: dict(dados) for key, dados in self._last_posicoes.items()}
+
+    def get_motion_gate_stats(self):
+        """Retorna estatísticas do filtro de movimento (None se desabilitado)"""
+        if self.motion_gate is None:
+            return None
+        return self.motion_gate.get_stats()
+
     def _draw_cached_bowl_indicator(self, frame, position):
         """Desenha um indicador visual quando está usando posição em cache do pote"""
         # Projeta a posição 3D para 2D na tela
@@ -278,16 +688,15 @@ class MarkerDetector:
         for cat_id in inactive_cats:
             self.detected_cats.pop(cat_id, None)
             self.cat_last_seen.pop(cat_id, None)
+            if self.pose_filters is not None:
+                self.pose_filters.remove(cat_id)
 
         return len(inactive_cats)
 
     def reset_bowl_cache(self):
-        """Reseta o cache de posição do pote"""
-        self.bowl_position_cache = {
-            "position": None,
-            "last_detected": None,
-            "last_updated": None,
-            "detection_count": 0,
-            "is_reliable": False
-        }
-        self.logger.info("Cache de posição do pote resetado")
\ No newline at end of file
+        """Reseta o cache de posição de todas as zonas"""
+        self.zone_position_caches = {zone_id: self._new_zone_cache() for zone_id in self.zone_registry.ids()}
+        if self.pose_filters is not None:
+            for zone_id in self.zone_registry.ids():
+                self.pose_filters.remove(zone_id)
+        self.logger.info("Cache de posição das zonas resetado")
\ No newline at end of file
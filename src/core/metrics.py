@@ -0,0 +1,299 @@
+import os
+import time
+import bisect
+import threading
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Etapas medidas; cada (etapa, câmera) tem um histograma próprio
+STAGES = (
+    "capture_grab",         # grab() dos frames pendentes da câmera
+    "capture_decode",       # retrieve()/read(): decodificação do frame publicado
+    "detect_grayscale",     # conversão para escala de cinza
+    "detect_markers",       # busca dos marcadores ArUco
+    "detect_pose",          # estimativa de pose em lote
+    "track_update",         # ActivityTracker.update
+    "draw_info",            # DisplayManager.draw_info
+    "jpeg_encode",          # redução e codificação JPEG do streaming
+    "api_request",          # requisições HTTP à API
+    "capture_to_decision",  # da publicação do frame capturado até a atualização das atividades
+)
+
+# Limites superiores (segundos) dos buckets; o último bucket (+Inf) fica implícito
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.0075, 0.01, 0.025, 0.05, 0.075,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class _NullTimer:
+    """Cronômetro usado quando as métricas estão desabilitadas: não mede nada"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """Mede com relógio monotônico o tempo do bloco `with` e registra no histograma"""
+
+    __slots__ = ("_metrics", "_stage", "_camera_id", "_start")
+
+    def __init__(self, metrics: "LatencyMetrics", stage: str, camera_id: Optional[int]):
+        self._metrics = metrics
+        self._stage = stage
+        self._camera_id = camera_id
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._metrics.observe(self._stage, time.perf_counter() - self._start, self._camera_id)
+        return False
+
+
+class LatencyMetrics:
+    """
+    Histogramas de latência por etapa e por câmera, com buckets fixos.
+
+    Cada observação custa uma busca binária nos limites dos buckets e três incrementos em
+    arrays numpy pré-alocados; nada cresce com o tempo de execução. Os arrays podem ficar em
+    memória compartilhada (`create(shared=True)`): os processos das câmeras e o processo
+    principal registram as suas etapas e o processo de streaming lê todos os histogramas para
+    o /metrics. Cada (etapa, câmera) é escrita por um único processo; dentro do processo um
+    lock evita perder incrementos entre threads.
+
+    A câmera None identifica as medições que não pertencem a uma câmera (por exemplo, as
+    requisições à API no modo de várias câmeras).
+    """
+
+    MAGIC = 0x4D54414C  # "LATM"
+    _HEADER = np.dtype([("magic", "<i8"), ("rows", "<i8"), ("buckets", "<i8"), ("reserved", "<i8", (5,))])
+
+    def __init__(self, camera_ids: Iterable[int], buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 shm: Optional[shared_memory.SharedMemory] = None, owner: bool = False):
+        """Use `create()` ou `attach()`"""
+        self.camera_ids = [int(camera_id) for camera_id in camera_ids]
+        self.buckets = tuple(float(bound) for bound in buckets)
+        if list(self.buckets) != sorted(set(self.buckets)):
+            raise ValueError("Os limites dos buckets precisam ser crescentes e distintos")
+
+        # Linha de cada (etapa, câmera); a câmera None ocupa o primeiro bloco de linhas
+        self._camera_index: Dict[Optional[int], int] = {None: 0}
+        for camera_id in self.camera_ids:
+            self._camera_index.setdefault(camera_id, len(self._camera_index))
+        self._stage_index = {stage: i for i, stage in enumerate(STAGES)}
+        rows = len(self._camera_index) * len(STAGES)
+        columns = len(self.buckets) + 1
+
+        self._shm = shm
+        self._owner_pid = os.getpid() if owner else None
+        if shm is None:
+            self._header = None
+            self._counts = np.zeros((rows, columns), dtype=np.int64)
+            self._sums = np.zeros(rows, dtype=np.float64)
+        else:
+            self._header = np.ndarray((), dtype=self._HEADER, buffer=shm.buf)
+            if self._header["magic"] != self.MAGIC or self._header["rows"] != rows \
+                    or self._header["buckets"] != columns:
+                self._header = None
+                shm.close()
+                raise ValueError(f"Memória compartilhada '{shm.name}' não corresponde a estas métricas")
+            offset = self._HEADER.itemsize
+            self._counts = np.ndarray((rows, columns), dtype=np.int64, buffer=shm.buf, offset=offset)
+            self._sums = np.ndarray((rows,), dtype=np.float64, buffer=shm.buf,
+                                    offset=offset + self._counts.nbytes)
+
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, camera_ids: Iterable[int], buckets: Sequence[float] = DEFAULT_BUCKETS,
+               shared: bool = False) -> "LatencyMetrics":
+        """
+        Cria os histogramas zerados
+
+        Args:
+            camera_ids: Câmeras monitoradas
+            buckets: Limites superiores (segundos) dos buckets
+            shared: Se True, os histogramas ficam em memória compartilhada e podem ser enviados
+                a outros processos (que os mapeiam pelo nome); o criador os remove em `close()`
+        """
+        if not shared:
+            return cls(camera_ids, buckets)
+        camera_ids = [int(camera_id) for camera_id in camera_ids]
+        rows = (len(set(camera_ids)) + 1) * len(STAGES)
+        columns = len(buckets) + 1
+        size = cls._HEADER.itemsize + rows * columns * 8 + rows * 8
+
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        header = np.ndarray((), dtype=cls._HEADER, buffer=shm.buf)
+        header["rows"] = rows
+        header["buckets"] = columns
+        header["magic"] = cls.MAGIC
+        del header
+        return cls(camera_ids, buckets, shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, camera_ids: Iterable[int], buckets: Sequence[float]) -> "LatencyMetrics":
+        """Mapeia histogramas criados por outro processo"""
+        return cls(camera_ids, buckets, shared_memory.SharedMemory(name=name))
+
+    def __reduce__(self):
+        if self._shm is None:
+            raise TypeError("Somente métricas em memória compartilhada podem ser enviadas a outro processo")
+        # Enviadas a outro processo, as métricas são mapeadas de novo pelo nome
+        return (LatencyMetrics.attach, (self._shm.name, self.camera_ids, self.buckets))
+
+    @property
+    def shared(self) -> bool:
+        return self._shm is not None
+
+    def _row(self, stage: str, camera_id: Optional[int]) -> Optional[int]:
+        camera_index = self._camera_index.get(camera_id)
+        if camera_index is None:
+            return None
+        return camera_index * len(STAGES) + self._stage_index[stage]
+
+    def observe(self, stage: str, seconds: float, camera_id: Optional[int] = None):
+        """Registra uma duração (medições de câmeras desconhecidas são ignoradas)"""
+        row = self._row(stage, camera_id)
+        if row is None or self._counts is None:
+            return
+        column = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[row, column] += 1
+            self._sums[row] += seconds
+
+    def timer(self, stage: str, camera_id: Optional[int] = None) -> _Timer:
+        return _Timer(self, stage, camera_id)
+
+    def snapshot(self, stage: str, camera_id: Optional[int] = None) -> Dict:
+        """Contagem, soma e contagens por bucket (não cumulativas, a última é o +Inf)"""
+        row = self._row(stage, camera_id)
+        if row is None:
+            raise KeyError(f"Câmera {camera_id} não está nas métricas")
+        counts = self._counts[row].tolist()
+        return {"count": sum(counts), "sum": float(self._sums[row]), "buckets": counts}
+
+    def quantile(self, stage: str, q: float, camera_id: Optional[int] = None) -> Optional[float]:
+        """
+        Estima o quantil `q` (0-1) pela interpolação linear dentro do bucket, como o
+        histogram_quantile do Prometheus
+
+        Returns:
+            float: Segundos, ou None se não há medições
+        """
+        return self._quantile(self.snapshot(stage, camera_id)["buckets"], q)
+
+    def _quantile(self, counts: List[int], q: float) -> Optional[float]:
+        total = sum(counts)
+        if total == 0:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                if i == len(self.buckets):
+                    # Acima do último limite não há como interpolar
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def render_prometheus(self, prefix: str = "cat_monitor") -> str:
+        """Histogramas (e quantis estimados) no formato de texto do Prometheus"""
+        bounds = [_format_float(bound) for bound in self.buckets] + ["+Inf"]
+        histogram = [
+            f"# HELP {prefix}_stage_latency_seconds Latência de cada etapa do processamento",
+            f"# TYPE {prefix}_stage_latency_seconds histogram"
+        ]
+        quantiles = [
+            f"# HELP {prefix}_stage_latency_quantile_seconds Quantis estimados a partir dos buckets",
+            f"# TYPE {prefix}_stage_latency_quantile_seconds gauge"
+        ]
+        for camera_id in self._camera_index:
+            for stage in STAGES:
+                snapshot = self.snapshot(stage, camera_id)
+                if snapshot["count"] == 0:
+                    continue
+                labels = f'stage="{stage}"' if camera_id is None else f'stage="{stage}",camera="{camera_id}"'
+                cumulative = 0
+                for bound, count in zip(bounds, snapshot["buckets"]):
+                    cumulative += count
+                    histogram.append(f'{prefix}_stage_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                histogram.append(f"{prefix}_stage_latency_seconds_sum{{{labels}}} {_format_float(snapshot['sum'])}")
+                histogram.append(f"{prefix}_stage_latency_seconds_count{{{labels}}} {cumulative}")
+                for q in QUANTILES:
+                    value = self._quantile(snapshot["buckets"], q)
+                    quantiles.append(f'{prefix}_stage_latency_quantile_seconds{{{labels},quantile="{q}"}} {_format_float(value)}')
+        return "\n".join(histogram + quantiles) + "\n"
+
+    def close(self):
+        """Desfaz o mapeamento (e remove a memória, se este processo a criou)"""
+        if self._shm is None or self._counts is None:
+            return
+        # As views precisam ser liberadas antes de fechar o mapeamento
+        self._header = self._counts = self._sums = None
+        self._shm.close()
+        # Processos criados com fork herdam o objeto do criador, mas não removem a memória
+        if self._owner_pid == os.getpid():
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+# Métricas do processo atual (None = desabilitadas) e câmera padrão das medições
+_active: Optional[LatencyMetrics] = None
+_default_camera: Optional[int] = None
+
+
+def install(metrics: Optional[LatencyMetrics], camera_id: Optional[int] = None):
+    """
+    Define as métricas usadas pelos pontos de medição deste processo
+
+    Args:
+        metrics: Histogramas (None desabilita as medições)
+        camera_id: Câmera atribuída às medições que não informam a câmera (None no processo
+            que atende várias câmeras)
+    """
+    global _active, _default_camera
+    _active = metrics
+    _default_camera = camera_id
+
+
+def active() -> Optional[LatencyMetrics]:
+    return _active
+
+
+def timer(stage: str, camera_id: Optional[int] = None):
+    """Cronômetro para um bloco `with`; sem métricas instaladas não mede nada"""
+    metrics = _active
+    if metrics is None:
+        return _NULL_TIMER
+    return metrics.timer(stage, _default_camera if camera_id is None else camera_id)
+
+
+def observe(stage: str, seconds: float, camera_id: Optional[int] = None):
+    """Registra uma duração já medida (ignorado sem métricas instaladas)"""
+    metrics = _active
+    if metrics is not None:
+        metrics.observe(stage, seconds, _default_camera if camera_id is None else camera_id)
@@ -0,0 +1,85 @@
+import cv2
+import time
+import numpy as np
+
+
+class MotionGate:
+    """
+    Filtro de movimento barato para evitar a detecção ArUco em frames estáticos.
+
+    Cada frame é reduzido para uma miniatura em escala de cinza e comparado com a
+    miniatura do frame em que a última detecção completa foi feita. Se a fração de
+    pixels alterados não passar do limite, a detecção pode ser pulada. Uma detecção
+    completa é forçada a cada `max_skip_seconds` para que o resultado em cache não
+    fique desatualizado.
+    """
+
+    def __init__(self, size=(64, 36), pixel_threshold=10, changed_ratio=0.002, max_skip_seconds=2.0):
+        """
+        Args:
+            size: Tamanho (largura, altura) da miniatura comparada
+            pixel_threshold: Diferença mínima de intensidade para considerar um pixel alterado
+            changed_ratio: Fração de pixels alterados a partir da qual há movimento
+            max_skip_seconds: Intervalo máximo sem uma detecção completa
+        """
+        self.size = tuple(size)
+        self.pixel_threshold = pixel_threshold
+        self.changed_ratio = changed_ratio
+        self.max_skip_seconds = max_skip_seconds
+
+        self._reference = None
+        self._last_detection_time = None
+
+        # Estatísticas
+        self.frames_checked = 0
+        self.frames_skipped = 0
+        self.last_changed_ratio = 0.0
+
+    def _thumbnail(self, frame):
+        # Reduz primeiro (INTER_AREA já faz a média dos blocos) e só depois converte para cinza
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def should_detect(self, frame, now: float = None) -> bool:
+        """
+        Indica se o frame precisa de uma detecção completa
+
+        Quando retorna True, o frame passa a ser a nova referência de comparação.
+        """
+        if now is None:
+            now = time.time()
+
+        self.frames_checked += 1
+        thumbnail = self._thumbnail(frame)
+
+        if self._reference is None or self._reference.shape != thumbnail.shape:
+            detect = True
+        elif now - self._last_detection_time >= self.max_skip_seconds:
+            detect = True
+        else:
+            diff = cv2.absdiff(thumbnail, self._reference)
+            self.last_changed_ratio = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+            detect = self.last_changed_ratio > self.changed_ratio
+
+        if detect:
+            self._reference = thumbnail
+            self._last_detection_time = now
+        else:
+            self.frames_skipped += 1
+        return detect
+
+    def reset(self):
+        """Descarta a referência, forçando detecção completa no próximo frame"""
+        self._reference = None
+        self._last_detection_time = None
+
+    def get_stats(self):
+        """Retorna estatísticas do filtro de movimento"""
+        return {
+            "frames_checked": self.frames_checked,
+            "frames_skipped": self.frames_skipped,
+            "skip_ratio": self.frames_skipped / self.frames_checked if self.frames_checked else 0.0,
+            "last_changed_ratio": self.last_changed_ratio
+        }
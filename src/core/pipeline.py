@@ -0,0 +1,176 @@
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class FramePacket:
+    """Dados de um frame que atravessam os estágios do pipeline"""
+
+    __slots__ = ("seq", "timestamp", "frame", "markers", "estado", "stream", "published_at")
+
+    def __init__(self, seq: int, timestamp: Optional[float], frame=None, markers: Dict = None, stream: bool = False,
+                 published_at: Optional[float] = None):
+        self.seq = seq  # Sequência do frame no buffer circular da câmera
+        self.timestamp = timestamp  # Timestamp de captura (base time.time())
+        self.published_at = published_at  # Publicação do frame no buffer (time.perf_counter())
+        self.frame = frame  # Cópia própria do frame (None quando ninguém vai desenhar nele)
+        self.markers = markers if markers is not None else {}
+        self.estado = None  # Cópia do estado do rastreador para o desenho
+        self.stream = stream  # Se o frame deve ser enviado ao streaming
+
+
+class StageQueue:
+    """
+    Fila limitada entre dois estágios do pipeline com política de backpressure própria.
+
+    Políticas:
+        block: o produtor espera espaço na fila (nenhum item é perdido)
+        drop_oldest: o item mais antigo é descartado para abrir espaço (o consumidor
+            sempre recebe o mais recente)
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+
+    # Retornado por get() quando a fila foi encerrada e esvaziada
+    CLOSED = object()
+
+    def __init__(self, name: str, maxsize: int = 1, policy: str = BLOCK):
+        if maxsize < 1:
+            raise ValueError("A fila do pipeline precisa de pelo menos 1 posição")
+        if policy not in (self.BLOCK, self.DROP_OLDEST):
+            raise ValueError(f"Política de fila desconhecida: {policy}")
+
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Estatísticas
+        self.items_put = 0
+        self.items_dropped = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    def put(self, item, stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        Coloca um item na fila
+
+        Returns:
+            bool: False se a fila foi encerrada (ou stop_event sinalizado) antes de haver espaço
+        """
+        with self._cond:
+            if self.policy == self.DROP_OLDEST:
+                while len(self._items) >= self.maxsize:
+                    self._items.popleft()
+                    self.items_dropped += 1
+            else:
+                while len(self._items) >= self.maxsize and not self._closed:
+                    if stop_event is not None and stop_event.is_set():
+                        return False
+                    self._cond.wait(0.1)
+            if self._closed:
+                return False
+
+            self._items.append(item)
+            self.items_put += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None):
+        """Retira o próximo item (None se o prazo acabar; CLOSED se encerrada e vazia)"""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if self._items:
+                item = self._items.popleft()
+                self._cond.notify_all()
+                return item
+            return self.CLOSED if self._closed else None
+
+    def close(self):
+        """Encerra a fila: os itens restantes ainda podem ser retirados"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "policy": self.policy,
+                "depth": len(self._items),
+                "max_depth": self.max_depth,
+                "put": self.items_put,
+                "dropped": self.items_dropped
+            }
+
+
+class PipelineStage:
+    """
+    Estágio do pipeline executado em uma thread própria.
+
+    Sem fila de entrada, `process(None)` é chamado repetidamente (estágio de origem). O
+    retorno de `process` vai para a fila de saída; None não produz saída e END encerra o
+    estágio. Ao terminar (ou falhar) o estágio encerra a fila de saída, propagando o fim
+    para os estágios seguintes; uma exceção também sinaliza `stop_event`.
+    """
+
+    END = object()
+
+    def __init__(self, name: str, process: Callable[[Any], Any], stop_event: threading.Event,
+                 input_queue: Optional[StageQueue] = None, output_queue: Optional[StageQueue] = None):
+        self.name = name
+        self.process = process
+        self.stop_event = stop_event
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.error = None
+        self.items_processed = 0
+        self.logger = logging.getLogger(__name__)
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"pipeline-{self.name}", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        try:
+            while not self.stop_event.is_set():
+                if self.input_queue is not None:
+                    item = self.input_queue.get(timeout=0.1)
+                    if item is StageQueue.CLOSED:
+                        break
+                    if item is None:
+                        continue
+                else:
+                    item = None
+
+                result = self.process(item)
+                if result is self.END:
+                    break
+                if item is not None or result is not None:
+                    self.items_processed += 1
+                if result is not None and self.output_queue is not None:
+                    if not self.output_queue.put(result, self.stop_event):
+                        break
+        except Exception as e:
+            self.error = e
+            self.logger.exception(f"Erro no estágio '{self.name}' do pipeline: {e}")
+            self.stop_event.set()
+        finally:
+            if self.output_queue is not None:
+                self.output_queue.close()
@@ -0,0 +1,245 @@
+import cv2
+import numpy as np
+
+
+class PoseEstimator:
+    """
+    Estimativa de pose em lote para todos os marcadores quadrados de um frame.
+
+    Métodos disponíveis:
+    - "iterative": cv2.solvePnP padrão (comportamento original)
+    - "ippe_square": cv2.solvePnP com o solver específico para marcadores quadrados
+    - "homography": homografia de 4 pontos resolvida em lote com NumPy (sem chamadas por marcador)
+    """
+
+    METHODS = ("iterative", "ippe_square", "homography")
+
+    def __init__(self, camera_matrix, dist_coeffs, method="ippe_square"):
+        if method not in self.METHODS:
+            raise ValueError(f"Método de pose desconhecido: {method}")
+
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.method = method
+        self._camera_matrix_inv = np.linalg.inv(self.camera_matrix)
+        self._has_distortion = bool(np.any(self.dist_coeffs))
+
+        # Pontos 3D dos cantos por tamanho de marcador (a ordem é a exigida pelo IPPE_SQUARE)
+        self._object_points = {}
+
+    def object_points(self, marker_size):
+        """Retorna (com cache) os cantos 3D de um marcador quadrado do tamanho informado"""
+        obj_pts = self._object_points.get(marker_size)
+        if obj_pts is None:
+            half = marker_size / 2
+            obj_pts = np.array([
+                [-half, half, 0],
+                [half, half, 0],
+                [half, -half, 0],
+                [-half, -half, 0]
+            ], dtype=np.float32)
+            self._object_points[marker_size] = obj_pts
+        return obj_pts
+
+    def estimate(self, corners, marker_sizes):
+        """
+        Estima a pose de todos os marcadores de um frame
+
+        Args:
+            corners: Sequência de cantos por marcador (formato de detectMarkers, 4 pontos cada)
+            marker_sizes: Tamanho em metros de cada marcador
+
+        Returns:
+            list: (rvec, tvec) por marcador, ou (None, None) quando a pose não foi encontrada
+        """
+        if len(corners) == 0:
+            return []
+
+        img_pts = np.asarray(corners, dtype=np.float32).reshape(-1, 4, 2)
+        if self.method == "homography":
+            return self._estimate_homography(img_pts, np.asarray(marker_sizes, dtype=np.float64))
+
+        flags = cv2.SOLVEPNP_IPPE_SQUARE if self.method == "ippe_square" else cv2.SOLVEPNP_ITERATIVE
+        poses = []
+        for pts, size in zip(img_pts, marker_sizes):
+            success, rvec, tvec = cv2.solvePnP(
+                self.object_points(size), pts,
+                self.camera_matrix, self.dist_coeffs,
+                flags=flags
+            )
+            poses.append((rvec, tvec) if success else (None, None))
+        return poses
+
+    def _normalize(self, img_pts):
+        """Converte pixels para coordenadas normalizadas da câmera (N, 4, 2)"""
+        if self._has_distortion:
+            normalized = cv2.undistortPoints(img_pts.reshape(-1, 1, 2), self.camera_matrix, self.dist_coeffs)
+            return normalized.reshape(-1, 4, 2).astype(np.float64)
+
+        homogeneous = np.concatenate([img_pts, np.ones(img_pts.shape[:2] + (1,), dtype=np.float32)], axis=2)
+        normalized = homogeneous.astype(np.float64) @ self._camera_matrix_inv.T
+        return normalized[..., :2] / normalized[..., 2:]
+
+    def _estimate_homography(self, img_pts, sizes):
+        """Resolve as homografias de todos os marcadores com uma única SVD em lote"""
+        count = len(img_pts)
+        x = x_raw = self._normalize(img_pts)
+
+        # Normalização de Hartley: centraliza os cantos de cada marcador e ajusta a escala para
+        # que o sistema DLT fique bem condicionado mesmo com marcadores de poucos pixels
+        center = x.mean(axis=1, keepdims=True)
+        spread = np.linalg.norm(x - center, axis=2).mean(axis=1)
+        norm_scale = np.sqrt(2) / np.maximum(spread, 1e-12)
+        x = (x - center) * norm_scale[:, None, None]
+
+        # Homografia do quadrado unitário para os cantos normalizados
+        unit = np.array([[-0.5, 0.5], [0.5, 0.5], [0.5, -0.5], [-0.5, -0.5]])
+        X = np.broadcast_to(unit[:, 0], (count, 4))
+        Y = np.broadcast_to(unit[:, 1], (count, 4))
+        u, v = x[..., 0], x[..., 1]
+        zeros, ones = np.zeros_like(X), np.ones_like(X)
+
+        # Sistema DLT: duas equações por canto, 8x9 por marcador
+        rows_u = np.stack([X, Y, ones, zeros, zeros, zeros, -u * X, -u * Y, -u], axis=2)
+        rows_v = np.stack([zeros, zeros, zeros, X, Y, ones, -v * X, -v * Y, -v], axis=2)
+        A = np.concatenate([rows_u, rows_v], axis=1)
+        H = np.linalg.svd(A)[2][:, -1, :].reshape(count, 3, 3)
+
+        # Desfaz a normalização da imagem e leva o quadrado unitário para o tamanho real do marcador
+        denormalize = np.zeros((count, 3, 3))
+        denormalize[:, 0, 0] = denormalize[:, 1, 1] = 1.0 / norm_scale
+        denormalize[:, :2, 2] = center[:, 0, :]
+        denormalize[:, 2, 2] = 1.0
+        H = denormalize @ H
+        H[:, :, :2] /= sizes[:, None, None]
+        obj = np.concatenate([unit[None, :, :] * sizes[:, None, None], np.zeros((count, 4, 1))], axis=2)
+
+        # Decomposição IPPE vetorizada: a rotação vem do Jacobiano da homografia no centro do marcador
+        H = H / H[:, 2:3, 2:3]
+        J = np.empty((count, 2, 2))
+        J[:, 0, 0] = H[:, 0, 0] - H[:, 2, 0] * H[:, 0, 2]
+        J[:, 0, 1] = H[:, 0, 1] - H[:, 2, 1] * H[:, 0, 2]
+        J[:, 1, 0] = H[:, 1, 0] - H[:, 2, 0] * H[:, 1, 2]
+        J[:, 1, 1] = H[:, 1, 1] - H[:, 2, 1] * H[:, 1, 2]
+        candidates = self._ippe_rotations(J, H[:, :2, 2])
+
+        # Das duas rotações possíveis (ambiguidade planar), fica a de menor erro de reprojeção
+        best_error = np.full(count, np.inf)
+        R = np.empty((count, 3, 3))
+        tvecs = np.empty((count, 3))
+        for candidate in candidates:
+            t = self._solve_translation(candidate, x_raw, obj)
+            error = self._reprojection_error(candidate, t, x_raw, obj)
+            better = error < best_error
+            R[better], tvecs[better], best_error[better] = candidate[better], t[better], error[better]
+
+        rvecs = self._rotation_to_rvec(R)
+        valid = np.isfinite(tvecs).all(axis=1) & np.isfinite(rvecs).all(axis=1)
+        return [
+            (rvecs[i].reshape(3, 1), tvecs[i].reshape(3, 1)) if valid[i] else (None, None)
+            for i in range(count)
+        ]
+
+    @staticmethod
+    def _ippe_rotations(J, v):
+        """
+        Calcula as duas rotações candidatas do IPPE (Collins & Bartoli) em lote
+
+        Args:
+            J: Jacobianos (N, 2, 2) da homografia no centro do marcador
+            v: Projeção normalizada (N, 2) do centro do marcador
+        """
+        count = len(J)
+
+        # Rv leva o eixo óptico [0, 0, 1] à direção do centro do marcador
+        v_norm = np.linalg.norm(v, axis=1)
+        s = np.sqrt(v_norm ** 2 + 1)
+        cos_theta = 1.0 / s
+        sin_theta = np.sqrt(np.maximum(1.0 - cos_theta ** 2, 0.0))
+        K = np.zeros((count, 3, 3))
+        safe = v_norm > 1e-12
+        K[safe, 0, 2] = v[safe, 0] / v_norm[safe]
+        K[safe, 1, 2] = v[safe, 1] / v_norm[safe]
+        K[safe, 2, 0] = -K[safe, 0, 2]
+        K[safe, 2, 1] = -K[safe, 1, 2]
+        Rv = np.eye(3)[None] + sin_theta[:, None, None] * K + (1 - cos_theta)[:, None, None] * (K @ K)
+
+        # A = B^-1 J, com B = [I | -v] Rv[:, :2]
+        projection = np.zeros((count, 2, 3))
+        projection[:, 0, 0] = projection[:, 1, 1] = 1.0
+        projection[:, :, 2] = -v
+        A = np.linalg.solve(projection @ Rv[:, :, :2], J)
+
+        # Maior valor singular de A (forma fechada para 2x2)
+        aat00 = A[:, 0, 0] ** 2 + A[:, 0, 1] ** 2
+        aat01 = A[:, 0, 0] * A[:, 1, 0] + A[:, 0, 1] * A[:, 1, 1]
+        aat11 = A[:, 1, 0] ** 2 + A[:, 1, 1] ** 2
+        gamma = np.sqrt(0.5 * (aat00 + aat11 + np.sqrt((aat00 - aat11) ** 2 + 4 * aat01 ** 2)))
+
+        R22 = A / gamma[:, None, None]
+        b0 = np.sqrt(np.maximum(1 - R22[:, 0, 0] ** 2 - R22[:, 1, 0] ** 2, 0.0))
+        b1 = np.sqrt(np.maximum(1 - R22[:, 0, 1] ** 2 - R22[:, 1, 1] ** 2, 0.0))
+        b1 = np.where(-R22[:, 0, 0] * R22[:, 0, 1] - R22[:, 1, 0] * R22[:, 1, 1] < 0, -b1, b1)
+
+        rotations = []
+        for sign in (1.0, -1.0):
+            columns = np.zeros((count, 3, 2))
+            columns[:, :2, :] = R22
+            columns[:, 2, 0] = sign * b0
+            columns[:, 2, 1] = sign * b1
+            third = np.cross(columns[:, :, 0], columns[:, :, 1])
+            rotations.append(Rv @ np.concatenate([columns, third[:, :, None]], axis=2))
+        return rotations
+
+    @staticmethod
+    def _reprojection_error(R, t, x, obj):
+        """Soma dos erros quadráticos de reprojeção (coordenadas normalizadas) por marcador"""
+        camera = obj @ np.transpose(R, (0, 2, 1)) + t[:, None, :]
+        projected = camera[..., :2] / camera[..., 2:]
+        error = ((projected - x) ** 2).sum(axis=(1, 2))
+        # Soluções atrás da câmera são descartadas
+        return np.where((camera[..., 2] > 0).all(axis=1), error, np.inf)
+
+    @staticmethod
+    def _solve_translation(R, x, obj):
+        """
+        Resolve t (N, 3) minimizando o erro algébrico de projeção dos cantos com a rotação R conhecida
+
+        Para cada canto: (R P + t)_x - u (R P + t)_z = 0 e (R P + t)_y - v (R P + t)_z = 0
+        """
+        rotated = obj @ np.transpose(R, (0, 2, 1))
+        u, v = x[..., 0], x[..., 1]
+        zeros, ones = np.zeros_like(u), np.ones_like(u)
+
+        A = np.concatenate([
+            np.stack([ones, zeros, -u], axis=2),
+            np.stack([zeros, ones, -v], axis=2)
+        ], axis=1)
+        b = np.concatenate([
+            u * rotated[..., 2] - rotated[..., 0],
+            v * rotated[..., 2] - rotated[..., 1]
+        ], axis=1)
+
+        At = np.transpose(A, (0, 2, 1))
+        return np.linalg.solve(At @ A, (At @ b[..., None]))[..., 0]
+
+    @staticmethod
+    def _rotation_to_rvec(R):
+        """Converte matrizes de rotação (N, 3, 3) para vetores de Rodrigues (N, 3)"""
+        cos_angle = np.clip((np.trace(R, axis1=1, axis2=2) - 1) / 2, -1.0, 1.0)
+        angle = np.arccos(cos_angle)
+        axis = np.stack([
+            R[:, 2, 1] - R[:, 1, 2],
+            R[:, 0, 2] - R[:, 2, 0],
+            R[:, 1, 0] - R[:, 0, 1]
+        ], axis=1)
+        sin_angle = np.sin(angle)
+
+        rvecs = np.zeros((len(R), 3))
+        regular = sin_angle > 1e-6
+        rvecs[regular] = axis[regular] * (angle[regular] / (2 * sin_angle[regular]))[:, None]
+
+        # Ângulos próximos de 180° são numericamente instáveis na fórmula acima
+        for i in np.flatnonzero(~regular & (angle > np.pi / 2)):
+            rvecs[i] = cv2.Rodrigues(R[i])[0].ravel()
+        return rvecs
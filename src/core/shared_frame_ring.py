@@ -0,0 +1,214 @@
+import time
+from multiprocessing import shared_memory
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class SharedFrame(NamedTuple):
+    """Frame lido do buffer compartilhado"""
+    seq: int
+    timestamp: float
+    camera_id: int
+    frame: np.ndarray
+
+
+class SharedFrameRing:
+    """
+    Buffer circular de frames em memória compartilhada entre processos.
+
+    Um único processo escritor (o pipeline da câmera) publica frames uint8 com número de
+    sequência; os leitores (o processo de streaming) mapeiam a mesma memória pelo nome e
+    copiam o frame mais recente, sem serialização nem pipes.
+
+    Layout: cabeçalho global, um cabeçalho por slot (sequência, timestamp de captura, ID da
+    câmera e formato) e os dados dos slots. Cada slot funciona como um seqlock: o escritor
+    marca a sequência como -1 enquanto escreve e o leitor descarta a cópia se a sequência
+    mudou durante a leitura.
+
+    Os leitores indicam que querem frames renovando um prazo no cabeçalho (`request_frames`);
+    sem leitores interessados o escritor não precisa publicar (`has_demand`).
+    """
+
+    MAGIC = 0x524D4143  # "CAMR"
+    ALIGNMENT = 64
+
+    _HEADER = np.dtype([
+        ("magic", "<i8"), ("num_slots", "<i8"), ("slot_bytes", "<i8"), ("latest_seq", "<i8"),
+        ("demand_until", "<f8"), ("reserved", "<i8", (3,))
+    ])
+    _SLOT_HEADER = np.dtype([
+        ("seq", "<i8"), ("timestamp", "<f8"), ("camera_id", "<i8"), ("height", "<i8"),
+        ("width", "<i8"), ("channels", "<i8"), ("reserved", "<i8", (2,))
+    ])
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        """Use `create()` ou `attach()`"""
+        self._shm = shm
+        self.owner = owner
+
+        self._header = np.ndarray((), dtype=self._HEADER, buffer=shm.buf)
+        if self._header["magic"] != self.MAGIC:
+            self._header = None
+            shm.close()
+            raise ValueError(f"Memória compartilhada '{shm.name}' não é um buffer de frames")
+
+        self.num_slots = int(self._header["num_slots"])
+        self.slot_bytes = int(self._header["slot_bytes"])
+        self._slots = np.ndarray((self.num_slots,), dtype=self._SLOT_HEADER, buffer=shm.buf,
+                                 offset=self._HEADER.itemsize)
+        data_offset = self._HEADER.itemsize + self.num_slots * self._SLOT_HEADER.itemsize
+        self._data = np.ndarray((self.num_slots, self.slot_bytes), dtype=np.uint8, buffer=shm.buf,
+                                offset=data_offset)
+
+        # Estatísticas (locais ao processo)
+        self.frames_published = 0
+        self.frames_oversized = 0
+        self.torn_reads = 0
+
+    @classmethod
+    def _slot_bytes(cls, max_frame_bytes: int) -> int:
+        return -(-int(max_frame_bytes) // cls.ALIGNMENT) * cls.ALIGNMENT
+
+    @classmethod
+    def required_bytes(cls, max_frame_bytes: int, num_slots: int = 4) -> int:
+        """Tamanho da memória compartilhada de um buffer com estes parâmetros"""
+        return cls._HEADER.itemsize + num_slots * (cls._SLOT_HEADER.itemsize + cls._slot_bytes(max_frame_bytes))
+
+    @classmethod
+    def create(cls, max_frame_bytes: int, num_slots: int = 4, name: Optional[str] = None) -> "SharedFrameRing":
+        """
+        Cria o buffer (processo escritor, responsável por removê-lo em `close()`)
+
+        Args:
+            max_frame_bytes: Tamanho máximo de um frame (altura * largura * canais)
+            num_slots: Quantidade de slots; o leitor só perde um frame em leitura se o escritor
+                publicar `num_slots` frames durante a cópia
+            name: Nome da memória compartilhada (padrão: gerado pelo sistema)
+        """
+        if num_slots < 2:
+            raise ValueError("O buffer compartilhado precisa de pelo menos 2 slots")
+        slot_bytes = cls._slot_bytes(max_frame_bytes)
+        size = cls.required_bytes(max_frame_bytes, num_slots)
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((), dtype=cls._HEADER, buffer=shm.buf)
+        header["num_slots"] = num_slots
+        header["slot_bytes"] = slot_bytes
+        header["latest_seq"] = -1
+        header["demand_until"] = 0.0
+        slots = np.ndarray((num_slots,), dtype=cls._SLOT_HEADER, buffer=shm.buf, offset=cls._HEADER.itemsize)
+        slots["seq"] = -1
+        header["magic"] = cls.MAGIC
+        del header, slots
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedFrameRing":
+        """
+        Mapeia um buffer existente pelo nome (leitores e processos de câmera)
+
+        Os processos que mapeiam o buffer são filhos do criador e compartilham o seu
+        resource_tracker: a memória só é removida pelo criador, em `close()`, ou pelo tracker
+        se o criador terminar sem fechá-la.
+        """
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    def __reduce__(self):
+        # Enviado a outro processo, o buffer é mapeado de novo pelo nome
+        return (SharedFrameRing.attach, (self.name,))
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def latest_seq(self) -> int:
+        """Número de sequência do último frame publicado (-1 se nenhum)"""
+        return int(self._header["latest_seq"])
+
+    def request_frames(self, duration: float = 1.0):
+        """Leitor: pede frames ao escritor pelos próximos `duration` segundos"""
+        self._header["demand_until"] = time.time() + duration
+
+    def cancel_request(self):
+        self._header["demand_until"] = 0.0
+
+    def has_demand(self) -> bool:
+        """Escritor: indica se algum leitor pediu frames recentemente"""
+        return time.time() < float(self._header["demand_until"])
+
+    def publish(self, frame: np.ndarray, timestamp: float = None, camera_id: int = 0) -> Optional[int]:
+        """
+        Copia um frame uint8 para o próximo slot
+
+        Returns:
+            int: Número de sequência do frame ou None se o frame não cabe no slot
+        """
+        if frame.dtype != np.uint8:
+            raise ValueError(f"O buffer compartilhado só aceita frames uint8 (recebido {frame.dtype})")
+        if frame.nbytes > self.slot_bytes:
+            self.frames_oversized += 1
+            return None
+
+        seq = int(self._header["latest_seq"]) + 1
+        index = seq % self.num_slots
+        slots = self._slots
+
+        # Sequência -1 durante a escrita: leitores em andamento descartam a cópia
+        slots["seq"][index] = -1
+        target = self._data[index, :frame.nbytes]
+        np.copyto(target.reshape(frame.shape), frame)
+        slots["timestamp"][index] = time.time() if timestamp is None else timestamp
+        slots["camera_id"][index] = camera_id
+        slots["height"][index] = frame.shape[0]
+        slots["width"][index] = frame.shape[1]
+        slots["channels"][index] = frame.shape[2] if frame.ndim == 3 else 0
+        slots["seq"][index] = seq
+        self._header["latest_seq"] = seq
+        self.frames_published += 1
+        return seq
+
+    def read(self, after_seq: int = -1, retries: int = 3) -> Optional[SharedFrame]:
+        """
+        Copia o frame mais recente
+
+        Args:
+            after_seq: Só retorna o frame se a sequência for maior que este valor
+            retries: Novas tentativas quando o escritor sobrescreve o slot durante a cópia
+
+        Returns:
+            SharedFrame: Cópia própria do frame, ou None se não há frame novo
+        """
+        slots = self._slots
+        for _ in range(retries):
+            seq = int(self._header["latest_seq"])
+            if seq < 0 or seq <= after_seq:
+                return None
+            index = seq % self.num_slots
+            if slots["seq"][index] != seq:
+                continue
+
+            height, width, channels = int(slots["height"][index]), int(slots["width"][index]), int(slots["channels"][index])
+            timestamp, camera_id = float(slots["timestamp"][index]), int(slots["camera_id"][index])
+            shape = (height, width, channels) if channels else (height, width)
+            frame = self._data[index, :height * width * max(channels, 1)].reshape(shape).copy()
+
+            if slots["seq"][index] == seq:
+                return SharedFrame(seq, timestamp, camera_id, frame)
+            self.torn_reads += 1
+        return None
+
+    def close(self):
+        """Desfaz o mapeamento (e remove a memória, se este processo a criou)"""
+        if self._shm is None:
+            return
+        # As views precisam ser liberadas antes de fechar o mapeamento
+        self._header = self._slots = self._data = None
+        self._shm.close()
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._shm = None
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class ZoneRegistry:
+    """
+    Registro das zonas monitoradas (potes de ração, bebedouros, camas...).
+
+    Cada zona é identificada pelo ID do seu marcador ArUco e tem um tipo ("food",
+    "water", "bed", ...) que define a atividade registrada quando um gato fica perto dela.
+    """
+
+    def __init__(self, config):
+        self.activity_types = dict(getattr(config, "ZONE_ACTIVITY_TYPES", {"food": "eating"}))
+        self.zones = {}
+
+        zones = getattr(config, "ZONES", None)
+        if not zones:
+            # Configuração antiga: apenas o pote de ração
+            zones = {config.POTE_RACAO_ID: dict(config.POTE_RACAO, zona="food")}
+
+        for marker_id, zone in zones.items():
+            zone_type = zone.get("zona", "food")
+            if zone_type not in self.activity_types:
+                raise ValueError(f"Tipo de zona sem atividade associada: {zone_type} (marcador {marker_id})")
+            self.zones[int(marker_id)] = {
+                "tipo": "zona",
+                "zona": zone_type,
+                "nome": zone.get("nome", f"Zona {marker_id}"),
+                "size": zone.get("size", config.DEFAULT_MARKER_SIZE),
+                "atividade": self.activity_types[zone_type],
+                "enter_thresh": zone.get("enter_thresh", config.ENTER_THRESH),
+                "exit_thresh": zone.get("exit_thresh", config.EXIT_THRESH)
+            }
+
+        self._by_name = {zone["nome"]: zone for zone in self.zones.values()}
+        if len(self._by_name) != len(self.zones):
+            raise ValueError("Os nomes das zonas devem ser únicos")
+
+    def is_zone(self, marker_id) -> bool:
+        return marker_id in self.zones
+
+    def get(self, marker_id):
+        """Retorna a configuração da zona do marcador (ou None se o marcador for de um gato)"""
+        return self.zones.get(marker_id)
+
+    def get_by_name(self, name):
+        return self._by_name.get(name)
+
+    def ids(self):
+        return list(self.zones.keys())
+
+    @staticmethod
+    def distance_matrix(cat_positions, zone_positions):
+        """
+        Calcula as distâncias entre todos os gatos e todas as zonas de uma vez
+
+        Args:
+            cat_positions: Array (C, 3) com as posições dos gatos
+            zone_positions: Array (Z, 3) com as posições das zonas
+
+        Returns:
+            np.ndarray: Matriz (C, Z) de distâncias
+        """
+        cat_positions = np.asarray(cat_positions, dtype=np.float64).reshape(-1, 3)
+        zone_positions = np.asarray(zone_positions, dtype=np.float64).reshape(-1, 3)
+        return np.linalg.norm(cat_positions[:, None, :] - zone_positions[None, :, :], axis=2)
@@ -1,12 +1,20 @@
 import logging
 import time
 from .managers.camera_manager import CameraManager
+from .managers.camera_pipeline import CameraPipeline
+from .managers.camera_supervisor import CameraSupervisor
+from .core import metrics
 from .core.marker_detector import MarkerDetector
+from .core.metrics import LatencyMetrics
+from .core.pipeline import StageQueue
 from .tracking.activity_tracker import ActivityTracker
 from .managers.display_manager import DisplayManager
 from .api.api_client import APIClient
+from .api.circuit_breaker import CircuitBreaker
 from .tracking.activity_notifier import ActivityNotifier
+from .tracking.activity_outbox import ActivityOutbox
 from .managers.streaming_manager import StreamingManager
+from .managers.streaming_process import StreamingProcess
 
 
 # Configuração básica do logging para garantir que os logs apareçam
@@ -18,7 +26,169 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def create_activity_notifier(config) -> ActivityNotifier:
+    """Cria o cliente da API (com disjuntor, se habilitado), a fila durável e o notificador"""
+    breaker = None
+    if config.API_BREAKER_ENABLED:
+        breaker = CircuitBreaker(
+            failure_rate_threshold=config.API_BREAKER_FAILURE_RATE,
+            latency_threshold=config.API_BREAKER_LATENCY_THRESHOLD,
+            latency_percentile=config.API_BREAKER_LATENCY_PERCENTILE,
+            window_size=config.API_BREAKER_WINDOW,
+            min_requests=config.API_BREAKER_MIN_REQUESTS,
+            open_seconds=config.API_BREAKER_OPEN_SECONDS,
+            half_open_max_calls=config.API_BREAKER_HALF_OPEN_CALLS
+        )
+    if config.API_ASYNC_ENABLED:
+        # Importado apenas quando habilitado: depende do aiohttp
+        from .api.async_api_client import AsyncAPIClient
+        api_client = AsyncAPIClient(
+            config.API_BASE_URL, config.API_KEY, config.API_TIMEOUT,
+            max_connections=config.API_MAX_CONNECTIONS,
+            max_concurrency=config.API_MAX_CONCURRENCY,
+            breaker=breaker
+        )
+    else:
+        api_client = APIClient(config.API_BASE_URL, config.API_KEY, config.API_TIMEOUT, breaker=breaker)
+    outbox = ActivityOutbox(config.OUTBOX_PATH) if config.OUTBOX_ENABLED and config.API_ENABLED else None
+    return ActivityNotifier(
+        api_client, config.ACTIVITY_TYPE_MAPPING, config.API_ENABLED,
+        outbox=outbox,
+        backoff_base=config.OUTBOX_BACKOFF_BASE,
+        backoff_max=config.OUTBOX_BACKOFF_MAX,
+        max_attempts=config.OUTBOX_MAX_ATTEMPTS,
+        batch_max_size=config.OUTBOX_BATCH_MAX_SIZE if config.API_BULK_ENABLED else 1,
+        batch_max_age=config.OUTBOX_BATCH_MAX_AGE,
+        probe_in_background=config.FAST_STARTUP,
+        camera_id=config.CAMERA_ID
+    )
+
+
+def create_metrics(config, camera_id=None):
+    """
+    Cria os histogramas de latência e os instala neste processo (None se desabilitados)
+
+    Ficam em memória compartilhada quando outros processos medem etapas (câmeras) ou servem o
+    /metrics (streaming em processo separado).
+
+    Args:
+        config: Configuração
+        camera_id: Câmera atribuída às medições deste processo (None com várias câmeras)
+    """
+    if not getattr(config, "METRICS_ENABLED", False):
+        return None
+    cameras = config.CAMERAS or [{"id": config.CAMERA_ID}]
+    shared = bool(config.CAMERAS) or (config.STREAMING_ENABLED and config.STREAMING_SEPARATE_PROCESS)
+    try:
+        latency_metrics = LatencyMetrics.create([camera["id"] for camera in cameras], shared=shared)
+    except Exception as e:
+        logger.error(f"Falha ao criar métricas de latência: {e}")
+        return None
+    metrics.install(latency_metrics, camera_id)
+    return latency_metrics
+
+
+def close_metrics(latency_metrics):
+    """Desinstala as métricas e libera a memória compartilhada, se houver"""
+    if latency_metrics is None:
+        return
+    metrics.install(None)
+    latency_metrics.close()
+
+
+def start_streaming(config, latency_metrics=None):
+    """
+    Cria o streaming e inicia o servidor se estiver habilitado (captura erros localmente)
+
+    Com STREAMING_SEPARATE_PROCESS o servidor roda em outro processo (StreamingProcess), que
+    recebe os frames por memória compartilhada; caso contrário roda em uma thread deste processo.
+    """
+    if config.STREAMING_ENABLED and config.STREAMING_SEPARATE_PROCESS:
+        streaming_manager = StreamingProcess(config, latency_metrics)
+    else:
+        streaming_manager = StreamingManager(config)
+    try:
+        if getattr(config, "STREAMING_ENABLED", False):
+            streaming_manager.start_server()
+    except Exception as e:
+        logger.error(f"Falha ao iniciar servidor de streaming: {e}")
+    return streaming_manager
+
+
+def stop_streaming(streaming_manager):
+    """Para o servidor de streaming (e o processo e a memória compartilhada, se houver)"""
+    if not streaming_manager:
+        return
+    try:
+        streaming_manager.stop_server()
+    except Exception as e:
+        logger.error(f"Erro ao parar servidor de streaming: {e}")
+
+
+def shutdown_notifier(config, activity_notifier):
+    """Finaliza as atividades ativas e entrega o que for possível da fila durável"""
+    if not activity_notifier:
+        return
+    try:
+        activity_notifier.cleanup_all_activities()
+        logger.info("Atividades ativas finalizadas com sucesso")
+    except Exception as e:
+        logger.error(f"Erro ao finalizar atividades ativas: {e}")
+
+    # Entrega o que for possível da fila durável antes de sair
+    try:
+        activity_notifier.close(config.OUTBOX_DRAIN_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Erro ao encerrar fila de atividades: {e}")
+
+
+def run_multi_camera(config, startup_started: float):
+    """Modo de várias câmeras: um processo por câmera, notificador e streaming compartilhados"""
+    activity_notifier = None
+    streaming_manager = None
+    supervisor = None
+    latency_metrics = None
+
+    try:
+        latency_metrics = create_metrics(config)
+        activity_notifier = create_activity_notifier(config)
+        streaming_manager = start_streaming(config, latency_metrics)
+        if config.DISPLAY_ENABLED:
+            logger.info("Janela de exibição não é usada com várias câmeras; use o streaming (?camera=ID)")
+
+        supervisor = CameraSupervisor(
+            config.CAMERAS, activity_notifier, streaming_manager,
+            restart_delay=config.CAMERA_WORKER_RESTART_DELAY,
+            restart_max_delay=config.CAMERA_WORKER_RESTART_MAX_DELAY,
+            frame_queue_size=config.CAMERA_WORKER_FRAME_QUEUE_SIZE,
+            start_method=config.CAMERA_WORKER_START_METHOD,
+            latency_metrics=latency_metrics
+        )
+        supervisor.start()
+        logger.info(f"Supervisor de {len(config.CAMERAS)} câmeras iniciado em {time.monotonic() - startup_started:.2f}s")
+        supervisor.run()
+
+    except KeyboardInterrupt:
+        logger.info("Interrupção pelo usuário. Finalizando sistema...")
+    except Exception as e:
+        logger.error(f"Erro inesperado: {e}")
+    finally:
+        logger.info("Iniciando processo de finalização do sistema...")
+
+        # Encerra os processos das câmeras antes de finalizar as atividades
+        if supervisor:
+            supervisor.stop()
+            for camera_id, stats in supervisor.stats().items():
+                logger.info(f"Câmera {camera_id}: {stats['restarts']} reinícios")
+
+        shutdown_notifier(config, activity_notifier)
+        stop_streaming(streaming_manager)
+        close_metrics(latency_metrics)
+        logger.info("Sistema finalizado")
+
+
 def main():
+    startup_started = time.monotonic()
     try:
         from config.config import Config
         config = Config()
@@ -26,61 +196,61 @@ def main():
         logger.error(f"Erro ao carregar configuração: {e}")
         return
 
+    if config.CAMERAS:
+        run_multi_camera(config, startup_started)
+        return
+
     camera_manager = None
     marker_detector = None
     activity_tracker = None
     display_manager = None
-    api_client = None
     activity_notifier = None
     streaming_manager = None
+    pipeline = None
+    latency_metrics = None
 
     try:
+        latency_metrics = create_metrics(config, config.CAMERA_ID)
         camera_manager = CameraManager(config)
         marker_detector = MarkerDetector(config)
         activity_tracker = ActivityTracker(config)
         display_manager = DisplayManager(config)
-        api_client = APIClient(config.API_BASE_URL, config.API_KEY, config.API_TIMEOUT)
-        activity_notifier = ActivityNotifier(api_client, config.ACTIVITY_TYPE_MAPPING, config.API_ENABLED)
-        streaming_manager = StreamingManager(config)
-
-        # Inicia o servidor de streaming se estiver habilitado (captura erros localmente)
-        try:
-            if getattr(config, "STREAMING_ENABLED", False):
-                streaming_manager.start_server()
-        except Exception as e:
-            logger.error(f"Falha ao iniciar servidor de streaming: {e}")
+        activity_notifier = create_activity_notifier(config)
+        streaming_manager = start_streaming(config, latency_metrics)
 
         activity_tracker.set_activity_notifier(activity_notifier)
 
-        logger.info("Sistema iniciado com sucesso")
+        logger.info(f"Sistema iniciado com sucesso em {time.monotonic() - startup_started:.2f}s")
 
         # Configura a janela de exibição apenas se estiver habilitada
         if config.DISPLAY_ENABLED:
             display_manager.setup_window()
 
-        while True:
-            frame = camera_manager.get_frame()
+        def consumers():
+            # Sem janela local nem clientes do stream, desenho, cópia e envio para o streaming
+            # são pulados
+            stream_active = streaming_manager.has_viewers()
+            return display_manager.is_active or stream_active, stream_active
 
-            if frame is None:
-                # Frame inválido ou câmera desconectada, aguarda um pouco antes de tentar novamente
-                time.sleep(0.1)
-                continue
-
-            markers = marker_detector.detect_markers(frame)
-            activity_tracker.update(markers)
-            activity_tracker.cleanup_inactive_cats(list(markers.keys()))
+        pipeline = CameraPipeline(config, camera_manager, marker_detector, activity_tracker, consumers)
+        pipeline.start()
 
-            # Limpa gatos inativos do detector também (apenas uma vez por frame)
-            cleaned_count = marker_detector.cleanup_inactive_cats()
-            if cleaned_count > 0:
-                logger.debug(f"Limpados {cleaned_count} gatos inativos do detector")
+        # Estágio de renderização na thread principal (exigência das janelas do OpenCV)
+        while not pipeline.stop_event.is_set():
+            packet = pipeline.next_render(timeout=0.1)
+            if packet is StageQueue.CLOSED:
+                break
+            if packet is None:
+                continue
 
             # Desenha informações e atualiza o frame do streaming
-            display_manager.draw_info(frame, markers, activity_tracker.estado, marker_detector)
-            streaming_manager.update_frame(frame)
+            display_manager.draw_info(packet.frame, packet.markers, packet.estado, marker_detector)
+            if packet.stream:
+                # O frame já é uma cópia própria do pipeline e não precisa ser copiado de novo
+                streaming_manager.update_frame(packet.frame, copy=False, timestamp=packet.timestamp)
 
-            # Exibe o frame; se a interface solicitar saída, encerra o loop
-            if display_manager.show_frame(frame):
+            # Exibe o frame; se a interface solicitar saída, encerra o pipeline
+            if display_manager.show_frame(packet.frame):
                 break
 
     except KeyboardInterrupt:
@@ -90,13 +260,11 @@ def main():
     finally:
         logger.info("Iniciando processo de finalização do sistema...")
 
-        # Finaliza todas as atividades ativas
-        if activity_notifier:
-            try:
-                activity_notifier.cleanup_all_activities()
-                logger.info("Atividades ativas finalizadas com sucesso")
-            except Exception as e:
-                logger.error(f"Erro ao finalizar atividades ativas: {e}")
+        # Encerra os estágios do pipeline antes de finalizar as atividades do rastreador
+        if pipeline:
+            pipeline.stop()
+
+        shutdown_notifier(config, activity_notifier)
 
         # Libera recursos da câmera
         if camera_manager:
@@ -106,6 +274,16 @@ def main():
             except Exception as e:
                 logger.error(f"Erro ao liberar recursos da câmera: {e}")
 
+        # Encerra as threads de detecção em blocos
+        if marker_detector:
+            try:
+                marker_detector.close()
+            except Exception as e:
+                logger.error(f"Erro ao encerrar o detector de marcadores: {e}")
+
+        stop_streaming(streaming_manager)
+        close_metrics(latency_metrics)
+
         # Limpa interface
         if display_manager:
             try:
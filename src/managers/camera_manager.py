@@ -1,8 +1,10 @@
-import cv2
 import time
 import logging
 import threading
 import numpy as np
+from ..core import metrics
+from ..core.frame_ring_buffer import FrameRingBuffer
+from .frame_sources import create_frame_source
 
 class CameraManager:
     def __init__(self, config):
@@ -24,12 +26,29 @@ class CameraManager:
 
         self.reconnecting = False  # Flag para indicar se está reconectando
 
-        # Correção: definir frame_lock e variáveis para captura contínua
-        self.frame_lock = threading.Lock()
-        self.latest_frame = None
+        # Tentativas de conexão; a espera entre elas é interrompida por release()
+        self.connect_retries = getattr(config, "CAMERA_CONNECT_RETRIES", 5)
+        self.connect_retry_delay = getattr(config, "CAMERA_CONNECT_RETRY_DELAY", 5.0)
+        self._stop_event = threading.Event()
+
+        # Fonte de frames (RTSP, vídeo gravado, imagens ou sintética)
+        self.source_kind = getattr(config, "FRAME_SOURCE", None) or "rtsp"
+        self.source_factory = create_frame_source
+        self.source_exhausted = False
+
+        # Buffer circular de frames compartilhado com os consumidores (sem cópias)
+        self.frame_ring = FrameRingBuffer(getattr(config, "CAMERA_FRAME_RING_SLOTS", 4))
         self.running = True
         self.capture_thread = None
 
+        # Decodifica apenas o frame publicado (grab()/retrieve()) em vez de read() em todos
+        self.decode_on_demand = getattr(config, "CAMERA_DECODE_ON_DEMAND", True)
+
+        # Contadores de frames lidos do buffer (grab) e efetivamente decodificados
+        self.stats_lock = threading.Lock()
+        self.frames_grabbed = 0
+        self.frames_decoded = 0
+
         self._initialize_camera_async()
 
     def _initialize_camera(self):
@@ -37,36 +56,42 @@ class CameraManager:
             if self.cap is not None:
                 self.cap.release()
                 self.cap = None
+            self.is_connected = False
 
-            self.logger.info(f"Tentando conectar na câmera RTSP...")
-
-            max_retries = 5
-            retry_delay = 5  # segundos
+        self.logger.info(f"Tentando conectar na fonte de frames ({self.source_kind})...")
 
-            for attempt in range(max_retries):
-                self.cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
-                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
-                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
-                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        # As tentativas e as esperas acontecem fora do connection_lock para não bloquear
+        # is_camera_connected() e a thread de captura
+        for attempt in range(self.connect_retries):
+            cap = self.source_factory(self.config)
 
-                if self.cap.isOpened():
+            if cap.open():
+                with self.connection_lock:
+                    if self._stop_event.is_set():
+                        cap.release()
+                        self.reconnecting = False
+                        return
+                    self.cap = cap
                     self.is_connected = True
-                    self.logger.info("Conexão com a câmera estabelecida com sucesso.")
-                    self.reconnecting = False
-                    # Iniciar thread de captura contínua
-                    if self.capture_thread is None or not self.capture_thread.is_alive():
-                        self.running = True
-                        self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
-                        self.capture_thread.start()
-                    return
-                else:
-                    self.logger.warning(f"Falha ao conectar na câmera. Tentativa {attempt + 1} de {max_retries}.")
-                    time.sleep(retry_delay)
+                self.logger.info("Conexão com a câmera estabelecida com sucesso.")
+                self.reconnecting = False
+                # Iniciar thread de captura contínua
+                if self.capture_thread is None or not self.capture_thread.is_alive():
+                    self.running = True
+                    self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+                    self.capture_thread.start()
+                return
+
+            cap.release()
+            self.logger.warning(f"Falha ao conectar na câmera. Tentativa {attempt + 1} de {self.connect_retries}.")
+            if self._stop_event.wait(self.connect_retry_delay):
+                self.reconnecting = False
+                return
 
-            self.is_connected = False
-            self.last_error = "Falha ao conectar na câmera após várias tentativas."
-            self.logger.error(self.last_error)
-            self.reconnecting = False
+        self.is_connected = False
+        self.last_error = "Falha ao conectar na câmera após várias tentativas."
+        self.logger.error(self.last_error)
+        self.reconnecting = False
 
     def _initialize_camera_async(self):
         if self.reconnecting:
@@ -110,14 +135,20 @@ class CameraManager:
                 time.sleep(0.1)
                 continue
 
-            ret, frame = cap.read()
+            # Só fontes ao vivo descartam frames acumulados; replays entregam todos os frames
+            discard_frames = max_discard_frames if cap.is_live else 0
 
-            # Descarta frames da buffer sem loop apertado
-            for _ in range(max_discard_frames):
-                ret2, frame2 = cap.read()
-                if not ret2:
-                    break
-                frame = frame2
+            if self.decode_on_demand:
+                # Decodifica diretamente no próximo slot livre do buffer circular
+                buffer = self.frame_ring.writable_slot()
+                ret, frame = self._grab_latest_frame(cap, discard_frames, buffer)
+            else:
+                ret, frame = self._read_latest_frame(cap, discard_frames)
+
+            if not ret and cap.exhausted:
+                self.logger.info("Fonte de frames chegou ao fim.")
+                self.source_exhausted = True
+                break
 
             if not ret or not self._is_frame_valid(frame):
                 self.consecutive_failures += 1
@@ -133,14 +164,73 @@ class CameraManager:
 
             self.consecutive_failures = 0
 
-            with self.frame_lock:
-                self.latest_frame = frame
+            self.frame_ring.publish(frame, cap.last_timestamp)
 
-            time.sleep(0.04)  # ~25 FPS, menos agressivo
+            # Replays já controlam o próprio ritmo (tempo real ou o mais rápido possível)
+            if cap.is_live:
+                time.sleep(0.04)  # ~25 FPS, menos agressivo
         self.logger.info("Capture thread stopped.")
+
+    def _read_latest_frame(self, cap, max_discard_frames):
+        """Lê o frame mais recente decodificando todos os frames descartados (read())"""
+        # read() obtém e decodifica de uma vez: tudo conta como decodificação
+        with metrics.timer("capture_decode"):
+            ret, frame = cap.read()
+            grabbed = decoded = 1
+
+            # Descarta frames da buffer sem loop apertado
+            for _ in range(max_discard_frames):
+                ret2, frame2 = cap.read()
+                if not ret2:
+                    break
+                grabbed += 1
+                decoded += 1
+                frame = frame2
+
+        self._count_frames(grabbed, decoded)
+        return ret, frame
+
+    def _grab_latest_frame(self, cap, max_discard_frames, buffer=None):
+        """Esvazia o buffer com grab() e decodifica apenas o último frame com retrieve()"""
+        with metrics.timer("capture_grab"):
+            if not cap.grab():
+                return False, None
+            grabbed = 1
+
+            # Descarta frames da buffer sem decodificá-los
+            for _ in range(max_discard_frames):
+                if not cap.grab():
+                    break
+                grabbed += 1
+
+        # retrieve() decodifica o último frame obtido com sucesso pelo grab()
+        with metrics.timer("capture_decode"):
+            if buffer is not None:
+                ret, frame = cap.retrieve(buffer)
+            else:
+                ret, frame = cap.retrieve()
+        self._count_frames(grabbed, 1)
+        return ret, frame
+
+    def _count_frames(self, grabbed, decoded):
+        with self.stats_lock:
+            self.frames_grabbed += grabbed
+            self.frames_decoded += decoded
+
+    def get_capture_stats(self):
+        """Retorna os contadores de frames lidos do buffer e decodificados"""
+        with self.stats_lock:
+            return {
+                "decode_on_demand": self.decode_on_demand,
+                "frames_grabbed": self.frames_grabbed,
+                "frames_decoded": self.frames_decoded,
+                "frames_skipped": self.frames_grabbed - self.frames_decoded
+            }
+
     def release(self):
         self.logger.info("Releasing camera manager resources.")
         self.running = False
+        self._stop_event.set()
         if self.capture_thread is not None:
             self.capture_thread.join(timeout=5)
             if self.capture_thread.is_alive():
@@ -153,10 +243,35 @@ class CameraManager:
             self.is_connected = False
 
     def get_frame(self):
-        with self.frame_lock:
-            if self.latest_frame is None:
-                return None
-            return self.latest_frame.copy()
+        """Retorna uma cópia do último frame capturado"""
+        lease = self.frame_ring.acquire()
+        if lease is None:
+            return None
+        with lease:
+            return lease.frame.copy()
+
+    def get_frame_lease(self, after_seq=-1):
+        """
+        Pega emprestado o último frame capturado sem copiá-lo
+
+        O frame do empréstimo é somente leitura e deve ser devolvido com `release()`
+        (ou usando o empréstimo como context manager).
+
+        Args:
+            after_seq: Sequência do último frame já processado pelo consumidor
+
+        Returns:
+            FrameLease: Empréstimo do frame ou None se não há frame mais novo que `after_seq`
+        """
+        return self.frame_ring.acquire(after_seq)
+
+    def get_latest_seq(self):
+        """Retorna a sequência do último frame capturado (-1 se nenhum)"""
+        return self.frame_ring.latest_seq
+
+    def is_source_exhausted(self):
+        """Indica se uma fonte gravada terminou e não há mais frames a capturar"""
+        return self.source_exhausted
 
     def is_camera_connected(self):
         with self.connection_lock:
@@ -175,6 +290,7 @@ class CameraManager:
 
     def release(self):
         self.running = False
+        self._stop_event.set()
         if self.capture_thread is not None:
             self.capture_thread.join(timeout=2)
 
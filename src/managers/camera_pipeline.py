@@ -0,0 +1,120 @@
+import time
+import logging
+import threading
+from typing import Callable, Optional, Tuple
+from ..core import metrics
+from ..core.pipeline import FramePacket, PipelineStage, StageQueue
+
+
+class CameraPipeline:
+    """
+    Pipeline de uma câmera: detecção -> rastreamento -> (renderização pelo chamador).
+
+    Detecção e rastreamento rodam em threads próprias ligadas por filas limitadas: o
+    rastreamento nunca perde frames (block) e a renderização fica só com o mais recente
+    (drop_oldest). Os pacotes a desenhar são retirados com `next_render()`, normalmente na
+    thread principal (exigência das janelas do OpenCV).
+
+    `consumers()` é consultado a cada frame e retorna (renderizar, enviar ao streaming);
+    sem consumidores o frame não é copiado nem repassado para a renderização.
+    """
+
+    def __init__(self, config, camera_manager, marker_detector, activity_tracker,
+                 consumers: Callable[[], Tuple[bool, bool]], stop_event: Optional[threading.Event] = None):
+        self.config = config
+        self.camera_manager = camera_manager
+        self.marker_detector = marker_detector
+        self.activity_tracker = activity_tracker
+        self.consumers = consumers
+        self.stop_event = stop_event or threading.Event()
+        self.logger = logging.getLogger(__name__)
+
+        # O marcador de teste é desenhado no frame pelo detector, que então precisa de uma cópia
+        self.debug_marker = getattr(config, "DEBUG_SHOW_TEST_MARKER", False)
+        self._last_seq = -1
+        self._was_rendering = None
+
+        # Rastreamento nunca perde frames (block); a renderização fica só com o mais recente
+        self.track_queue = StageQueue("track", getattr(config, "PIPELINE_TRACK_QUEUE_SIZE", 64), StageQueue.BLOCK)
+        self.render_queue = StageQueue("render", getattr(config, "PIPELINE_RENDER_QUEUE_SIZE", 1), StageQueue.DROP_OLDEST)
+        self.stages = [
+            PipelineStage("detect", self._detect_stage, self.stop_event, output_queue=self.track_queue),
+            PipelineStage("track", self._track_stage, self.stop_event,
+                          input_queue=self.track_queue, output_queue=self.render_queue)
+        ]
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def next_render(self, timeout: float = 0.1):
+        """Próximo pacote a desenhar (None se o prazo acabar; StageQueue.CLOSED no fim do pipeline)"""
+        return self.render_queue.get(timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """Encerra os estágios e registra as estatísticas das filas"""
+        self.stop_event.set()
+        for stage in self.stages:
+            stage.join(timeout)
+            if stage.is_alive():
+                self.logger.warning(f"Estágio '{stage.name}' do pipeline não terminou dentro do prazo")
+        for queue in (self.track_queue, self.render_queue):
+            stats = queue.stats()
+            self.logger.info(f"Fila '{queue.name}' do pipeline: {stats['put']} frames, {stats['dropped']} descartados, profundidade máxima {stats['max_depth']}")
+
+    def _detect_stage(self, _):
+        """Estágio de detecção: pega o frame mais recente da câmera e detecta os marcadores"""
+        lease = self.camera_manager.get_frame_lease(self._last_seq)
+
+        if lease is None:
+            # Replays (vídeo/imagens) encerram o pipeline quando a fonte termina
+            if self.camera_manager.is_source_exhausted():
+                self.logger.info("Fonte de frames finalizada. Encerrando pipeline.")
+                return PipelineStage.END
+
+            # Sem frame novo ou câmera desconectada, aguarda um pouco antes de tentar novamente
+            time.sleep(0.1 if self._last_seq < 0 else 0.005)
+            return None
+
+        # O empréstimo é mantido durante a detecção para que o slot não seja sobrescrito
+        with lease:
+            self._last_seq = lease.seq
+
+            # Consumidores consultados a cada frame: um novo cliente é atendido já no frame seguinte
+            frame_is_rendered, stream_active = self.consumers()
+            if frame_is_rendered != self._was_rendering:
+                self.logger.info("Renderização de frames retomada" if frame_is_rendered
+                                 else "Nenhum consumidor de frames: renderização suspensa")
+                self._was_rendering = frame_is_rendered
+
+            frame_needs_copy = frame_is_rendered or self.debug_marker
+            frame = lease.frame.copy() if frame_needs_copy else lease.frame
+
+            markers = self.marker_detector.detect_markers(frame, lease.timestamp)
+
+            # Limpa gatos inativos do detector (apenas uma vez por frame, na thread do detector)
+            cleaned_count = self.marker_detector.cleanup_inactive_cats()
+            if cleaned_count > 0:
+                self.logger.debug(f"Limpados {cleaned_count} gatos inativos do detector")
+
+            return FramePacket(
+                lease.seq, lease.timestamp,
+                frame=frame if frame_is_rendered else None,
+                markers=markers,
+                stream=stream_active,
+                published_at=lease.published_at
+            )
+
+    def _track_stage(self, packet: FramePacket):
+        """Estágio de rastreamento: atualiza as atividades com o timestamp de captura"""
+        self.activity_tracker.update(packet.markers, packet.timestamp)
+        self.activity_tracker.cleanup_inactive_cats(list(packet.markers.keys()), packet.timestamp)
+        if packet.published_at is not None:
+            # Relógio monotônico: vale também para replays, cujos timestamps seguem o vídeo
+            metrics.observe("capture_to_decision", time.perf_counter() - packet.published_at)
+
+        if packet.frame is None:
+            return None
+        # Cópia rasa do estado: a renderização lê enquanto o rastreador segue para o próximo frame
+        packet.estado = {cat_id: dict(zonas) for cat_id, zonas in self.activity_tracker.estado.items()}
+        return packet
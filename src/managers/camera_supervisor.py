@@ -0,0 +1,391 @@
+import sys
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from ..core import metrics
+from ..core.metrics import LatencyMetrics
+from ..core.pipeline import StageQueue
+from ..core.shared_frame_ring import SharedFrameRing
+from .camera_pipeline import CameraPipeline
+
+
+def apply_camera_overrides(config, camera: Dict):
+    """
+    Aplica à configuração as definições próprias de uma câmera
+
+    "url" vira RTSP_URL e "id" vira CAMERA_ID; as demais chaves em maiúsculas substituem a
+    configuração de mesmo nome.
+    """
+    config.CAMERA_ID = int(camera["id"])
+    for key, value in camera.items():
+        if key == "url":
+            config.RTSP_URL = value
+        elif key.isupper():
+            setattr(config, key, value)
+    return config
+
+
+class ActivityEventForwarder:
+    """
+    Notificador usado no processo de uma câmera: repassa o início e o fim das atividades ao
+    supervisor, que os entrega ao notificador compartilhado com o ID da câmera.
+    """
+
+    # Só grava na fila entre processos: o rastreador pode chamar direto do seu estágio
+    non_blocking = True
+
+    def __init__(self, event_queue, camera_id: int):
+        self.event_queue = event_queue
+        self.camera_id = camera_id
+
+    def notify_activity_start(self, cat_id: int, activity_type: str, timestamp: datetime = None) -> bool:
+        self.event_queue.put(("start", self.camera_id, int(cat_id), activity_type, timestamp or datetime.now()))
+        return True
+
+    def notify_activity_end(self, cat_id: int, activity_type: str,
+                            start_time: datetime = None, end_time: datetime = None) -> bool:
+        self.event_queue.put(("end", self.camera_id, int(cat_id), activity_type, end_time or datetime.now()))
+        return True
+
+
+class QueueFrameSink:
+    """
+    Destino dos frames de uma câmera quando o streaming roda no processo do supervisor: os
+    frames vão por uma fila entre processos (serializados) e são descartados se ela estiver cheia
+    """
+
+    def __init__(self, frame_queue, demand):
+        self.frame_queue = frame_queue
+        self.demand = demand  # multiprocessing.Value ligado pelo supervisor quando há clientes
+
+    def has_demand(self) -> bool:
+        return bool(self.demand.value)
+
+    def publish(self, frame, timestamp: float = None, camera_id: int = 0):
+        try:
+            self.frame_queue.put_nowait((camera_id, frame, timestamp))
+        except queue.Full:
+            pass
+
+
+def camera_worker_main(camera: Dict, event_queue, frame_sink, stop_event,
+                       latency_metrics: Optional[LatencyMetrics] = None):
+    """
+    Processo de uma câmera: captura, detecção e rastreamento próprios
+
+    As atividades vão para `event_queue` e, enquanto `frame_sink` tiver demanda, os frames
+    desenhados são publicados nele (no SharedFrameRing da câmera, quando o streaming roda em
+    processo separado, ou em um QueueFrameSink). As latências das etapas vão para
+    `latency_metrics` (memória compartilhada), com o ID da câmera. Termina com código 0 quando
+    a fonte de frames acaba ou o supervisor pede o encerramento e com código 1 em caso de falha.
+    """
+    camera_id = int(camera["id"])
+    metrics.install(latency_metrics, camera_id)
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f'%(asctime)s - %(name)s - %(levelname)s - [câmera {camera_id}] %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+
+    # Frames são descartáveis: o processo não espera o supervisor consumi-los para terminar
+    if isinstance(frame_sink, QueueFrameSink):
+        frame_sink.frame_queue.cancel_join_thread()
+
+    from config.config import Config
+    from .camera_manager import CameraManager
+    from .display_manager import DisplayManager
+    from ..core.marker_detector import MarkerDetector
+    from ..tracking.activity_tracker import ActivityTracker
+
+    camera_manager = None
+    marker_detector = None
+    pipeline = None
+    failed = False
+
+    try:
+        config = apply_camera_overrides(Config(), camera)
+        # Janela, streaming e API ficam com o supervisor
+        config.DISPLAY_ENABLED = False
+        config.STREAMING_ENABLED = False
+        config.API_ENABLED = False
+
+        camera_manager = CameraManager(config)
+        marker_detector = MarkerDetector(config)
+        activity_tracker = ActivityTracker(config)
+        display_manager = DisplayManager(config)
+        activity_tracker.set_activity_notifier(ActivityEventForwarder(event_queue, camera_id))
+
+        def consumers():
+            streaming = frame_sink.has_demand()
+            return streaming, streaming
+
+        pipeline = CameraPipeline(config, camera_manager, marker_detector, activity_tracker, consumers)
+        pipeline.start()
+        logger.info("Processo da câmera iniciado")
+
+        while not stop_event.is_set():
+            packet = pipeline.next_render(timeout=0.1)
+            if packet is StageQueue.CLOSED:
+                break
+            if packet is None:
+                continue
+
+            display_manager.draw_info(packet.frame, packet.markers, packet.estado, marker_detector)
+            frame_sink.publish(packet.frame, packet.timestamp, camera_id)
+
+    except KeyboardInterrupt:
+        # O Ctrl+C chega a todo o grupo de processos; o supervisor coordena o encerramento
+        pass
+    except Exception as e:
+        logger.exception(f"Erro no processo da câmera: {e}")
+        failed = True
+    finally:
+        if pipeline is not None:
+            pipeline.stop()
+            failed = failed or any(stage.error is not None for stage in pipeline.stages)
+        if camera_manager is not None:
+            camera_manager.release()
+        if marker_detector is not None:
+            marker_detector.close()
+        # Só desfaz o mapeamento do buffer recebido pelo nome (no fork o objeto é o do dono)
+        if isinstance(frame_sink, SharedFrameRing) and not frame_sink.owner:
+            frame_sink.close()
+        if latency_metrics is not None:
+            latency_metrics.close()
+
+    if failed:
+        sys.exit(1)
+
+
+class _CameraWorker:
+    """Estado, no supervisor, do processo de uma câmera"""
+
+    def __init__(self, camera: Dict, frame_sink):
+        self.camera = camera
+        self.camera_id = int(camera["id"])
+        self.frame_sink = frame_sink
+        self.process = None
+        self.started_at = 0.0
+        self.next_start_at = 0.0
+        self.restarts = 0
+        self.failures = 0  # Falhas seguidas (define a espera até o próximo reinício)
+        self.finished = False
+        self.last_exitcode = None
+
+
+class CameraSupervisor:
+    """
+    Supervisor de várias câmeras, cada uma em um processo próprio.
+
+    Cada processo executa captura, detecção e rastreamento da sua câmera (ver
+    `camera_worker_main`) e envia ao supervisor os eventos de atividade. O supervisor entrega os
+    eventos ao notificador compartilhado com o ID real da câmera.
+
+    Quando alguém assiste ao stream da câmera, os frames desenhados vão direto para o buffer em
+    memória compartilhada da câmera se o streaming roda em processo separado (StreamingProcess);
+    caso contrário passam pelo supervisor até o StreamingManager.
+
+    Um processo que termina com falha é reiniciado com espera crescente, sem afetar as demais
+    câmeras; as atividades que ele deixou abertas são finalizadas. Um processo que termina
+    normalmente (fonte de frames esgotada) não é reiniciado.
+    """
+
+    EXIT_EVENT = "exit"
+
+    def __init__(self, cameras: List[Dict], activity_notifier, streaming_manager=None,
+                 restart_delay: float = 2.0, restart_max_delay: float = 60.0, frame_queue_size: int = 2,
+                 start_method: str = "spawn", worker_target: Optional[Callable] = None,
+                 latency_metrics: Optional[LatencyMetrics] = None):
+        """
+        Inicializa o supervisor
+
+        Args:
+            cameras: Câmeras ({"id": ..., "url": ..., configurações próprias em maiúsculas})
+            activity_notifier: Notificador compartilhado por todas as câmeras
+            streaming_manager: Streaming que recebe os frames de cada câmera (opcional)
+            restart_delay: Espera (segundos) antes do primeiro reinício de um processo com falha
+            restart_max_delay: Espera máxima entre reinícios; um processo que ficou no ar por
+                esse tempo volta à espera inicial na próxima falha
+            frame_queue_size: Frames por câmera aguardando o streaming
+            start_method: Método de criação dos processos do multiprocessing
+            worker_target: Função executada em cada processo (padrão: camera_worker_main)
+            latency_metrics: Métricas em memória compartilhada enviadas aos processos das câmeras
+        """
+        camera_ids = [int(camera["id"]) for camera in cameras]
+        if not camera_ids:
+            raise ValueError("Nenhuma câmera configurada")
+        if len(set(camera_ids)) != len(camera_ids):
+            raise ValueError(f"IDs de câmera repetidos: {camera_ids}")
+
+        self.activity_notifier = activity_notifier
+        self.streaming_manager = streaming_manager
+        self.restart_delay = restart_delay
+        self.restart_max_delay = restart_max_delay
+        self.worker_target = worker_target or camera_worker_main
+        self.latency_metrics = latency_metrics
+        self.logger = logging.getLogger(__name__)
+
+        self._ctx = multiprocessing.get_context(start_method)
+        self._stop_event = self._ctx.Event()
+        self._event_queue = self._ctx.Queue()
+        self._frame_queue = self._ctx.Queue(maxsize=max(1, frame_queue_size * len(cameras)))
+        rings = getattr(streaming_manager, "rings", None) or {}
+        self.workers: Dict[int, _CameraWorker] = {}
+        for camera in cameras:
+            camera_id = int(camera["id"])
+            frame_sink = rings.get(camera_id) or QueueFrameSink(self._frame_queue, self._ctx.Value("b", 0, lock=False))
+            self.workers[camera_id] = _CameraWorker(camera, frame_sink)
+
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Inicia as threads de entrega e os processos de todas as câmeras"""
+        self._threads = [
+            threading.Thread(target=self._pump_events, name="camera-supervisor-events", daemon=True),
+            threading.Thread(target=self._pump_frames, name="camera-supervisor-frames", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        for worker in self.workers.values():
+            self._start_worker(worker)
+
+    def run(self, poll_interval: float = 0.2):
+        """Supervisiona os processos até stop() ou até todas as câmeras terminarem normalmente"""
+        while not self._stopping.is_set() and not self._stop_event.is_set():
+            if self.poll():
+                self.logger.info("Todas as câmeras terminaram")
+                return
+            self._stopping.wait(poll_interval)
+
+    def poll(self) -> bool:
+        """
+        Verifica os processos uma vez: repassa a demanda do streaming e reinicia os que falharam
+
+        Returns:
+            bool: True se todas as câmeras terminaram normalmente
+        """
+        now = time.monotonic()
+        for worker in self.workers.values():
+            if self.streaming_manager is not None and isinstance(worker.frame_sink, QueueFrameSink):
+                worker.frame_sink.demand.value = 1 if self.streaming_manager.has_viewers(worker.camera_id) else 0
+
+            if worker.process is not None and worker.process.exitcode is not None:
+                self._handle_exit(worker, now)
+            if worker.process is None and not worker.finished and now >= worker.next_start_at \
+                    and not self._stop_event.is_set():
+                self._start_worker(worker)
+        return all(worker.finished for worker in self.workers.values())
+
+    def stop(self, timeout: float = 10.0):
+        """Encerra os processos (forçando após `timeout`) e entrega os eventos pendentes"""
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        for worker in self.workers.values():
+            process = worker.process
+            if process is None:
+                continue
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                self.logger.warning(f"Processo da câmera {worker.camera_id} não terminou dentro do prazo; forçando encerramento")
+                process.terminate()
+                process.join(1.0)
+            worker.last_exitcode = process.exitcode
+            worker.process = None
+
+        # As threads de entrega só param depois de esvaziar a fila de eventos
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(5.0)
+        self._threads = []
+
+    def stats(self) -> Dict[int, Dict]:
+        """Estado do processo de cada câmera"""
+        return {
+            camera_id: {
+                "alive": worker.process is not None and worker.process.is_alive(),
+                "pid": worker.process.pid if worker.process is not None else None,
+                "restarts": worker.restarts,
+                "finished": worker.finished,
+                "last_exitcode": worker.last_exitcode
+            }
+            for camera_id, worker in self.workers.items()
+        }
+
+    def _start_worker(self, worker: _CameraWorker):
+        worker.process = self._ctx.Process(
+            target=self.worker_target,
+            args=(worker.camera, self._event_queue, worker.frame_sink, self._stop_event, self.latency_metrics),
+            name=f"camera-{worker.camera_id}",
+            daemon=True
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        self.logger.info(f"Processo da câmera {worker.camera_id} iniciado (PID {worker.process.pid})")
+
+    def _handle_exit(self, worker: _CameraWorker, now: float):
+        """Trata o fim de um processo: finaliza as atividades abertas e agenda o reinício se falhou"""
+        exitcode = worker.process.exitcode
+        worker.process.join()
+        worker.process = None
+        worker.last_exitcode = exitcode
+
+        # Na mesma fila dos eventos: as atividades são finalizadas depois dos eventos que o
+        # processo enviou antes de terminar
+        self._event_queue.put((self.EXIT_EVENT, worker.camera_id))
+
+        if exitcode == 0:
+            worker.finished = True
+            self.logger.info(f"Processo da câmera {worker.camera_id} terminou")
+            return
+
+        if now - worker.started_at >= self.restart_max_delay:
+            worker.failures = 0
+        worker.failures += 1
+        worker.restarts += 1
+        delay = min(self.restart_delay * (2 ** (worker.failures - 1)), self.restart_max_delay)
+        worker.next_start_at = now + delay
+        self.logger.warning(f"Processo da câmera {worker.camera_id} terminou com código {exitcode}; reiniciando em {delay:.1f}s (reinício nº {worker.restarts})")
+
+    def _dispatch_event(self, event: tuple):
+        kind, camera_id = event[0], event[1]
+        if kind == self.EXIT_EVENT:
+            finished = self.activity_notifier.cleanup_all_activities(camera_id=camera_id)
+            if finished:
+                self.logger.info(f"{finished} atividades da câmera {camera_id} finalizadas após o fim do processo")
+            return
+
+        _, _, cat_id, activity_type, timestamp = event
+        if kind == "start":
+            self.activity_notifier.notify_activity_start(cat_id, activity_type, timestamp, camera_id=camera_id)
+        else:
+            self.activity_notifier.notify_activity_end(cat_id, activity_type, end_time=timestamp, camera_id=camera_id)
+
+    def _pump_events(self):
+        """Entrega ao notificador os eventos de atividade de todas as câmeras, em ordem"""
+        while True:
+            try:
+                event = self._event_queue.get(timeout=0.2)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            try:
+                self._dispatch_event(event)
+            except Exception as e:
+                self.logger.error(f"Erro ao entregar evento de atividade da câmera {event[1]}: {e}")
+
+    def _pump_frames(self):
+        """Repassa ao streaming os frames desenhados de cada câmera (QueueFrameSink)"""
+        while not self._stopping.is_set():
+            try:
+                camera_id, frame, timestamp = self._frame_queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if self.streaming_manager is not None:
+                # O frame veio de outro processo e já é uma cópia própria
+                self.streaming_manager.update_frame(frame, copy=False, camera_id=camera_id, timestamp=timestamp)
@@ -1,6 +1,6 @@
 import cv2
 import time
-import numpy as np
+from ..core import metrics
 
 class DisplayManager:
     """Classe responsável pela exibição e interface visual"""
@@ -29,18 +29,19 @@ class DisplayManager:
         if not self.config.DISPLAY_INFO_ENABLED:
             return
 
-        # Desenha informações dos marcadores detectados
-        self._draw_marker_info(frame, posicoes)
+        with metrics.timer("draw_info"):
+            # Desenha informações dos marcadores detectados
+            self._draw_marker_info(frame, posicoes)
 
-        # Desenha distâncias
-        self._draw_distances(frame, posicoes, estado)
+            # Desenha distâncias
+            self._draw_distances(frame, posicoes, estado)
 
-        # Desenha estado de alimentação
-        self._draw_feeding_status(frame, estado)
+            # Desenha estado de alimentação
+            self._draw_feeding_status(frame, estado)
 
-        # Desenha informações do cache do pote se disponível
-        if marker_detector is not None:
-            self._draw_bowl_cache_info(frame, marker_detector)
+            # Desenha informações do cache do pote se disponível
+            if marker_detector is not None:
+                self._draw_bowl_cache_info(frame, marker_detector)
     
     def _draw_marker_info(self, frame, posicoes):
         """Desenha informações dos marcadores detectados"""
@@ -49,9 +50,11 @@ class DisplayManager:
             # Verifica se é do cache
             from_cache = dados.get('from_cache', False)
             cache_indicator = " [CACHE]" if from_cache else ""
+            if dados.get('predicted', False):
+                cache_indicator = " [PREVISTO]"
 
             text = f"{nome} (ID: {dados['id']}) - {dados['tipo'].upper()}{cache_indicator}"
-            color = (0, 255, 255) if dados['tipo'] == 'pote' else (255, 0, 255)
+            color = (0, 255, 255) if dados['tipo'] == 'zona' else (255, 0, 255)
 
             # Se for do cache, usa cor diferente
             if from_cache:
@@ -65,53 +68,50 @@ class DisplayManager:
             y_offset += 25
     
     def _draw_distances(self, frame, posicoes, estado):
-        """Desenha as distâncias entre gatos e pote"""
-        pote_nome = self.config.POTE_RACAO["nome"]
-        if pote_nome not in posicoes:
-            return
-
+        """Desenha as distâncias entre gatos e zonas"""
         # Posiciona no canto inferior direito
         frame_height, frame_width = frame.shape[:2]
         y_offset = frame_height - 30  # Começa 30 pixels acima da borda inferior
 
-        for cat_id, potes in estado.items():
+        for cat_id, zonas in estado.items():
             # Verifica se o gato ainda está sendo detectado
             if cat_id not in posicoes:
                 continue
 
-            dados = potes[pote_nome]
-            if len(dados["distancias"]) == 0:
-                continue
+            for zona_nome, dados in zonas.items():
+                if zona_nome not in posicoes or dados.amostras == 0:
+                    continue
 
-            dist_media = np.mean(dados["distancias"])
-            text = f"Gato ID {cat_id}: {dist_media*100:.1f} cm"
+                # Média móvel já calculada pelo ActivityTracker
+                text = f"Gato ID {cat_id} - {zona_nome}: {dados.dist_media*100:.1f} cm"
 
-            # Calcula a largura do texto para posicioná-lo corretamente à direita
-            text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
-            x_position = frame_width - text_size[0] - 10  # 10 pixels da borda direita
+                # Calcula a largura do texto para posicioná-lo corretamente à direita
+                text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
+                x_position = frame_width - text_size[0] - 10  # 10 pixels da borda direita
+
+                cv2.putText(
+                    frame, text,
+                    (x_position, y_offset),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2
+                )
+                y_offset -= 40  # Move para cima para a próxima linha
 
-            cv2.putText(
-                frame, text,
-                (x_position, y_offset),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2
-            )
-            y_offset -= 40  # Move para cima para o próximo gato
-    
     def _draw_feeding_status(self, frame, estado):
-        """Desenha o status de alimentação"""
-        pote_nome = self.config.POTE_RACAO["nome"]
+        """Desenha o status das atividades em cada zona"""
         y_offset = frame.shape[0] - 60
 
-        for cat_id, potes in estado.items():
-            dados = potes[pote_nome]
+        for cat_id, zonas in estado.items():
+            ativas = [dados for dados in zonas.values() if dados.em_atividade]
 
-            if dados["comendo"]:
+            if ativas:
                 agora = time.time()
-                dur = agora - dados["start_time"]
-                text = f"Gato ID {cat_id} COMENDO ({dur:.1f}s)"
+                text = ", ".join(
+                    f"{dados.atividade.upper()} ({agora - dados.start_time:.1f}s)" for dados in ativas
+                )
+                text = f"Gato ID {cat_id} {text}"
                 color = (0, 0, 255)  # Vermelho
             else:
-                text = f"Gato ID {cat_id} NAO COMENDO"
+                text = f"Gato ID {cat_id} SEM ATIVIDADE"
                 color = (255, 255, 255)  # Branco
 
             cv2.putText(
@@ -166,12 +166,16 @@ class DisplayManager:
                     cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1
                 )
 
+    @property
+    def is_active(self):
+        """Indica se a janela local consome os frames (exibição habilitada)"""
+        return self.config.DISPLAY_ENABLED
+
     def show_frame(self, frame):
         """Exibe o frame e verifica se deve sair"""
-        # Verifica se a exibição está habilitada
+        # Sem janela (headless) não há teclado para consultar com waitKey
         if not self.config.DISPLAY_ENABLED:
-            # Mesmo quando a janela não é mostrada, verificamos se deve sair (por exemplo, por timeout)
-            return cv2.waitKey(1) & 0xFF == ord('q')
+            return False
 
         # Mostra a janela e marca que ela foi criada
         cv2.imshow(self.config.WINDOW_NAME, frame)
@@ -180,4 +184,7 @@ class DisplayManager:
 
     def cleanup(self):
         """Limpa recursos da interface"""
-        cv2.destroyAllWindows()
\ No newline at end of file
+        # Em modo headless nenhuma janela foi criada (e builds sem GUI não implementam a chamada)
+        if self.window_created:
+            cv2.destroyAllWindows()
+            self.window_created = False
\ No newline at end of file
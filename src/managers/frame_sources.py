@@ -0,0 +1,348 @@
+import os
+import cv2
+import glob
+import time
+import logging
+import numpy as np
+from abc import ABC, abstractmethod
+
+
+class FrameSource(ABC):
+    """
+    Interface comum das fontes de frames usadas pelo CameraManager.
+
+    Segue o modelo do cv2.VideoCapture: `grab()` avança para o próximo frame sem
+    decodificá-lo e `retrieve()` decodifica o último frame obtido. Cada frame obtido
+    carrega um timestamp de captura em `last_timestamp` (segundos, base time.time()).
+    """
+
+    # Fontes ao vivo descartam frames acumulados no buffer; replays entregam todos
+    is_live = False
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.last_timestamp = None
+        self.exhausted = False
+
+    @abstractmethod
+    def open(self) -> bool:
+        """Abre a fonte; retorna True se ela está pronta para fornecer frames"""
+
+    @abstractmethod
+    def is_opened(self) -> bool:
+        """Indica se a fonte está aberta"""
+
+    @abstractmethod
+    def grab(self) -> bool:
+        """Avança para o próximo frame sem decodificá-lo"""
+
+    @abstractmethod
+    def retrieve(self, buffer=None):
+        """Decodifica o último frame obtido, se possível dentro de `buffer`"""
+
+    def release(self):
+        pass
+
+    def read(self, buffer=None):
+        """Equivalente a grab() seguido de retrieve()"""
+        if not self.grab():
+            return False, None
+        return self.retrieve(buffer)
+
+    def frames(self):
+        """Itera sobre (frame, timestamp) até a fonte se esgotar"""
+        while True:
+            ret, frame = self.read()
+            if not ret:
+                return
+            yield frame, self.last_timestamp
+
+
+class RTSPFrameSource(FrameSource):
+    """Câmera RTSP via FFmpeg"""
+
+    is_live = True
+
+    def __init__(self, url, width=None, height=None, buffer_size=1):
+        super().__init__()
+        self.url = url
+        self.width = width
+        self.height = height
+        self.buffer_size = buffer_size
+        self.cap = None
+
+    def open(self) -> bool:
+        self.cap = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        if self.width and self.height:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        return self.cap.isOpened()
+
+    def is_opened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def grab(self) -> bool:
+        if self.cap is None or not self.cap.grab():
+            return False
+        self.last_timestamp = time.time()
+        return True
+
+    def retrieve(self, buffer=None):
+        if buffer is not None:
+            return self.cap.retrieve(buffer)
+        return self.cap.retrieve()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class _ReplayFrameSource(FrameSource):
+    """Base das fontes gravadas/sintéticas, com ritmo em tempo real ou o mais rápido possível"""
+
+    def __init__(self, fps=25.0, realtime=False, loop=False):
+        super().__init__()
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self._start_time = None
+        self._media_offset = 0.0
+
+    def _reset_clock(self):
+        self._start_time = time.time()
+        self._media_offset = 0.0
+
+    def _stamp(self, media_time):
+        """Define o timestamp do frame e, em tempo real, espera até o instante dele"""
+        media_time += self._media_offset
+        timestamp = self._start_time + media_time
+        if self.realtime:
+            delay = timestamp - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        self.last_timestamp = timestamp
+
+    def _rewind(self, duration):
+        """Reinicia a fonte em modo loop mantendo os timestamps crescentes"""
+        self._media_offset += duration
+
+
+class VideoFileFrameSource(_ReplayFrameSource):
+    """Replay de um arquivo de vídeo gravado"""
+
+    def __init__(self, path, realtime=False, loop=False):
+        super().__init__(realtime=realtime, loop=loop)
+        self.path = path
+        self.cap = None
+        self._last_media_time = 0.0
+
+    def open(self) -> bool:
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or self.fps
+        self.exhausted = False
+        self._reset_clock()
+        return True
+
+    def is_opened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def grab(self) -> bool:
+        if self.cap is None or self.exhausted:
+            return False
+
+        if not self.cap.grab():
+            if not self.loop:
+                self.exhausted = True
+                return False
+            self._rewind(self._last_media_time + 1.0 / self.fps)
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            if not self.cap.grab():
+                self.exhausted = True
+                return False
+
+        # Usa o tempo do próprio vídeo; se o container não informar, deriva do índice do frame
+        media_time = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if media_time <= 0:
+            media_time = (self.cap.get(cv2.CAP_PROP_POS_FRAMES) - 1) / self.fps
+        self._last_media_time = media_time
+        self._stamp(media_time)
+        return True
+
+    def retrieve(self, buffer=None):
+        if buffer is not None:
+            return self.cap.retrieve(buffer)
+        return self.cap.retrieve()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageSequenceFrameSource(_ReplayFrameSource):
+    """Replay de um diretório de imagens em ordem alfabética"""
+
+    EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+    def __init__(self, directory, fps=25.0, realtime=False, loop=False):
+        super().__init__(fps=fps, realtime=realtime, loop=loop)
+        self.directory = directory
+        self.files = []
+        self._index = -1
+
+    def open(self) -> bool:
+        self.files = sorted(
+            path for path in glob.glob(os.path.join(self.directory, "*"))
+            if path.lower().endswith(self.EXTENSIONS)
+        )
+        self._index = -1
+        self.exhausted = False
+        self._reset_clock()
+        if not self.files:
+            self.logger.error(f"Nenhuma imagem encontrada em: {self.directory}")
+            return False
+        return True
+
+    def is_opened(self) -> bool:
+        return bool(self.files)
+
+    def grab(self) -> bool:
+        if not self.files or self.exhausted:
+            return False
+
+        self._index += 1
+        if self._index >= len(self.files):
+            if not self.loop:
+                self.exhausted = True
+                return False
+            self._rewind(len(self.files) / self.fps)
+            self._index = 0
+
+        self._stamp(self._index / self.fps)
+        return True
+
+    def retrieve(self, buffer=None):
+        # A imagem só é decodificada aqui, mantendo grab() barato
+        frame = cv2.imread(self.files[self._index], cv2.IMREAD_COLOR)
+        if frame is None:
+            return False, None
+        if buffer is not None and buffer.shape == frame.shape:
+            np.copyto(buffer, frame)
+            frame = buffer
+        return True, frame
+
+
+class SyntheticFrameSource(_ReplayFrameSource):
+    """
+    Gera frames sintéticos com marcadores ArUco se movendo sobre um fundo com ruído.
+
+    Útil para medir o desempenho do pipeline sem câmera nem gravações.
+    """
+
+    def __init__(self, width=1920, height=1080, fps=25.0, realtime=False,
+                 marker_ids=(0, 1, 2), marker_size_px=120, num_frames=None, seed=0):
+        super().__init__(fps=fps, realtime=realtime)
+        self.width = width
+        self.height = height
+        self.marker_ids = tuple(marker_ids)
+        self.marker_size_px = marker_size_px
+        self.num_frames = num_frames
+        self.seed = seed
+
+        self._index = -1
+        self._opened = False
+        self._background = None
+        self._markers = {}
+
+    def open(self) -> bool:
+        rng = np.random.default_rng(self.seed)
+        # Fundo com ruído para que o frame passe na validação de variância
+        self._background = rng.integers(90, 166, (self.height, self.width, 3), dtype=np.uint8)
+
+        aruco_dict = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_ARUCO_ORIGINAL)
+        self._markers = {}
+        for marker_id in self.marker_ids:
+            marker = cv2.aruco.generateImageMarker(aruco_dict, marker_id, self.marker_size_px)
+            # Borda branca para que o detector encontre o contorno do marcador
+            marker = cv2.copyMakeBorder(marker, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=255)
+            self._markers[marker_id] = cv2.cvtColor(marker, cv2.COLOR_GRAY2BGR)
+
+        self._index = -1
+        self.exhausted = False
+        self._opened = True
+        self._reset_clock()
+        return True
+
+    def is_opened(self) -> bool:
+        return self._opened
+
+    def grab(self) -> bool:
+        if not self._opened or self.exhausted:
+            return False
+        self._index += 1
+        if self.num_frames is not None and self._index >= self.num_frames:
+            self.exhausted = True
+            return False
+        self._stamp(self._index / self.fps)
+        return True
+
+    def marker_position(self, slot, index):
+        """Canto superior esquerdo do marcador `slot` no frame `index` (trajetória circular)"""
+        size = self.marker_size_px + 40
+        count = max(len(self.marker_ids), 1)
+        center_x = (slot + 0.5) * self.width / count
+        center_y = self.height / 2
+        radius = min(self.width / count, self.height) / 2 - size
+        radius = max(radius, 0)
+        angle = index * 2 * np.pi / (self.fps * 10) + slot
+        x = int(np.clip(center_x + radius * np.cos(angle) - size / 2, 0, self.width - size))
+        y = int(np.clip(center_y + radius * np.sin(angle) - size / 2, 0, self.height - size))
+        return x, y
+
+    def retrieve(self, buffer=None):
+        if buffer is not None and buffer.shape == self._background.shape:
+            frame = buffer
+            np.copyto(frame, self._background)
+        else:
+            frame = self._background.copy()
+
+        for slot, marker_id in enumerate(self.marker_ids):
+            marker = self._markers[marker_id]
+            x, y = self.marker_position(slot, self._index)
+            frame[y:y + marker.shape[0], x:x + marker.shape[1]] = marker
+        return True, frame
+
+    def release(self):
+        self._opened = False
+
+
+def create_frame_source(config):
+    """
+    Cria a fonte de frames configurada em `FRAME_SOURCE`
+
+    Valores aceitos: "rtsp" (padrão), "video", "images" e "synthetic".
+    """
+    kind = (getattr(config, "FRAME_SOURCE", None) or "rtsp").lower()
+    path = getattr(config, "FRAME_SOURCE_PATH", None)
+    realtime = getattr(config, "FRAME_SOURCE_REALTIME", True)
+    loop = getattr(config, "FRAME_SOURCE_LOOP", False)
+    fps = getattr(config, "FRAME_SOURCE_FPS", 25.0)
+
+    if kind == "rtsp":
+        return RTSPFrameSource(
+            config.RTSP_URL, config.CAMERA_WIDTH, config.CAMERA_HEIGHT, config.CAMERA_BUFFER_SIZE
+        )
+    if kind == "video":
+        return VideoFileFrameSource(path, realtime=realtime, loop=loop)
+    if kind == "images":
+        return ImageSequenceFrameSource(path, fps=fps, realtime=realtime, loop=loop)
+    if kind == "synthetic":
+        return SyntheticFrameSource(
+            config.CAMERA_WIDTH, config.CAMERA_HEIGHT, fps=fps, realtime=realtime,
+            num_frames=None if loop else getattr(config, "FRAME_SOURCE_NUM_FRAMES", None)
+        )
+    raise ValueError(f"Fonte de frames desconhecida: {kind}")
@@ -0,0 +1,381 @@
+import time
+import asyncio
+import logging
+import threading
+from typing import AsyncGenerator, Dict, NamedTuple, Optional, Tuple
+
+import cv2
+
+from ..core import metrics
+
+
+class StreamVariant(NamedTuple):
+    """Largura (None = original), qualidade JPEG e FPS máximo de uma versão do stream"""
+    width: Optional[int]
+    quality: int
+    max_fps: Optional[float]
+
+
+class _Subscriber:
+    """Cliente do stream: evento asyncio sinalizado a cada novo JPEG"""
+
+    __slots__ = ("loop", "event")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.event = asyncio.Event()
+
+    def wake(self):
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            # Loop já encerrado: o cliente não existe mais
+            pass
+
+
+class _VariantState:
+    """JPEG mais recente e clientes de uma versão do stream"""
+
+    __slots__ = ("subscribers", "seq", "data", "frame_seq", "last_encode", "last_used")
+
+    def __init__(self, now: float):
+        self.subscribers = set()
+        self.seq = -1  # Sequência do JPEG desta versão
+        self.data: Optional[bytes] = None
+        self.frame_seq = -1  # Frame publicado que originou o JPEG
+        self.last_encode = 0.0
+        self.last_used = now
+
+
+class JpegBroadcaster:
+    """
+    Codifica cada novo frame em JPEG uma única vez por versão e o distribui para os clientes.
+
+    Uma versão (StreamVariant) combina largura, qualidade e FPS máximo. O loop principal
+    publica frames com `publish()`; uma thread codificadora reduz e codifica o frame mais
+    recente para cada versão que tem clientes (respeitando o FPS da versão) e acorda os
+    clientes, que aguardam a notificação em vez de consultar periodicamente. Cada cliente
+    recebe apenas o JPEG mais recente: um cliente lento perde frames intermediários sem
+    atrasar a codificação nem os demais clientes.
+
+    Versões sem clientes há mais de `variant_ttl` segundos são descartadas; no máximo
+    `max_variants` versões existem ao mesmo tempo.
+    """
+
+    def __init__(self, quality: int = 75, max_fps: float = 20.0, max_variants: int = 8,
+                 variant_ttl: float = 30.0, snapshot_ttl: float = 10.0, camera_id: Optional[int] = None):
+        """
+        Inicializa o distribuidor de JPEG
+
+        Args:
+            quality: Qualidade JPEG padrão (0-100)
+            max_fps: FPS máximo padrão e limite para as versões (None ou 0 = sem limite)
+            max_variants: Número máximo de versões simultâneas
+            variant_ttl: Tempo (segundos) que uma versão sem clientes permanece em cache
+            snapshot_ttl: Tempo (segundos) após um /snapshot.jpg em que os frames continuam
+                sendo recebidos mesmo sem clientes do stream
+            camera_id: Câmera dos frames (rótulo das métricas de codificação)
+        """
+        self.quality = quality
+        self.max_fps = max_fps or None
+        self.max_variants = max_variants
+        self.variant_ttl = variant_ttl
+        self.snapshot_ttl = snapshot_ttl
+        self.camera_id = camera_id
+        self.default_variant = StreamVariant(None, quality, self.max_fps)
+        self.logger = logging.getLogger(__name__)
+
+        self._cond = threading.Condition()
+        self._frame = None  # Frame mais recente publicado
+        self._frame_seq = -1
+        self.frame_timestamp = None  # Instante de captura (time.time()) do frame mais recente
+        self._variants: Dict[StreamVariant, _VariantState] = {}
+        self._subscriber_count = 0
+        self._last_snapshot = float("-inf")
+        self._last_publish = float("-inf")
+        self._demand_ended = float("-inf")  # Último cliente do stream desconectado
+        self._stopping = False
+        self._thread = None
+
+        # Contadores para monitoramento
+        self.frames_published = 0
+        self.frames_encoded = 0
+
+    def start(self):
+        """Inicia a thread codificadora"""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._encode_loop, name="jpeg-encoder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Encerra a thread codificadora e libera os clientes"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            subscribers = [s for state in self._variants.values() for s in state.subscribers]
+        for subscriber in subscribers:
+            subscriber.wake()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._stopping
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._cond:
+            return self._subscriber_count
+
+    @property
+    def variant_count(self) -> int:
+        with self._cond:
+            return len(self._variants)
+
+    @property
+    def has_demand(self) -> bool:
+        """Indica se há clientes do stream ou um snapshot recente (frames devem ser publicados)"""
+        with self._cond:
+            return self._subscriber_count > 0 or time.monotonic() - self._last_snapshot < self.snapshot_ttl
+
+    def variant(self, width: Optional[int] = None, quality: Optional[int] = None,
+                max_fps: Optional[float] = None) -> StreamVariant:
+        """
+        Normaliza os parâmetros pedidos por um cliente em uma versão do stream
+
+        Largura, qualidade e FPS são arredondados (múltiplos de 16 pixels, de 5 na qualidade
+        e FPS inteiro) para que pedidos parecidos compartilhem a mesma versão.
+        """
+        if width is not None:
+            width = max(64, int(round(width / 16.0)) * 16)
+        quality = self.quality if quality is None else int(min(95, max(10, round(quality / 5.0) * 5)))
+        if max_fps is None:
+            max_fps = self.max_fps
+        else:
+            max_fps = float(max(1, int(round(max_fps))))
+            if self.max_fps is not None:
+                max_fps = min(max_fps, self.max_fps)
+        return StreamVariant(width, quality, max_fps)
+
+    def publish(self, frame, timestamp: Optional[float] = None):
+        """
+        Publica um frame para codificação
+
+        O frame passa a pertencer ao distribuidor e não deve ser alterado pelo chamador.
+        Frames publicados antes de a thread codificá-los são substituídos pelo mais recente.
+        `timestamp` é o instante de captura do frame (padrão: agora).
+        """
+        with self._cond:
+            self._frame = frame
+            self.frame_timestamp = timestamp if timestamp is not None else time.time()
+            self._frame_seq += 1
+            self._last_publish = time.monotonic()
+            self.frames_published += 1
+            self._cond.notify_all()
+
+    def latest(self, variant: StreamVariant = None) -> Tuple[int, Optional[bytes]]:
+        """Retorna (sequência, JPEG) do último frame codificado da versão"""
+        with self._cond:
+            state = self._variants.get(variant or self.default_variant)
+            if state is None:
+                return -1, None
+            return state.seq, state.data
+
+    def subscribe(self, variant: StreamVariant = None) -> Tuple[_Subscriber, StreamVariant]:
+        """Registra um cliente no loop asyncio atual; retorna o cliente e a versão efetiva"""
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        with self._cond:
+            variant, state = self._variant_state(variant or self.default_variant)
+            state.subscribers.add(subscriber)
+            self._subscriber_count += 1
+            if state.data is not None:
+                # Novo cliente recebe imediatamente o último JPEG
+                subscriber.event.set()
+            self._cond.notify_all()
+        return subscriber, variant
+
+    def unsubscribe(self, subscriber: _Subscriber, variant: StreamVariant):
+        with self._cond:
+            state = self._variants.get(variant)
+            if state is not None and subscriber in state.subscribers:
+                state.subscribers.discard(subscriber)
+                state.last_used = time.monotonic()
+                self._subscriber_count -= 1
+                if self._subscriber_count == 0:
+                    self._demand_ended = state.last_used
+
+    async def frames(self, variant: StreamVariant = None) -> AsyncGenerator[bytes, None]:
+        """Gera os JPEGs da versão para um cliente, sempre o mais recente disponível"""
+        subscriber, variant = self.subscribe(variant)
+        last_seq = -1
+        try:
+            while not self._stopping:
+                await subscriber.event.wait()
+                subscriber.event.clear()
+                seq, data = self.latest(variant)
+                if data is None or seq == last_seq:
+                    continue
+                last_seq = seq
+                yield data
+        finally:
+            self.unsubscribe(subscriber, variant)
+
+    async def snapshot(self, variant: StreamVariant = None, timeout: float = 2.0) -> Optional[bytes]:
+        """
+        Retorna o JPEG do frame mais recente na versão pedida
+
+        Reutiliza o JPEG já codificado para o frame atual; caso contrário codifica em uma
+        thread do executor, fora do loop asyncio. Retorna None se nenhum frame chegar a tempo.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.snapshot_sync, variant, timeout)
+
+    def snapshot_sync(self, variant: StreamVariant = None, timeout: float = 2.0) -> Optional[bytes]:
+        """
+        Versão síncrona de snapshot() (bloqueia até haver um frame ou o prazo acabar)
+
+        Sem demanda os produtores deixam de publicar: se o último frame é anterior ao fim da
+        demanda ele está desatualizado, e o snapshot espera um frame publicado após o pedido.
+        """
+        now = time.monotonic()
+        deadline = now + timeout
+        with self._cond:
+            had_demand = self._subscriber_count > 0 or now - self._last_snapshot < self.snapshot_ttl
+            demand_ended = max(self._demand_ended, self._last_snapshot + self.snapshot_ttl)
+            min_seq = self._frame_seq if not had_demand and self._last_publish <= demand_ended else -1
+            self._last_snapshot = now
+            while (self._frame is None or self._frame_seq <= min_seq) and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if self._frame is None or self._frame_seq <= min_seq:
+                return None
+            variant, state = self._variant_state(variant or self.default_variant)
+            state.last_used = time.monotonic()
+            if state.frame_seq == self._frame_seq:
+                return state.data
+            frame, frame_seq = self._frame, self._frame_seq
+
+        data = self._encode(frame, variant)
+        if data is not None:
+            self._store(variant, frame_seq, data, time.monotonic())
+        return data
+
+    def _variant_state(self, variant: StreamVariant) -> Tuple[StreamVariant, _VariantState]:
+        """Retorna (criando se preciso) o estado da versão; chamado com o lock adquirido"""
+        state = self._variants.get(variant)
+        if state is not None:
+            return variant, state
+
+        now = time.monotonic()
+        if len(self._variants) >= self.max_variants:
+            self._evict(now, force=True)
+        if len(self._variants) >= self.max_variants and variant != self.default_variant:
+            self.logger.warning(f"Limite de {self.max_variants} versões do stream atingido; usando a versão padrão")
+            return self._variant_state(self.default_variant)
+
+        state = _VariantState(now)
+        self._variants[variant] = state
+        return variant, state
+
+    def _evict(self, now: float, force: bool = False):
+        """Remove versões sem clientes (com force, mesmo antes de variant_ttl); chamado com o lock adquirido"""
+        unused = [
+            variant for variant, state in self._variants.items()
+            if not state.subscribers and (force or now - state.last_used > self.variant_ttl)
+        ]
+        if force:
+            # Libera apenas a mais antiga para abrir espaço
+            unused = sorted(unused, key=lambda variant: self._variants[variant].last_used)[:1]
+        for variant in unused:
+            del self._variants[variant]
+            self.logger.debug(f"Versão do stream descartada: {variant}")
+
+    def _store(self, variant: StreamVariant, frame_seq: int, data: Optional[bytes], now: float) -> list:
+        """Guarda o JPEG codificado e retorna os clientes a acordar (data None = falha, frame ignorado)"""
+        with self._cond:
+            if data is not None:
+                self.frames_encoded += 1
+            state = self._variants.get(variant)
+            if state is None or frame_seq < state.frame_seq:
+                return []
+            if data is None:
+                state.frame_seq = frame_seq
+                return []
+            state.seq += 1
+            state.data = data
+            state.frame_seq = frame_seq
+            state.last_encode = now
+            return list(state.subscribers)
+
+    def _encode(self, frame, variant: StreamVariant, resized: Dict = None) -> Optional[bytes]:
+        """Reduz o frame para a largura da versão e codifica em JPEG"""
+        with metrics.timer("jpeg_encode", self.camera_id):
+            return self._resize_and_encode(frame, variant, resized)
+
+    def _resize_and_encode(self, frame, variant: StreamVariant, resized: Dict = None) -> Optional[bytes]:
+        width = variant.width
+        if width is not None and width < frame.shape[1]:
+            image = resized.get(width) if resized is not None else None
+            if image is None:
+                height = max(1, int(round(frame.shape[0] * width / frame.shape[1])))
+                image = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+                if resized is not None:
+                    resized[width] = image
+        else:
+            image = frame
+
+        # Fora do lock e fora do loop asyncio: resize e imencode liberam o GIL
+        ret, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, variant.quality])
+        if not ret:
+            self.logger.warning("Falha ao codificar frame em JPEG para o streaming")
+            return None
+        return buffer.tobytes()
+
+    def _due_variants(self, now: float) -> Tuple[list, Optional[float]]:
+        """
+        Versões com clientes que ainda não receberam o frame atual e já podem ser codificadas
+
+        Returns:
+            (versões prontas, segundos até a próxima versão ficar pronta ou None)
+        """
+        due = []
+        next_wait = None
+        if self._frame is None:
+            return due, next_wait
+        for variant, state in self._variants.items():
+            if not state.subscribers or state.frame_seq == self._frame_seq:
+                continue
+            interval = 1.0 / variant.max_fps if variant.max_fps else 0.0
+            wait = state.last_encode + interval - now
+            if wait <= 0:
+                due.append(variant)
+            elif next_wait is None or wait < next_wait:
+                next_wait = wait
+        return due, next_wait
+
+    def _encode_loop(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    now = time.monotonic()
+                    self._evict(now)
+                    due, next_wait = self._due_variants(now)
+                    if due:
+                        break
+                    # Sem versão pronta: espera novo frame, novo cliente ou o FPS da versão liberar
+                    self._cond.wait(next_wait)
+                frame, frame_seq = self._frame, self._frame_seq
+
+            # Versões com a mesma largura compartilham o frame reduzido
+            resized = {}
+            for variant in due:
+                data = self._encode(frame, variant, resized)
+                for subscriber in self._store(variant, frame_seq, data, time.monotonic()):
+                    subscriber.wake()
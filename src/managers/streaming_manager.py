@@ -1,13 +1,11 @@
-import cv2
 import time
 import logging
 import threading
-from fastapi import FastAPI, Response
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-import uvicorn
-import asyncio
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
+from ..core import metrics
+from .jpeg_broadcaster import JpegBroadcaster, StreamVariant
+
+# FastAPI e uvicorn são importados apenas quando o streaming está habilitado
 
 class StreamingManager:
     """Classe responsável por gerenciar o streaming via FastAPI"""
@@ -16,9 +14,21 @@ class StreamingManager:
         self.config = config
         self.logger = logging.getLogger(__name__)
 
-        # Frame compartilhado para streaming
-        self.current_frame = None
-        self.frame_lock = threading.Lock()
+        # Codificação única do JPEG compartilhada por todos os clientes do /stream, uma por câmera
+        cameras = getattr(config, "CAMERAS", None) or [{"id": getattr(config, "CAMERA_ID", 1)}]
+        self.broadcasters = {
+            int(camera["id"]): JpegBroadcaster(
+                quality=getattr(config, "STREAMING_JPEG_QUALITY", 75),
+                max_fps=getattr(config, "STREAMING_MAX_FPS", 20.0),
+                max_variants=getattr(config, "STREAMING_MAX_VARIANTS", 8),
+                variant_ttl=getattr(config, "STREAMING_VARIANT_TTL", 30.0),
+                camera_id=int(camera["id"])
+            )
+            for camera in cameras
+        }
+        # Câmera servida quando a requisição não informa ?camera=
+        self.default_camera_id = next(iter(self.broadcasters))
+        self.broadcaster = self.broadcasters[self.default_camera_id]
 
         # Estado do servidor
         self.server_thread = None
@@ -26,12 +36,14 @@ class StreamingManager:
 
         # Inicializa o app FastAPI apenas se o streaming estiver habilitado
         if self.config.STREAMING_ENABLED:
+            from fastapi import FastAPI
             self.app = FastAPI(title="Cat Activity Monitor Streaming API")
             self._setup_api_routes()
             self._setup_cors()
 
     def _setup_cors(self):
         """Configura CORS para permitir acesso cross-origin"""
+        from fastapi.middleware.cors import CORSMiddleware
         self.app.add_middleware(
             CORSMiddleware,
             allow_origins=["*"],
@@ -42,48 +54,106 @@ class StreamingManager:
 
     def _setup_api_routes(self):
         """Configura as rotas da API"""
+        from fastapi import HTTPException, Query, Response
+        from fastapi.responses import PlainTextResponse, StreamingResponse
+
+        def broadcaster_for(camera: Optional[int]) -> JpegBroadcaster:
+            broadcaster = self._broadcaster(camera)
+            if broadcaster is None:
+                raise HTTPException(status_code=404, detail=f"Câmera {camera} não encontrada")
+            return broadcaster
+
         @self.app.get("/")
         async def root():
             return {"message": "Cat Activity Monitor Streaming API"}
 
         @self.app.get("/stream")
-        async def video_feed():
-            """Endpoint que fornece o stream de vídeo"""
-            return StreamingResponse(self._generate_stream(), media_type="multipart/x-mixed-replace; boundary=frame")
+        async def video_feed(width: Optional[int] = Query(None, gt=0), quality: Optional[int] = Query(None, ge=1, le=100),
+                             fps: Optional[float] = Query(None, gt=0), camera: Optional[int] = None):
+            """Endpoint que fornece o stream de vídeo (câmera, largura, qualidade e FPS opcionais)"""
+            broadcaster = broadcaster_for(camera)
+            variant = broadcaster.variant(width, quality, fps)
+            return StreamingResponse(self._generate_stream(variant, broadcaster),
+                                     media_type="multipart/x-mixed-replace; boundary=frame")
+
+        @self.app.get("/snapshot.jpg")
+        async def snapshot(width: Optional[int] = Query(None, gt=0), quality: Optional[int] = Query(None, ge=1, le=100),
+                           camera: Optional[int] = None):
+            """Endpoint que fornece o frame mais recente como uma imagem JPEG"""
+            broadcaster = broadcaster_for(camera)
+            data = await broadcaster.snapshot(broadcaster.variant(width, quality))
+            if data is None:
+                return Response(status_code=503, content=b"", headers={"Retry-After": "1"})
+            return Response(content=data, media_type="image/jpeg", headers={"Cache-Control": "no-store"})
 
         @self.app.get("/health")
         async def health_check():
             """Endpoint para verificar a saúde do serviço"""
-            return {"status": "healthy", "streaming_enabled": self.config.STREAMING_ENABLED}
-
-    async def _generate_stream(self) -> AsyncGenerator[bytes, None]:
-        """Gera o stream de vídeo assíncrono"""
-        last_frame_data = None
-        while self.is_running:
-            frame_data = None
-            with self.frame_lock:
-                if self.current_frame is not None:
-                    # Converte o frame para JPEG apenas se mudou
-                    frame_id = id(self.current_frame)
-                    if frame_id != getattr(self, '_last_frame_id', None):
-                        ret, buffer = cv2.imencode('.jpg', self.current_frame, [cv2.IMWRITE_JPEG_QUALITY, 75])
-                        if ret:
-                            last_frame_data = buffer.tobytes()
-                            self._last_frame_id = frame_id
-                    frame_data = last_frame_data
-
-            if frame_data:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_data + b'\r\n')
-            
-            # Sleep mais longo para economizar CPU quando não há mudanças
-            await asyncio.sleep(0.05)  # 20 FPS máximo
-
-    def update_frame(self, frame):
-        """Atualiza o frame atual para streaming"""
-        if self.config.STREAMING_ENABLED and self.is_running:
-            with self.frame_lock:
-                self.current_frame = frame.copy()
+            broadcasters = self.broadcasters.values()
+            return {
+                "status": "healthy",
+                "streaming_enabled": self.config.STREAMING_ENABLED,
+                "viewers": sum(broadcaster.subscriber_count for broadcaster in broadcasters),
+                "frames_encoded": sum(broadcaster.frames_encoded for broadcaster in broadcasters),
+                "variants": sum(broadcaster.variant_count for broadcaster in broadcasters),
+                "cameras": {
+                    camera_id: {
+                        "viewers": broadcaster.subscriber_count,
+                        "frames_encoded": broadcaster.frames_encoded,
+                        # Idade (desde a captura) do último frame recebido
+                        "frame_age_seconds": None if broadcaster.frame_timestamp is None
+                        else time.time() - broadcaster.frame_timestamp
+                    }
+                    for camera_id, broadcaster in self.broadcasters.items()
+                }
+            }
+
+        @self.app.get("/metrics")
+        async def metrics_endpoint():
+            """Latência de cada etapa do processamento no formato de texto do Prometheus"""
+            latency_metrics = metrics.active()
+            if latency_metrics is None:
+                raise HTTPException(status_code=404, detail="Métricas desabilitadas (METRICS_ENABLED)")
+            return PlainTextResponse(latency_metrics.render_prometheus(),
+                                     media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    def _broadcaster(self, camera_id: Optional[int] = None) -> Optional[JpegBroadcaster]:
+        """Distribuidor da câmera (câmera padrão se None; None se a câmera não existe)"""
+        return self.broadcasters.get(self.default_camera_id if camera_id is None else camera_id)
+
+    async def _generate_stream(self, variant: StreamVariant = None,
+                               broadcaster: JpegBroadcaster = None) -> AsyncGenerator[bytes, None]:
+        """Gera o stream de vídeo assíncrono (aguarda cada novo JPEG do distribuidor)"""
+        broadcaster = broadcaster or self.broadcaster
+        async for frame_data in broadcaster.frames(variant):
+            if not self.is_running:
+                break
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame_data + b'\r\n')
+
+    def has_viewers(self, camera_id: Optional[int] = None):
+        """Indica se algum cliente do stream (ou snapshot recente) da câmera está consumindo frames"""
+        if not (self.config.STREAMING_ENABLED and self.is_running):
+            return False
+        broadcaster = self._broadcaster(camera_id)
+        return broadcaster is not None and broadcaster.has_demand
+
+    def update_frame(self, frame, copy=True, camera_id: Optional[int] = None, timestamp: Optional[float] = None):
+        """
+        Atualiza o frame atual para streaming
+
+        Args:
+            frame: Frame a ser transmitido
+            copy: Se False, o chamador transfere a posse do frame e ele não é copiado
+            camera_id: Câmera do frame (padrão: câmera padrão do streaming)
+            timestamp: Instante de captura do frame (padrão: agora)
+        """
+        # Sem clientes conectados nem snapshot recente não há o que codificar (nem copiar)
+        if not self.has_viewers(camera_id):
+            return
+        if copy:
+            frame = frame.copy()
+        self._broadcaster(camera_id).publish(frame, timestamp)
 
     def start_server(self):
         """Inicia o servidor FastAPI em uma thread separada"""
@@ -97,6 +167,8 @@ class StreamingManager:
 
         try:
             self.is_running = True
+            for broadcaster in self.broadcasters.values():
+                broadcaster.start()
             self.server_thread = threading.Thread(target=self._run_server, daemon=True)
             self.server_thread.start()
             self.logger.info(f"Servidor de streaming iniciado.")
@@ -107,6 +179,8 @@ class StreamingManager:
     def _run_server(self):
         """Executa o servidor FastAPI"""
         try:
+            # Importado na thread do servidor para não atrasar o início do loop principal
+            import uvicorn
             uvicorn.run(
                 self.app,
                 host=self.config.STREAMING_HOST,
@@ -122,5 +196,7 @@ class StreamingManager:
         """Para o servidor de streaming"""
         if self.is_running:
             self.is_running = False
+            for broadcaster in self.broadcasters.values():
+                broadcaster.stop()
             self.logger.info("Servidor de streaming parado")
             self.logger.info("Servidor de streaming parado")
\ No newline at end of file
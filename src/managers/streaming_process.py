@@ -0,0 +1,207 @@
+import math
+import time
+import shutil
+import logging
+import multiprocessing
+from typing import Dict, Optional
+from ..core import metrics
+from ..core.metrics import LatencyMetrics
+from ..core.shared_frame_ring import SharedFrameRing
+
+# Prazo (segundos) do pedido de frames renovado pelo processo de streaming: se ele parar, os
+# pipelines deixam de publicar sozinhos
+DEMAND_TTL = 1.0
+
+# Memória compartilhada do sistema (tmpfs); em contêineres Docker o padrão é de apenas 64 MB
+SHM_PATH = "/dev/shm"
+
+
+def check_shm_space(required_bytes: int, path: str = SHM_PATH) -> bool:
+    """
+    Verifica se a memória compartilhada comporta os buffers das câmeras
+
+    Sem espaço a criação do buffer funciona, mas o processo morre com SIGBUS na primeira
+    escrita além do limite; por isso a falta é registrada já na inicialização.
+
+    Returns:
+        bool: False se o espaço livre não basta (True se couber ou se não houver como verificar)
+    """
+    try:
+        free = shutil.disk_usage(path).free
+    except OSError:
+        return True
+    if free >= required_bytes:
+        return True
+    mb = 1024 * 1024
+    logging.getLogger(__name__).error(
+        f"Memória compartilhada insuficiente para o streaming: os buffers das câmeras precisam de "
+        f"{required_bytes / mb:.0f} MB e {path} tem {free / mb:.0f} MB livres. Aumente shm_size no "
+        f"docker-compose.yml (ou --shm-size no docker run) ou reduza STREAMING_SHM_SLOTS ou a "
+        f"resolução das câmeras"
+    )
+    return False
+
+
+def streaming_server_main(config, rings: Dict[int, SharedFrameRing], stop_event,
+                          latency_metrics: Optional[LatencyMetrics] = None):
+    """
+    Processo do servidor de streaming
+
+    Executa o StreamingManager (FastAPI/uvicorn e codificação JPEG) e repassa a ele o frame
+    mais recente de cada câmera lido da memória compartilhada, no máximo STREAMING_MAX_FPS
+    vezes por segundo e apenas das câmeras com clientes. As métricas em memória compartilhada
+    recebem as medições de todos os processos e são servidas em /metrics.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - [streaming] %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+
+    from .streaming_manager import StreamingManager
+
+    metrics.install(latency_metrics)
+    streaming_manager = StreamingManager(config)
+    streaming_manager.start_server()
+    interval = 1.0 / max(1.0, float(getattr(config, "STREAMING_MAX_FPS", 20.0)))
+    last_seqs = {camera_id: -1 for camera_id in rings}
+
+    try:
+        while not stop_event.is_set():
+            started = time.monotonic()
+            for camera_id, ring in rings.items():
+                if not streaming_manager.has_viewers(camera_id):
+                    continue
+                ring.request_frames(DEMAND_TTL)
+                shared = ring.read(last_seqs[camera_id])
+                if shared is None:
+                    continue
+                last_seqs[camera_id] = shared.seq
+                # A leitura já é uma cópia própria do frame
+                streaming_manager.update_frame(shared.frame, copy=False, camera_id=camera_id, timestamp=shared.timestamp)
+            stop_event.wait(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        # O Ctrl+C chega a todo o grupo de processos; o processo principal coordena o encerramento
+        pass
+    finally:
+        streaming_manager.stop_server()
+        for ring in rings.values():
+            ring.close()
+        if latency_metrics is not None:
+            latency_metrics.close()
+        logger.info("Processo de streaming finalizado")
+
+
+class StreamingProcess:
+    """
+    Servidor de streaming em um processo separado, alimentado por memória compartilhada.
+
+    Tem a mesma interface usada do StreamingManager (`start_server`, `has_viewers`,
+    `update_frame`, `stop_server`), mas a codificação JPEG e o servidor HTTP rodam em outro
+    processo e não disputam o GIL com a detecção. Cada câmera tem um SharedFrameRing: o
+    pipeline publica nele os frames desenhados apenas enquanto o processo de streaming pede
+    frames (há clientes assistindo àquela câmera).
+    """
+
+    def __init__(self, config, latency_metrics: Optional[LatencyMetrics] = None):
+        """
+        Cria os buffers compartilhados de cada câmera
+
+        Args:
+            config: Configuração
+            latency_metrics: Métricas em memória compartilhada servidas pelo processo de streaming
+        """
+        self.config = config
+        self.latency_metrics = latency_metrics
+        self.logger = logging.getLogger(__name__)
+
+        cameras = getattr(config, "CAMERAS", None) or [{"id": getattr(config, "CAMERA_ID", 1)}]
+        num_slots = getattr(config, "STREAMING_SHM_SLOTS", 4)
+        frame_bytes = {
+            int(camera["id"]): camera.get("CAMERA_WIDTH", config.CAMERA_WIDTH) * camera.get("CAMERA_HEIGHT", config.CAMERA_HEIGHT) * 3
+            for camera in cameras
+        }
+        check_shm_space(sum(SharedFrameRing.required_bytes(size, num_slots) for size in frame_bytes.values()))
+        self.rings: Dict[int, SharedFrameRing] = {
+            camera_id: SharedFrameRing.create(size, num_slots) for camera_id, size in frame_bytes.items()
+        }
+        self.default_camera_id = next(iter(self.rings))
+
+        self._ctx = multiprocessing.get_context(getattr(config, "CAMERA_WORKER_START_METHOD", "spawn"))
+        self._stop_event = None
+        self._oversized_logged = set()
+        self.process = None
+        self.is_running = False
+
+    def _ring(self, camera_id: Optional[int]) -> Optional[SharedFrameRing]:
+        return self.rings.get(self.default_camera_id if camera_id is None else camera_id)
+
+    def start_server(self):
+        """Inicia o processo do servidor de streaming"""
+        if not self.config.STREAMING_ENABLED:
+            self.logger.info("Streaming está desabilitado nas configurações")
+            return
+
+        if self.is_running:
+            self.logger.warning("Servidor de streaming já está em execução")
+            return
+
+        self._stop_event = self._ctx.Event()
+        self.process = self._ctx.Process(
+            target=streaming_server_main,
+            args=(self.config, self.rings, self._stop_event, self.latency_metrics),
+            name="streaming-server",
+            daemon=True
+        )
+        self.process.start()
+        self.is_running = True
+        self.logger.info(f"Processo de streaming iniciado (PID {self.process.pid})")
+
+    def has_viewers(self, camera_id: Optional[int] = None):
+        """Indica se o processo de streaming pediu frames da câmera recentemente"""
+        ring = self._ring(camera_id)
+        return self.is_running and ring is not None and ring.has_demand()
+
+    def update_frame(self, frame, copy=True, camera_id: Optional[int] = None, timestamp: Optional[float] = None):
+        """
+        Publica o frame no buffer compartilhado da câmera, com o instante de captura `timestamp`
+        (padrão: agora)
+
+        O frame é sempre copiado para a memória compartilhada; `copy` existe apenas para manter
+        a interface do StreamingManager.
+        """
+        if not self.has_viewers(camera_id):
+            return
+        ring = self._ring(camera_id)
+        if frame.nbytes > ring.slot_bytes:
+            frame = self._fit(frame, ring, camera_id)
+        ring.publish(frame, time.time() if timestamp is None else timestamp,
+                     self.default_camera_id if camera_id is None else camera_id)
+
+    def _fit(self, frame, ring: SharedFrameRing, camera_id: Optional[int]):
+        """Reduz um frame maior que o configurado para caber no slot do buffer"""
+        import cv2
+
+        if camera_id not in self._oversized_logged:
+            self._oversized_logged.add(camera_id)
+            self.logger.warning(f"Frame {frame.shape[1]}x{frame.shape[0]} maior que o configurado para o streaming; reduzindo")
+        scale = math.sqrt(ring.slot_bytes / frame.nbytes)
+        width = max(1, int(frame.shape[1] * scale))
+        height = max(1, int(frame.shape[0] * scale))
+        return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+    def stop_server(self, timeout: float = 5.0):
+        """Encerra o processo de streaming e remove a memória compartilhada"""
+        if self.process is not None:
+            self._stop_event.set()
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.logger.warning("Processo de streaming não terminou dentro do prazo; forçando encerramento")
+                self.process.terminate()
+                self.process.join(1.0)
+            self.process = None
+            self.logger.info("Servidor de streaming parado")
+        self.is_running = False
+        for ring in self.rings.values():
+            ring.close()
+        self.rings = {}
@@ -1,96 +1,190 @@
+import asyncio
+import inspect
 import logging
 import threading
-from typing import Dict
+from typing import Dict, List, Optional
 from datetime import datetime
 from ..api.api_client import APIClient
+from ..api.event_loop import EventLoopThread
+from .activity_outbox import ActivityOutbox, OutboxSender
+from .activity_session import ActivitySession, SessionState
 
 class ActivityNotifier:
     """Gerencia notificações de atividades para a API"""
-    
-    def __init__(self, api_client: APIClient, activity_mapping: Dict[str, str] = None, enabled: bool = True):
+
+    # Eventos da fila entregues por rodada quando o cliente é assíncrono
+    CONCURRENT_EVENTS = 64
+
+    def __init__(self, api_client: APIClient, activity_mapping: Dict[str, str] = None, enabled: bool = True,
+                 outbox: Optional[ActivityOutbox] = None, backoff_base: float = 1.0, backoff_max: float = 300.0,
+                 max_attempts: Optional[int] = 100, batch_max_size: int = 1, batch_max_age: float = 0.0,
+                 probe_in_background: bool = False, camera_id: int = 1):
         """
         Inicializa o notificador de atividades
-        
+
         Args:
-            api_client: Cliente da API
+            api_client: Cliente da API (APIClient ou AsyncAPIClient; o cliente assíncrono é
+                executado em um único loop asyncio próprio do notificador)
             activity_mapping: Mapeamento de tipos de atividade (opcional)
             enabled: Se as notificações estão habilitadas
+            outbox: Fila durável de eventos (opcional). Com ela as notificações apenas gravam o
+                evento em disco e uma única thread faz o envio para a API com novas tentativas
+            backoff_base: Espera inicial (segundos) entre tentativas de envio da fila
+            backoff_max: Espera máxima (segundos) entre tentativas de envio da fila
+            max_attempts: Tentativas antes de descartar um evento (None = nunca descarta)
+            batch_max_size: Com valor maior que 1, os eventos da fila são enviados em lote
+                (POST /activities/bulk) com até este número de eventos
+            batch_max_age: Tempo máximo (segundos) que um evento espera o lote completar
+            probe_in_background: Testa a conexão com a API em uma thread de fundo, sem atrasar
+                a inicialização
+            camera_id: Câmera padrão das notificações que não informam a câmera
         """
         self.api_client = api_client
         self.activity_mapping = activity_mapping or {}
         self.enabled = enabled
+        self.camera_id = camera_id
         self.logger = logging.getLogger(__name__)
-        
-        # Dicionário para armazenar IDs das atividades ativas
-        # Formato: {(cat_id, activity_type): activity_id}
-        self.active_activities: Dict[tuple, int] = {}
-        
-        # Lock para sincronização de acesso ao dicionário de atividades
+
+        # Sessões de atividade ainda não encerradas, pelo UUID local
+        self.sessions: Dict[str, ActivitySession] = {}
+        # Sessão em andamento (fim ainda não solicitado) de cada (camera_id, cat_id, activity_type)
+        self._session_by_key: Dict[tuple, ActivitySession] = {}
+
+        # Lock para sincronização de acesso às sessões
         self._lock = threading.Lock()
-        
+
+        # Cliente assíncrono: todas as requisições rodam no mesmo loop, em uma thread de fundo
+        self._loop_thread = None
+        if asyncio.iscoroutinefunction(getattr(api_client, "create_activity", None)):
+            self._loop_thread = EventLoopThread("activity-api-loop")
+
+        # Fila durável com thread única de envio
+        self.outbox = outbox
+        self._sender = None
+        if self.outbox is not None:
+            # Atividades abertas por uma execução anterior são encerradas no instante do reinício
+            for stale in self.outbox.recover_stale_sessions(datetime.now()):
+                self.logger.warning(
+                    f"Atividade aberta de uma execução anterior encerrada pela recuperação: Cat ID "
+                    f"{stale['cat_id']} - {stale['activity_type']} (câmera {stale['camera_id']}, sessão {stale['session_id']})"
+                )
+            pending = self.outbox.pending_count()
+            if pending:
+                self.logger.info(f"Reenviando {pending} eventos pendentes da fila de atividades")
+            deliver_batch = None
+            if batch_max_size > 1:
+                deliver_batch = self._deliver_batch
+            elif self._loop_thread is not None:
+                # Sem envio em lote, o cliente assíncrono entrega as chaves pendentes em paralelo
+                deliver_batch = self._deliver_concurrently
+                batch_max_size, batch_max_age = self.CONCURRENT_EVENTS, 0.0
+            self._sender = OutboxSender(
+                self.outbox, self._deliver_event, backoff_base, backoff_max, max_attempts,
+                deliver_batch=deliver_batch,
+                batch_max_size=batch_max_size,
+                batch_max_age=batch_max_age,
+                breaker=getattr(api_client, "breaker", None)
+            )
+            self._sender.start()
+
         # Testa conexão com a API se habilitada
+        self._probe_thread = None
         if self.enabled:
-            if self.api_client.test_connection():
-                self.logger.info("Conexão com API estabelecida com sucesso")
+            if probe_in_background:
+                self._probe_thread = threading.Thread(target=self._probe_api, name="activity-api-probe", daemon=True)
+                self._probe_thread.start()
             else:
-                self.logger.warning("Não foi possível conectar com a API")
-    
-    def notify_activity_start(self, cat_id: int, activity_type: str, timestamp: datetime = None) -> bool:
+                self._probe_api()
+
+    def _probe_api(self):
+        """Testa a conexão com a API e registra o resultado no log"""
+        try:
+            connected = self._call(self.api_client.test_connection())
+        except Exception as e:
+            self.logger.warning(f"Erro ao testar conexão com a API: {e}")
+            return
+        if connected:
+            self.logger.info("Conexão com API estabelecida com sucesso")
+        else:
+            self.logger.warning("Não foi possível conectar com a API")
+
+    def notify_activity_start(self, cat_id: int, activity_type: str, timestamp: datetime = None,
+                              camera_id: int = None) -> bool:
         """
         Notifica o início de uma atividade
-        
+
+        A sessão recebe um UUID local imediatamente, antes da resposta da API.
+
         Args:
             cat_id: ID do gato
             activity_type: Tipo de atividade
             timestamp: Timestamp do início (padrão: agora)
-            
+            camera_id: Câmera que registrou a atividade (padrão: câmera do notificador)
+
         Returns:
             bool: True se a notificação foi enviada com sucesso
         """
         if not self.enabled:
             self.logger.debug(f"Notificações desabilitadas - ignorando início de atividade: {cat_id} - {activity_type}")
             return True
-        
+
         # Converte tipo de atividade se houver mapeamento
         activity_title = self.activity_mapping.get(activity_type, activity_type)
-        
-        # Verifica se já existe uma atividade ativa para este gato e tipo
-        activity_key = (cat_id, activity_type)
-        
-        # Usa lock para sincronização de acesso ao dicionário
+
+        # Verifica se já existe uma atividade ativa para este gato e tipo na câmera
+        camera_id = self.camera_id if camera_id is None else camera_id
+        activity_key = (camera_id, cat_id, activity_type)
         with self._lock:
-            if activity_key in self.active_activities:
-                self.logger.warning(f"Atividade já ativa para Cat ID {cat_id} - {activity_title}")
+            if activity_key in self._session_by_key:
+                self.logger.warning(f"Atividade já ativa para Cat ID {cat_id} - {activity_title} (câmera {camera_id})")
                 return True
-        
-        self.logger.info(f"Criando nova atividade: Cat ID {cat_id} - {activity_title}")
-        
-        # Cria a atividade na API
-        activity_id = self.api_client.create_activity(cat_id, activity_title, timestamp)
-        
-        if activity_id:
-            # Armazena o ID da atividade com lock
-            with self._lock:
-                self.active_activities[activity_key] = activity_id
-            self.logger.info(f"Atividade criada com sucesso: Cat ID {cat_id} - {activity_title} (Activity ID: {activity_id})")
+            session = ActivitySession(cat_id, activity_type, timestamp or datetime.now(), camera_id=camera_id)
+            self._session_by_key[activity_key] = session
+            self.sessions[session.session_id] = session
+
+        if self.outbox is not None:
+            self.outbox.enqueue("start", session.session_id, cat_id, activity_type, session.started_at, camera_id)
+            self._sender.notify()
+            self.logger.info(f"Início de atividade gravado na fila: Cat ID {cat_id} - {activity_title} (sessão {session.session_id})")
             return True
-        else:
+
+        self.logger.info(f"Criando nova atividade: Cat ID {cat_id} - {activity_title} (sessão {session.session_id})")
+
+        # Cria a atividade na API
+        activity_id = self._call(self.api_client.create_activity(cat_id, activity_title, session.started_at,
+                                                                 camera_id=camera_id))
+
+        if not activity_id:
             self.logger.error(f"Falha ao criar atividade: Cat ID {cat_id} - {activity_title}")
+            self._close_session(session)
             return False
-    
+
+        with self._lock:
+            finish_now = session.created(activity_id)
+        self.logger.info(f"Atividade criada com sucesso: Cat ID {cat_id} - {activity_title} (Activity ID: {activity_id})")
+
+        # O fim chegou enquanto a criação estava em andamento: envia a finalização enfileirada
+        if finish_now:
+            self._send_finish(session, activity_title)
+        return True
+
     def notify_activity_end(self, cat_id: int, activity_type: str,
-                           start_time: datetime = None, end_time: datetime = None) -> bool:
+                           start_time: datetime = None, end_time: datetime = None, camera_id: int = None) -> bool:
         """
         Notifica o fim de uma atividade
 
+        Se a criação ainda não retornou o ID da API, a finalização fica enfileirada na sessão
+        e é enviada assim que o ID chegar.
+
         Args:
             cat_id: ID do gato
             activity_type: Tipo de atividade
             start_time: Timestamp do início da atividade (não usado, mantido para compatibilidade)
             end_time: Timestamp do fim (padrão: agora)
+            camera_id: Câmera que registrou a atividade (padrão: câmera do notificador)
 
         Returns:
-            bool: True se a notificação foi enviada com sucesso
+            bool: True se a notificação foi enviada (ou enfileirada) com sucesso
         """
         if not self.enabled:
             self.logger.debug(f"Notificações desabilitadas - ignorando fim de atividade: {cat_id} - {activity_type}")
@@ -98,56 +192,29 @@ class ActivityNotifier:
 
         # Converte tipo de atividade se houver mapeamento
         activity_title = self.activity_mapping.get(activity_type, activity_type)
+        camera_id = self.camera_id if camera_id is None else camera_id
+        return self._end_session((camera_id, cat_id, activity_type), activity_title, end_time)
 
-        # Busca a atividade ativa com lock
-        activity_key = (cat_id, activity_type)
-        activity_id = None
-
-        with self._lock:
-            activity_id = self.active_activities.get(activity_key)
-
-        if not activity_id:
-            self.logger.warning(f"Nenhuma atividade ativa encontrada para finalizar: Cat ID {cat_id} - {activity_title}")
-            return False
-
-        if end_time is None:
-            end_time = datetime.now()
-
-        self.logger.info(f"Finalizando atividade: Cat ID {cat_id} - {activity_title} (Activity ID: {activity_id})")
+    def get_active_activities(self, camera_id: int = None) -> Dict[tuple, int]:
+        """
+        Retorna as atividades ativas (sessões abertas com ID da API) de uma câmera
 
-        # Finaliza a atividade na API
-        try:
-            success = self.api_client.finish_activity(activity_id, end_time)
-        except Exception as e:
-            self.logger.error(f"Erro ao finalizar atividade na API: {e}")
-            success = False
+        Args:
+            camera_id: Câmera consultada (padrão: câmera do notificador)
 
-        if success:
-            # Remove a atividade da lista de ativas com lock
-            with self._lock:
-                if activity_key in self.active_activities:
-                    del self.active_activities[activity_key]
-            self.logger.info(f"Atividade finalizada com sucesso: Cat ID {cat_id} - {activity_title}")
-            return True
-        else:
-            self.logger.error(f"Falha ao finalizar atividade: Cat ID {cat_id} - {activity_title}")
-            # Mesmo com falha na API, remove a atividade localmente para evitar acumulo
-            with self._lock:
-                if activity_key in self.active_activities:
-                    del self.active_activities[activity_key]
-            return False
-    
-    def get_active_activities(self) -> Dict[tuple, int]:
-        """
-        Retorna as atividades ativas
-        
         Returns:
-            Dict: Dicionário com as atividades ativas
+            Dict: Dicionário {(cat_id, activity_type): activity_id}
         """
+        camera_id = self.camera_id if camera_id is None else camera_id
         with self._lock:
-            return self.active_activities.copy()
-    
-    def force_end_activity(self, cat_id: int, activity_type: str, end_time: datetime = None) -> bool:
+            return {
+                session.key: session.activity_id
+                for session in self.sessions.values()
+                if session.state == SessionState.OPEN and session.camera_id == camera_id
+            }
+
+    def force_end_activity(self, cat_id: int, activity_type: str, end_time: datetime = None,
+                           camera_id: int = None) -> bool:
         """
         Força o fim de uma atividade específica
 
@@ -155,100 +222,327 @@ class ActivityNotifier:
             cat_id: ID do gato
             activity_type: Tipo de atividade
             end_time: Timestamp do fim (padrão: agora)
+            camera_id: Câmera da atividade (padrão: câmera do notificador)
 
         Returns:
             bool: True se a atividade foi finalizada
         """
-        activity_key = (cat_id, activity_type)
-        activity_id = None
-
-        with self._lock:
-            activity_id = self.active_activities.get(activity_key)
-
-        if not activity_id:
-            return False
-
-        if end_time is None:
-            end_time = datetime.now()
-
-        # Tenta finalizar com tratamento para evitar travamentos
-        success = False
-        try:
-            success = self.api_client.finish_activity(activity_id, end_time)
-        except Exception as e:
-            self.logger.error(f"Erro ao finalizar atividade na API: {e}")
-
+        camera_id = self.camera_id if camera_id is None else camera_id
+        success = self._end_session((camera_id, cat_id, activity_type), activity_type, end_time)
         if success:
-            with self._lock:
-                if activity_key in self.active_activities:
-                    del self.active_activities[activity_key]
             self.logger.info(f"Atividade forçadamente finalizada: Cat ID {cat_id} - {activity_type}")
-        else:
-            # Mesmo com falha, remove localmente
-            with self._lock:
-                if activity_key in self.active_activities:
-                    del self.active_activities[activity_key]
-            self.logger.warning(f"Atividade removida localmente devido a falha na API: Cat ID {cat_id} - {activity_type}")
-
         return success
-    
-    def cleanup_all_activities(self, end_time: datetime = None) -> int:
+
+    def cleanup_all_activities(self, end_time: datetime = None, camera_id: int = None) -> int:
         """
         Finaliza todas as atividades ativas (útil para limpeza no shutdown)
 
         Args:
             end_time: Timestamp do fim (padrão: agora)
+            camera_id: Finaliza apenas as atividades desta câmera (padrão: todas as câmeras)
 
         Returns:
-            int: Número de atividades finalizadas
+            int: Número de atividades finalizadas (ou gravadas na fila)
         """
         with self._lock:
-            if not self.active_activities:
-                return 0
+            open_keys = [key for key in self._session_by_key if camera_id is None or key[0] == camera_id]
+        if not open_keys:
+            return 0
 
         if end_time is None:
             end_time = datetime.now()
 
         finalized_count = 0
-        activities_to_remove = []
-
-        # Copia as atividades ativas para evitar manter o lock durante as requisições
-        with self._lock:
-            active_activities_copy = self.active_activities.copy()
-
-        for activity_key, activity_id in active_activities_copy.items():
-            cat_id, activity_type = activity_key
-
+        for activity_key in open_keys:
+            _, cat_id, activity_type = activity_key
             # Tenta finalizar com tratamento para evitar travamentos
             try:
-                if self.api_client.finish_activity(activity_id, end_time):
-                    activities_to_remove.append(activity_key)
+                if self._end_session(activity_key, activity_type, end_time):
                     finalized_count += 1
                     self.logger.info(f"Atividade finalizada na limpeza: Cat ID {cat_id} - {activity_type}")
                 else:
-                    # Mesmo com falha, marca para remover localmente
-                    activities_to_remove.append(activity_key)
-                    self.logger.warning(f"Atividade marcada para remoção local devido a falha na API: Cat ID {cat_id} - {activity_type}")
+                    self.logger.warning(f"Atividade removida localmente devido a falha na API: Cat ID {cat_id} - {activity_type}")
             except Exception as e:
-                # Em caso de exceção, ainda marca para remover localmente
-                activities_to_remove.append(activity_key)
                 self.logger.error(f"Erro ao finalizar atividade na API (removendo localmente): Cat ID {cat_id} - {activity_type} - {e}")
 
-        # Remove as atividades finalizadas
-        with self._lock:
-            for activity_key in activities_to_remove:
-                if activity_key in self.active_activities:
-                    del self.active_activities[activity_key]
-
         self.logger.info(f"Limpeza concluída: {finalized_count} atividades finalizadas")
         return finalized_count
-    
+
+    def get_api_circuit_stats(self) -> Optional[Dict]:
+        """
+        Retorna o estado do disjuntor do cliente da API
+
+        Returns:
+            Dict: Estado, aberturas e requisições recusadas (None se o cliente não tem disjuntor)
+        """
+        breaker = getattr(self.api_client, "breaker", None)
+        return breaker.stats() if breaker is not None else None
+
     def enable_notifications(self):
         """Habilita as notificações"""
         self.enabled = True
         self.logger.info("Notificações habilitadas")
-    
+
     def disable_notifications(self):
         """Desabilita as notificações"""
         self.enabled = False
-        self.logger.info("Notificações desabilitadas")
\ No newline at end of file
+        self.logger.info("Notificações desabilitadas")
+
+    def _call(self, result):
+        """Aguarda o resultado de uma chamada ao cliente, executando corrotinas no loop do notificador"""
+        if inspect.isawaitable(result):
+            return self._loop_thread.run(result)
+        return result
+
+    def _close_session(self, session: ActivitySession):
+        """Encerra a sessão e a remove das sessões ativas"""
+        with self._lock:
+            session.close()
+            self.sessions.pop(session.session_id, None)
+            if self._session_by_key.get(session.camera_key) is session:
+                del self._session_by_key[session.camera_key]
+
+    def _end_session(self, activity_key: tuple, activity_title: str, end_time: datetime = None) -> bool:
+        """Solicita o fim da sessão em andamento da chave (camera_id, cat_id, activity_type)"""
+        camera_id, cat_id, activity_type = activity_key
+        with self._lock:
+            session = self._session_by_key.pop(activity_key, None)
+            if session is None:
+                self.logger.warning(f"Nenhuma atividade ativa encontrada para finalizar: Cat ID {cat_id} - {activity_title}")
+                return False
+            finish_now = session.request_finish(end_time or datetime.now())
+
+        if self.outbox is not None:
+            self.outbox.enqueue("end", session.session_id, cat_id, activity_type, session.ended_at, camera_id)
+            self._sender.notify()
+            self.logger.info(f"Fim de atividade gravado na fila: Cat ID {cat_id} - {activity_title} (sessão {session.session_id})")
+            return True
+
+        if not finish_now:
+            # A criação ainda não retornou: a finalização será enviada quando o ID chegar
+            self.logger.info(f"Fim enfileirado até a criação da atividade: Cat ID {cat_id} - {activity_title} (sessão {session.session_id})")
+            return True
+
+        return self._send_finish(session, activity_title)
+
+    def _send_finish(self, session: ActivitySession, activity_title: str) -> bool:
+        """Finaliza a sessão na API (sem fila durável)"""
+        self.logger.info(f"Finalizando atividade: Cat ID {session.cat_id} - {activity_title} (Activity ID: {session.activity_id})")
+
+        try:
+            success = self._call(self.api_client.finish_activity(session.activity_id, session.ended_at))
+        except Exception as e:
+            self.logger.error(f"Erro ao finalizar atividade na API: {e}")
+            success = False
+
+        # Mesmo com falha na API, encerra a sessão localmente para evitar acúmulo
+        self._close_session(session)
+        if success:
+            self.logger.info(f"Atividade finalizada com sucesso: Cat ID {session.cat_id} - {activity_title}")
+        else:
+            self.logger.error(f"Falha ao finalizar atividade: Cat ID {session.cat_id} - {activity_title}")
+        return success
+
+    def _mark_created(self, event: Dict, activity_id: int):
+        """Guarda o ID devolvido pela API para a sessão do evento"""
+        self.outbox.set_session(event["session_id"], event["cat_id"], event["activity_type"], activity_id,
+                                event["camera_id"])
+        with self._lock:
+            # Após um reinício a sessão pode não estar mais em memória
+            session = self.sessions.get(event["session_id"])
+            if session is not None:
+                session.created(activity_id)
+
+    def _mark_finished(self, event: Dict):
+        self.outbox.remove_session(event["session_id"])
+        with self._lock:
+            session = self.sessions.pop(event["session_id"], None)
+            if session is not None:
+                session.close()
+
+    def _finish_target(self, event: Dict, activity_title: str) -> Optional[int]:
+        """ID da atividade a finalizar (None se o início foi descartado e não há o que finalizar)"""
+        activity_id = self.outbox.session_activity_id(event["session_id"])
+        if not activity_id:
+            self.logger.warning(f"Fim descartado sem atividade criada na API: Cat ID {event['cat_id']} - {activity_title}")
+            self._mark_finished(event)
+        return activity_id
+
+    def _deliver_event(self, event: Dict) -> bool:
+        """Envia um evento da fila para a API (executado pela thread de envio)"""
+        activity_title = self.activity_mapping.get(event["activity_type"], event["activity_type"])
+
+        if event["event"] == "start":
+            activity_id = self._call(self.api_client.create_activity(event["cat_id"], activity_title, event["timestamp"],
+                                                                     camera_id=event["camera_id"]))
+            if not activity_id:
+                return False
+            self._mark_created(event, activity_id)
+            self.logger.info(f"Atividade criada com sucesso: Cat ID {event['cat_id']} - {activity_title} (Activity ID: {activity_id})")
+            return True
+
+        activity_id = self._finish_target(event, activity_title)
+        if not activity_id:
+            return True
+
+        if not self._call(self.api_client.finish_activity(activity_id, event["timestamp"])):
+            return False
+        self._mark_finished(event)
+        self.logger.info(f"Atividade finalizada com sucesso: Cat ID {event['cat_id']} - {activity_title}")
+        return True
+
+    async def _deliver_event_async(self, event: Dict) -> bool:
+        """Versão assíncrona de _deliver_event, executada no loop do notificador"""
+        activity_title = self.activity_mapping.get(event["activity_type"], event["activity_type"])
+
+        if event["event"] == "start":
+            activity_id = await self.api_client.create_activity(event["cat_id"], activity_title, event["timestamp"],
+                                                                camera_id=event["camera_id"])
+            if not activity_id:
+                return False
+            self._mark_created(event, activity_id)
+            self.logger.info(f"Atividade criada com sucesso: Cat ID {event['cat_id']} - {activity_title} (Activity ID: {activity_id})")
+            return True
+
+        activity_id = self._finish_target(event, activity_title)
+        if not activity_id:
+            return True
+
+        if not await self.api_client.finish_activity(activity_id, event["timestamp"]):
+            return False
+        self._mark_finished(event)
+        self.logger.info(f"Atividade finalizada com sucesso: Cat ID {event['cat_id']} - {activity_title}")
+        return True
+
+    def _deliver_concurrently(self, events: List[Dict]) -> Dict[int, bool]:
+        """
+        Entrega os eventos de chaves diferentes em paralelo no loop do notificador
+
+        Os eventos de uma mesma (camera_id, cat_id, activity_type) seguem em ordem e param na primeira
+        falha; os eventos seguintes ficam fora do resultado e permanecem na fila sem tentativa.
+        O mesmo vale para os eventos que seriam recusados pelo disjuntor: com o circuito aberto
+        nenhuma sequência continua, e fora do estado fechado as sequências seguem uma de cada vez
+        para que só a chamada de teste chegue à API.
+        """
+        breaker = getattr(self.api_client, "breaker", None)
+        sequences = {}
+        for event in events:
+            sequences.setdefault((event["camera_id"], event["cat_id"], event["activity_type"]), []).append(event)
+
+        results = {}
+
+        async def deliver_sequence(sequence):
+            for event in sequence:
+                if breaker is not None and breaker.retry_in() > 0:
+                    # Circuito aberto durante a rodada: o evento não é tentado
+                    return
+                try:
+                    success = await self._deliver_event_async(event)
+                except Exception as e:
+                    self.logger.error(f"Erro ao entregar evento {event['id']} da fila: {e}")
+                    success = False
+                results[event["id"]] = success
+                if not success:
+                    return
+
+        async def deliver_all():
+            if breaker is not None and breaker.state != breaker.CLOSED:
+                for sequence in sequences.values():
+                    await deliver_sequence(sequence)
+                return
+            await asyncio.gather(*(deliver_sequence(sequence) for sequence in sequences.values()))
+
+        self._loop_thread.run(deliver_all())
+        return results
+
+    def _deliver_batch(self, events: List[Dict]) -> Dict[int, bool]:
+        """
+        Envia vários eventos da fila em uma única requisição (executado pela thread de envio)
+
+        Um início e o fim da mesma sessão no mesmo lote viram um único registro de atividade
+        já encerrada, evitando o POST seguido de PATCH.
+
+        Returns:
+            Dict: {event_id: True se entregue (ou descartado)}
+        """
+        operations = []
+        operation_events = []  # Eventos representados por cada operação
+        open_creates = {}  # Sessão -> índice da operação de criação ainda sem fim no lote
+        results = {}
+
+        for event in events:
+            activity_title = self.activity_mapping.get(event["activity_type"], event["activity_type"])
+
+            if event["event"] == "start":
+                open_creates[event["session_id"]] = len(operations)
+                operations.append(dict(
+                    self.api_client.activity_payload(event["cat_id"], activity_title, event["timestamp"],
+                                                     camera_id=event["camera_id"]),
+                    op="create"
+                ))
+                operation_events.append([event])
+                continue
+
+            index = open_creates.pop(event["session_id"], None)
+            if index is not None:
+                # Início e fim no mesmo lote: cria a atividade já encerrada
+                operations[index]["endedAt"] = self.api_client.format_timestamp(event["timestamp"])
+                operation_events[index].append(event)
+                continue
+
+            activity_id = self._finish_target(event, activity_title)
+            if not activity_id:
+                results[event["id"]] = True
+                continue
+
+            operations.append({
+                "op": "finish",
+                "id": int(activity_id),
+                "endedAt": self.api_client.format_timestamp(event["timestamp"])
+            })
+            operation_events.append([event])
+
+        if not operations:
+            return results
+
+        responses = self._call(self.api_client.bulk_activities(operations))
+        if responses is None:
+            # Falha da requisição inteira: todos os eventos enviados serão tentados novamente
+            for batch_events in operation_events:
+                for event in batch_events:
+                    results[event["id"]] = False
+            return results
+
+        for operation, batch_events, response in zip(operations, operation_events, responses):
+            success = response.get("status") == "ok"
+            for event in batch_events:
+                results[event["id"]] = success
+            if not success:
+                self.logger.error(f"Operação recusada no lote: {operation['op']} Cat ID {batch_events[0]['cat_id']} - {response.get('message')}")
+                continue
+
+            if operation["op"] == "create" and len(batch_events) == 1:
+                # Atividade em andamento: guarda o ID para finalizá-la depois
+                self._mark_created(batch_events[0], response["id"])
+            else:
+                self._mark_finished(batch_events[-1])
+
+        return results
+
+    def close(self, drain_timeout: float = 5.0):
+        """Encerra a thread de envio da fila (eventos não entregues são reenviados no próximo início)"""
+        if self._sender is not None:
+            self._sender.stop(drain_timeout)
+            self._sender = None
+        if self.outbox is not None:
+            pending = self.outbox.pending_count()
+            if pending:
+                self.logger.warning(f"{pending} eventos de atividade continuam na fila para o próximo início")
+            self.outbox.close()
+        if self._loop_thread is not None:
+            try:
+                self._loop_thread.run(self.api_client.close(), timeout=5.0)
+            except Exception as e:
+                self.logger.error(f"Erro ao fechar conexões da API: {e}")
+            self._loop_thread.stop()
+            self._loop_thread = None
@@ -0,0 +1,377 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+class ActivityOutbox:
+    """
+    Fila durável de eventos de atividade em SQLite (modo WAL).
+
+    Os eventos ("start"/"end") são gravados em disco antes de qualquer chamada à API e só
+    são removidos depois de entregues, de modo que sobrevivem a quedas da API e reinícios.
+    Cada evento pertence a uma sessão identificada por um UUID local; o ID devolvido pela
+    API para cada sessão também é persistido para que eventos "end" pendentes possam ser
+    entregues após um reinício.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                cat_id INTEGER NOT NULL,
+                activity_type TEXT NOT NULL,
+                event TEXT NOT NULL,
+                camera_id INTEGER NOT NULL DEFAULT 1,
+                timestamp TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS activity_sessions (
+                session_id TEXT PRIMARY KEY,
+                cat_id INTEGER NOT NULL,
+                activity_type TEXT NOT NULL,
+                activity_id INTEGER NOT NULL,
+                camera_id INTEGER NOT NULL DEFAULT 1
+            )"""
+        )
+        # Filas criadas antes do suporte a várias câmeras não têm a coluna camera_id
+        for table in ("events", "activity_sessions"):
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if "camera_id" not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN camera_id INTEGER NOT NULL DEFAULT 1")
+
+    def enqueue(self, event: str, session_id: str, cat_id: int, activity_type: str, timestamp: datetime,
+                camera_id: int = 1) -> int:
+        """Grava um evento da sessão na fila e retorna seu ID"""
+        with self._lock:
+            cursor = self._conn.execute(
+                """INSERT INTO events (session_id, cat_id, activity_type, event, timestamp, camera_id)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (session_id, int(cat_id), activity_type, event, timestamp.isoformat(), int(camera_id))
+            )
+            return cursor.lastrowid
+
+    def due_events(self, now: float) -> List[Dict]:
+        """
+        Retorna o primeiro evento pendente de cada (camera_id, cat_id, activity_type) que já pode ser enviado
+
+        Apenas o evento mais antigo de cada chave é elegível, garantindo a ordem por chave.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT id, cat_id, activity_type, event, timestamp, attempts, session_id, camera_id FROM events
+                   WHERE id IN (SELECT MIN(id) FROM events GROUP BY camera_id, cat_id, activity_type)
+                   AND next_attempt_at <= ? ORDER BY id""",
+                (now,)
+            ).fetchall()
+        return self._rows_to_events(rows)
+
+    def due_batch(self, now: float, limit: int) -> List[Dict]:
+        """
+        Retorna, em ordem, todos os eventos pendentes das chaves cujo evento mais antigo já pode ser enviado
+
+        Diferente de due_events, inclui os eventos seguintes de cada chave para que possam ser
+        enviados (e agrupados) na mesma requisição em lote.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT e.id, e.cat_id, e.activity_type, e.event, e.timestamp, e.attempts, e.session_id, e.camera_id
+                   FROM events e
+                   JOIN (SELECT camera_id, cat_id, activity_type, MIN(id) AS head FROM events
+                         GROUP BY camera_id, cat_id, activity_type) h
+                     ON e.camera_id = h.camera_id AND e.cat_id = h.cat_id AND e.activity_type = h.activity_type
+                   JOIN events he ON he.id = h.head
+                   WHERE he.next_attempt_at <= ? ORDER BY e.id LIMIT ?""",
+                (now, limit)
+            ).fetchall()
+        return self._rows_to_events(rows)
+
+    @staticmethod
+    def _rows_to_events(rows) -> List[Dict]:
+        return [
+            {
+                "id": row[0],
+                "cat_id": row[1],
+                "activity_type": row[2],
+                "event": row[3],
+                "timestamp": datetime.fromisoformat(row[4]),
+                "attempts": row[5],
+                "session_id": row[6],
+                "camera_id": row[7]
+            }
+            for row in rows
+        ]
+
+    def next_attempt_at(self) -> Optional[float]:
+        """Instante da próxima tentativa agendada (None se a fila estiver vazia)"""
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT MIN(next_attempt_at) FROM events
+                   WHERE id IN (SELECT MIN(id) FROM events GROUP BY camera_id, cat_id, activity_type)"""
+            ).fetchone()
+        return row[0]
+
+    def complete(self, event_id: int):
+        """Remove um evento entregue (ou descartado)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+
+    def reschedule(self, event_id: int, attempts: int, next_attempt_at: float):
+        """Agenda uma nova tentativa para um evento que falhou"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE events SET attempts = ?, next_attempt_at = ? WHERE id = ?",
+                (attempts, next_attempt_at, event_id)
+            )
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def set_session(self, session_id: str, cat_id: int, activity_type: str, activity_id: int, camera_id: int = 1):
+        """Guarda o ID devolvido pela API para a sessão"""
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO activity_sessions (session_id, cat_id, activity_type, activity_id, camera_id)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (session_id, int(cat_id), activity_type, int(activity_id), int(camera_id))
+            )
+
+    def session_activity_id(self, session_id: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT activity_id FROM activity_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def remove_session(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM activity_sessions WHERE session_id = ?", (session_id,))
+
+    def recover_stale_sessions(self, ended_at: datetime) -> List[Dict]:
+        """
+        Enfileira o fim das sessões de uma execução anterior que ficaram abertas
+
+        São as sessões já criadas na API (que lá continuam com endedAt igual ao início) ou
+        com o início ainda na fila, sem um evento "end" pendente. O fim é enviado pela thread
+        de envio como qualquer outro evento, com o instante `ended_at` (normalmente o do
+        reinício), já que não há como saber quando a atividade terminou.
+
+        Returns:
+            List[Dict]: Sessões encerradas (session_id, cat_id, activity_type, camera_id)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT session_id, cat_id, activity_type, camera_id FROM (
+                       SELECT session_id, cat_id, activity_type, camera_id FROM activity_sessions
+                       UNION
+                       SELECT session_id, cat_id, activity_type, camera_id FROM events WHERE event = 'start'
+                   ) s WHERE NOT EXISTS (
+                       SELECT 1 FROM events WHERE events.session_id = s.session_id AND events.event = 'end'
+                   )"""
+            ).fetchall()
+            for session_id, cat_id, activity_type, camera_id in rows:
+                self._conn.execute(
+                    """INSERT INTO events (session_id, cat_id, activity_type, event, timestamp, camera_id)
+                       VALUES (?, ?, ?, 'end', ?, ?)""",
+                    (session_id, cat_id, activity_type, ended_at.isoformat(), camera_id)
+                )
+        return [
+            {"session_id": row[0], "cat_id": row[1], "activity_type": row[2], "camera_id": row[3]}
+            for row in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class OutboxSender:
+    """
+    Thread única de longa duração que esvazia o ActivityOutbox.
+
+    Cada evento é entregue pela função `deliver` (que retorna True em caso de sucesso).
+    Falhas são reagendadas com backoff exponencial; como só o evento mais antigo de cada
+    (camera_id, cat_id, activity_type) é elegível, a ordem por chave é preservada.
+
+    Com `deliver_batch` os eventos são acumulados e enviados juntos quando o lote atinge
+    `batch_max_size` eventos ou o evento mais antigo passa de `batch_max_age` segundos.
+    `deliver_batch` recebe a lista de eventos e retorna {event_id: sucesso}; eventos fora do
+    resultado não foram tentados e permanecem na fila sem contar tentativa.
+
+    Com um `breaker` (disjuntor do cliente da API) aberto, nenhum evento é tentado: a fila
+    apenas acumula os eventos até o circuito aceitar chamadas de teste. Se o circuito abre no
+    meio de uma rodada, os eventos restantes ficam para depois sem contar tentativa.
+    """
+
+    def __init__(self, outbox: ActivityOutbox, deliver: Callable[[Dict], bool],
+                 backoff_base: float = 1.0, backoff_max: float = 300.0, max_attempts: Optional[int] = 100,
+                 deliver_batch: Optional[Callable[[List[Dict]], Dict[int, bool]]] = None,
+                 batch_max_size: int = 50, batch_max_age: float = 2.0, breaker=None):
+        self.outbox = outbox
+        self.deliver = deliver
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_attempts = max_attempts
+        self.deliver_batch = deliver_batch
+        self.batch_max_size = batch_max_size
+        self.batch_max_age = batch_max_age
+        self.breaker = breaker
+        self.logger = logging.getLogger(__name__)
+
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._drain_deadline = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="activity-outbox-sender", daemon=True)
+        self._thread.start()
+
+    def notify(self):
+        """Acorda a thread após um novo evento ser gravado"""
+        self._wakeup.set()
+
+    def stop(self, drain_timeout: float = 5.0):
+        """Tenta entregar os eventos pendentes por até drain_timeout segundos e encerra a thread"""
+        if self._thread is None:
+            return
+        self._drain_deadline = time.monotonic() + drain_timeout
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join(drain_timeout + 1.0)
+        self._thread = None
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self.backoff_base * (2 ** (attempts - 1)), self.backoff_max)
+
+    def _batch_wait(self, events: List[Dict], now: float) -> float:
+        """Segundos até o lote ficar pronto para envio (0 se já estiver pronto)"""
+        if self._stopping or len(events) >= self.batch_max_size:
+            return 0.0
+        oldest = min(event["timestamp"].timestamp() for event in events)
+        return max(0.0, oldest + self.batch_max_age - now)
+
+    def process_due(self) -> int:
+        """Tenta entregar os eventos elegíveis agora; retorna quantos foram entregues"""
+        if self._circuit_wait() > 0:
+            # Circuito aberto: os eventos continuam na fila sem gastar tentativas
+            return 0
+
+        if self.deliver_batch is not None:
+            return self._process_batch()
+
+        delivered = 0
+        for event in self.outbox.due_events(time.time()):
+            if self._circuit_wait() > 0:
+                # A falha anterior abriu o circuito: os demais eventos seriam recusados sem tentativa
+                break
+            try:
+                success = self.deliver(event)
+            except Exception as e:
+                self.logger.error(f"Erro ao entregar evento {event['id']} da fila: {e}")
+                success = False
+
+            if success:
+                self.outbox.complete(event["id"])
+                delivered += 1
+                continue
+
+            self._retry_later(event)
+        return delivered
+
+    def _process_batch(self) -> int:
+        """Envia os eventos elegíveis em uma única requisição quando o lote estiver pronto"""
+        now = time.time()
+        events = self.outbox.due_batch(now, self.batch_max_size)
+        if not events or self._batch_wait(events, now) > 0:
+            return 0
+
+        try:
+            results = self.deliver_batch(events)
+        except Exception as e:
+            self.logger.error(f"Erro ao entregar lote de {len(events)} eventos da fila: {e}")
+            results = {event["id"]: False for event in events}
+
+        delivered = 0
+        for event in events:
+            if event["id"] not in results:
+                # Não tentado nesta rodada (ex.: evento anterior da mesma chave falhou)
+                continue
+            if results[event["id"]]:
+                self.outbox.complete(event["id"])
+                delivered += 1
+            else:
+                self._retry_later(event)
+        return delivered
+
+    def _retry_later(self, event: Dict):
+        """Reagenda (ou descarta, após max_attempts) um evento que não foi entregue"""
+
+        attempts = event["attempts"] + 1
+        if self.max_attempts is not None and attempts >= self.max_attempts:
+            self.logger.error(
+                f"Evento descartado após {attempts} tentativas: Cat ID {event['cat_id']} - "
+                f"{event['activity_type']} ({event['event']})"
+            )
+            self.outbox.complete(event["id"])
+            return
+
+        delay = self._backoff(attempts)
+        self.outbox.reschedule(event["id"], attempts, time.time() + delay)
+        self.logger.warning(
+            f"Falha ao entregar evento {event['event']} de Cat ID {event['cat_id']} - "
+            f"{event['activity_type']}; nova tentativa em {delay:.1f}s"
+        )
+
+    def _run(self):
+        while True:
+            self._wakeup.clear()
+            self.process_due()
+
+            if self._stopping:
+                # Na finalização tenta esvaziar a fila até o prazo; o restante é reenviado no próximo início
+                next_at = self.outbox.next_attempt_at()
+                if (next_at is None or time.monotonic() >= self._drain_deadline or next_at > time.time()
+                        or self._circuit_wait() > 0):
+                    break
+                continue
+
+            self._wakeup.wait(self._next_wait())
+
+    def _circuit_wait(self) -> float:
+        """Segundos até o disjuntor aceitar novas chamadas (0 sem disjuntor ou com o circuito fechado)"""
+        if self.breaker is None:
+            return 0.0
+        return self.breaker.retry_in()
+
+    def _next_wait(self) -> Optional[float]:
+        """Tempo até a próxima tentativa agendada ou até o lote pendente ficar pronto"""
+        now = time.time()
+        next_at = self.outbox.next_attempt_at()
+        if next_at is None:
+            return None
+        wait = max(0.0, next_at - now, self._circuit_wait())
+        if self.deliver_batch is not None and wait == 0.0:
+            events = self.outbox.due_batch(now, self.batch_max_size)
+            if events:
+                wait = self._batch_wait(events, now)
+        return wait
@@ -0,0 +1,76 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+
+class SessionState:
+    """Estados de uma sessão de atividade"""
+    PENDING_CREATE = "pending_create"  # Início registrado localmente, aguardando o ID da API
+    OPEN = "open"  # Criada na API, em andamento
+    PENDING_FINISH = "pending_finish"  # Fim solicitado; enviado assim que houver ID da API
+    CLOSED = "closed"  # Finalizada (ou abandonada após falha)
+
+
+class ActivitySession:
+    """
+    Sessão de atividade identificada por um UUID local gerado no início.
+
+    O fim pode ser solicitado antes de a API devolver o ID da atividade: nesse caso a sessão
+    fica em PENDING_FINISH sem ID e a finalização é liberada quando o ID chega.
+    """
+
+    __slots__ = ("session_id", "cat_id", "activity_type", "camera_id", "state", "activity_id", "started_at", "ended_at")
+
+    def __init__(self, cat_id: int, activity_type: str, started_at: datetime, session_id: str = None,
+                 camera_id: int = 1):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.cat_id = cat_id
+        self.activity_type = activity_type
+        self.camera_id = camera_id
+        self.state = SessionState.PENDING_CREATE
+        self.activity_id: Optional[int] = None
+        self.started_at = started_at
+        self.ended_at: Optional[datetime] = None
+
+    @property
+    def key(self) -> tuple:
+        return (self.cat_id, self.activity_type)
+
+    @property
+    def camera_key(self) -> tuple:
+        """Chave da sessão considerando a câmera (o mesmo gato pode estar em várias câmeras)"""
+        return (self.camera_id, self.cat_id, self.activity_type)
+
+    def _require(self, *states):
+        if self.state not in states:
+            raise ValueError(f"Transição inválida da sessão {self.session_id} a partir de '{self.state}'")
+
+    def created(self, activity_id: int) -> bool:
+        """
+        Registra o ID devolvido pela API
+
+        Returns:
+            bool: True se o fim já foi solicitado e a finalização deve ser enviada agora
+        """
+        self._require(SessionState.PENDING_CREATE, SessionState.PENDING_FINISH)
+        self.activity_id = activity_id
+        if self.state == SessionState.PENDING_CREATE:
+            self.state = SessionState.OPEN
+            return False
+        return True
+
+    def request_finish(self, ended_at: datetime) -> bool:
+        """
+        Solicita o fim da sessão
+
+        Returns:
+            bool: True se a finalização pode ser enviada agora (o ID da API já é conhecido)
+        """
+        self._require(SessionState.PENDING_CREATE, SessionState.OPEN)
+        self.ended_at = ended_at
+        self.state = SessionState.PENDING_FINISH
+        return self.activity_id is not None
+
+    def close(self):
+        """Encerra a sessão (finalizada na API ou abandonada após falha)"""
+        self.state = SessionState.CLOSED
@@ -1,9 +1,10 @@
 import time
 import logging
 import threading
-import numpy as np
 from datetime import datetime
-from collections import deque
+from ..core import metrics
+from ..core.zone_registry import ZoneRegistry
+from .distance_windows import DistanceWindows, ZoneActivityState
 
 class ActivityTracker:
     """Classe responsável pelo rastreamento de atividades dos gatos"""
@@ -11,8 +12,14 @@ class ActivityTracker:
     def __init__(self, config):
         self.config = config
         self.estado = {}
-        self.pote_nome = config.POTE_RACAO["nome"]
+        self.zone_registry = ZoneRegistry(config)
+        # Janelas deslizantes de distância de todos os pares (gato, zona) em arrays pré-alocados
+        self.distance_windows = DistanceWindows(config.WINDOW_SIZE)
         self.last_seen = {}  # Dicionário para armazenar o último timestamp de detecção do gato
+        # Atividades notificadas por (gato, atividade): zonas em que o gato está nessa atividade
+        # e início da atividade. Várias zonas podem ter a mesma atividade (dois potes de ração),
+        # mas o notificador conhece apenas uma atividade de cada tipo por gato
+        self.active_activities = {}
         self.logger = logging.getLogger(__name__)
 
         # Validação do timeout para evitar valores inválidos
@@ -23,26 +30,48 @@ class ActivityTracker:
     def _ensure_cat_tracking(self, cat_id: int):
         """Garante que o gato está sendo rastreado"""
         if cat_id not in self.estado:
-            self.estado[cat_id] = {
-                self.pote_nome: {
-                    "comendo": False,
-                    "start_time": None,
-                    "distancias": deque(maxlen=self.config.WINDOW_SIZE),
-                    "ultimo_estado": False,
-                    "tempo_estado": 0
-                }
-            }
+            self.estado[cat_id] = {}
             self.logger.info(f"Iniciando rastreamento para gato ID {cat_id}")
 
-    def update(self, posicoes):
-        """Atualiza o estado de atividade baseado nas posições detectadas"""
-        # Verifica se o pote está presente
-        if self.pote_nome not in posicoes:
+    def _ensure_zone_tracking(self, cat_id: int, zone):
+        """Garante o estado do gato em relação a uma zona"""
+        zonas = self.estado[cat_id]
+        dados = zonas.get(zone["nome"])
+        if dados is None:
+            dados = ZoneActivityState(zone["zona"], zone["atividade"], self.distance_windows.allocate())
+            zonas[zone["nome"]] = dados
+        return dados
+
+    def update(self, posicoes, timestamp=None):
+        """
+        Atualiza o estado de atividade baseado nas posições detectadas
+
+        Args:
+            posicoes: Marcadores detectados no frame
+            timestamp: Timestamp de captura do frame (padrão: agora)
+        """
+        with metrics.timer("track_update"):
+            self._update(posicoes, timestamp)
+
+    def _update(self, posicoes, timestamp):
+        # Zonas visíveis (ou em cache) neste frame
+        zones = []
+        zone_positions = []
+        for nome, dados in posicoes.items():
+            if dados["tipo"] == "zona":
+                zone = self.zone_registry.get_by_name(nome)
+                if zone is not None:
+                    zones.append(zone)
+                    zone_positions.append(dados["pos"])
+
+        # Sem nenhuma zona presente não há como avaliar atividades
+        if not zones:
             return
 
-        agora = time.time()
+        agora = timestamp if timestamp is not None else time.time()
 
-        # Atualiza rastreamento para cada gato detectado
+        cat_ids = []
+        cat_positions = []
         for identificador, dados in posicoes.items():
             if dados["tipo"] == "gato":
                 # Converte identificador para int Python nativo
@@ -58,64 +87,101 @@ class ActivityTracker:
 
                 # Atualiza o timestamp da última detecção
                 self.last_seen[cat_id] = agora
+                cat_ids.append(cat_id)
+                cat_positions.append(dados["pos"])
+
+        if not cat_ids:
+            return
+
+        # Distâncias entre todos os gatos e todas as zonas em uma única operação
+        distances = ZoneRegistry.distance_matrix(cat_positions, zone_positions)
+
+        # Estados na mesma ordem da matriz de distâncias (gatos x zonas)
+        states = [self._ensure_zone_tracking(cat_id, zone) for cat_id in cat_ids for zone in zones]
+
+        # Atualiza as médias móveis de todos os pares visíveis em um único passo
+        medias = self.distance_windows.push([dados.row for dados in states], distances.ravel())
+        counts = self.distance_windows.counts
+
+        for index, dados in enumerate(states):
+            dados.dist_media = float(medias[index])
+            dados.amostras = int(counts[dados.row])
+
+            # Atualiza estado da atividade da zona
+            cat_id = cat_ids[index // len(zones)]
+            self._update_feeding_state(cat_id, dados, dados.dist_media, zones[index % len(zones)], agora)
 
-                # Calcula distância entre gato e pote
-                dist = np.linalg.norm(
-                    dados["pos"] - posicoes[self.pote_nome]["pos"]
-                )
-
-                cat_data = self.estado[cat_id][self.pote_nome]
-                cat_data["distancias"].append(dist)
-                dist_media = np.mean(cat_data["distancias"])
-
-                # Atualiza estado de alimentação
-                self._update_feeding_state(cat_id, cat_data, dist_media)
-
-    def _update_feeding_state(self, cat_id: int, dados, dist_media):
-        """Atualiza o estado de alimentação baseado na distância média"""
-        agora = time.time()
-
-        if not dados["comendo"]:
-            # Verifica se deve começar a comer
-            if dist_media < self.config.ENTER_THRESH:
-                if not dados["ultimo_estado"]:
-                    dados["ultimo_estado"] = True
-                    dados["tempo_estado"] = agora
-                elif agora - dados["tempo_estado"] >= self.config.MIN_TIME_START:
-                    dados["comendo"] = True
-                    dados["start_time"] = agora
-                    self.logger.info(f"Gato ID {cat_id} começou a comer!")
-                    # Notifica início da atividade
-                    self._on_activity_start(cat_id, "eating")
+    def _update_feeding_state(self, cat_id: int, dados, dist_media, zone, agora=None):
+        """Atualiza o estado da atividade da zona baseado na distância média"""
+        if agora is None:
+            agora = time.time()
+        atividade = dados.atividade
+
+        if not dados.em_atividade:
+            # Verifica se deve começar a atividade
+            if dist_media < zone["enter_thresh"]:
+                if not dados.ultimo_estado:
+                    dados.ultimo_estado = True
+                    dados.tempo_estado = agora
+                elif agora - dados.tempo_estado >= self.config.MIN_TIME_START:
+                    dados.em_atividade = True
+                    dados.start_time = agora
+                    self.logger.info(f"Gato ID {cat_id} começou atividade '{atividade}' em {zone['nome']}!")
+                    self._zone_activity_started(cat_id, atividade, zone["nome"], agora)
             else:
-                dados["ultimo_estado"] = False
+                dados.ultimo_estado = False
         else:
-            # Verifica se deve parar de comer
-            if dist_media > self.config.EXIT_THRESH:
-                if dados["ultimo_estado"]:
-                    dados["ultimo_estado"] = False
-                    dados["tempo_estado"] = agora
-                elif agora - dados["tempo_estado"] >= self.config.MIN_TIME_STOP:
-                    dur = agora - dados["start_time"]
-                    self.logger.info(f"Gato ID {cat_id} parou de comer após {dur:.1f}s")
-                    if dur >= self.config.MIN_ACTIVITY_DURATION_TO_REGISTER:
-                        # Notifica fim da atividade (converte timestamp para datetime)
-                        start_datetime = datetime.fromtimestamp(dados["start_time"])
-                        self._on_activity_end(cat_id, "eating", start_datetime)
-                    else:
-                        self.logger.info(f"Atividade de gato ID {cat_id} descartada por ser menor que {self.config.MIN_ACTIVITY_DURATION_TO_REGISTER} segundos")
-                    dados["comendo"] = False
-                    dados["start_time"] = None
+            # Verifica se deve parar a atividade
+            if dist_media > zone["exit_thresh"]:
+                if dados.ultimo_estado:
+                    dados.ultimo_estado = False
+                    dados.tempo_estado = agora
+                elif agora - dados.tempo_estado >= self.config.MIN_TIME_STOP:
+                    dur = agora - dados.start_time
+                    self.logger.info(f"Gato ID {cat_id} encerrou atividade '{atividade}' em {zone['nome']} após {dur:.1f}s")
+                    dados.em_atividade = False
+                    dados.start_time = None
+                    self._zone_activity_ended(cat_id, atividade, zone["nome"], agora)
             else:
-                dados["ultimo_estado"] = True
+                dados.ultimo_estado = True
+
+    def _zone_activity_started(self, cat_id: int, atividade: str, zone_name: str, agora: float):
+        """Notifica o início da atividade apenas na primeira zona desse tipo em que o gato entra"""
+        activity = self.active_activities.get((cat_id, atividade))
+        if activity is not None:
+            activity["zonas"].add(zone_name)
+            return
+        self.active_activities[(cat_id, atividade)] = {"zonas": {zone_name}, "start_time": agora}
+        # Notifica início da atividade com o instante de captura do frame
+        self._on_activity_start(cat_id, atividade, datetime.fromtimestamp(agora))
+
+    def _zone_activity_ended(self, cat_id: int, atividade: str, zone_name: str, agora: float):
+        """Notifica o fim da atividade apenas quando o gato sai da última zona desse tipo"""
+        activity = self.active_activities.get((cat_id, atividade))
+        if activity is None:
+            return
+        activity["zonas"].discard(zone_name)
+        if activity["zonas"]:
+            # O gato continua na mesma atividade em outra zona (outro pote, por exemplo)
+            return
+        del self.active_activities[(cat_id, atividade)]
+        self._finish_activity(cat_id, atividade, activity["start_time"], agora)
+
+    def _finish_activity(self, cat_id: int, atividade: str, start_time: float, agora: float):
+        """Registra o fim da atividade ou a descarta se for curta demais"""
+        if agora - start_time >= self.config.MIN_ACTIVITY_DURATION_TO_REGISTER:
+            # Notifica fim da atividade (converte os timestamps de captura para datetime)
+            self._on_activity_end(cat_id, atividade, datetime.fromtimestamp(start_time), datetime.fromtimestamp(agora))
+        else:
+            self.logger.info(f"Atividade de gato ID {cat_id} descartada por ser menor que {self.config.MIN_ACTIVITY_DURATION_TO_REGISTER} segundos")
 
     def get_estado(self):
         """Retorna o estado atual de rastreamento"""
         return self.estado
 
-    def cleanup_inactive_cats(self, active_cats):
+    def cleanup_inactive_cats(self, active_cats, timestamp=None):
         """Remove gatos que não estão mais sendo detectados após um tempo de tolerância"""
-        agora = time.time()
+        agora = timestamp if timestamp is not None else time.time()
 
         # Converte active_cats para IDs se necessário
         active_cat_ids = []
@@ -132,64 +198,75 @@ class ActivityTracker:
             if cat_id not in active_cat_ids:
                 last_seen_time = self.last_seen.get(cat_id, 0)
                 if agora - last_seen_time > self.config.CAT_INACTIVITY_TIMEOUT:
-                    # Antes de remover, verifica se o gato estava em atividade
-                    cat_data = self.estado.get(cat_id, {}).get(self.pote_nome, None)
-                    if cat_data and cat_data.get("comendo", False):
-                        duracao_atividade = agora - cat_data.get("start_time", agora)
-                        if duracao_atividade >= self.config.MIN_ACTIVITY_DURATION_TO_REGISTER:
-                            # Finaliza e registra a atividade
-                            start_datetime = datetime.fromtimestamp(cat_data["start_time"])
-                            if hasattr(self, 'activity_notifier'):
-                                # Usa thread separada com timeout para evitar travamentos
-                                threading.Thread(
-                                    target=self._notify_activity_end_with_timeout,
-                                    args=(cat_id, "eating", start_datetime),
-                                    daemon=True
-                                ).start()
-                        else:
-                            # Atividade muito curta, descarta sem registrar
-                            self.logger.info(f"Atividade de gato ID {cat_id} descartada por ser menor que {self.config.MIN_ACTIVITY_DURATION_TO_REGISTER} segundos")
+                    # Antes de remover, finaliza as atividades em andamento (uma por tipo, mesmo
+                    # que o gato estivesse em várias zonas da mesma atividade)
+                    for (active_cat_id, atividade), activity in list(self.active_activities.items()):
+                        if active_cat_id == cat_id:
+                            self._finish_activity(cat_id, atividade, activity["start_time"], agora)
                     inactive_cats.append(cat_id)
 
         for cat_id in inactive_cats:
             self.logger.info(f"Removendo rastreamento de gato ID {cat_id} (não detectado por mais de {self.config.CAT_INACTIVITY_TIMEOUT} segundos)")
-            del self.estado[cat_id]
+            self._release_cat(cat_id)
             if cat_id in self.last_seen:
                 del self.last_seen[cat_id]
 
+    def _release_cat(self, cat_id: int):
+        """Remove o estado do gato e libera suas janelas de distância"""
+        for dados in self.estado.pop(cat_id).values():
+            self.distance_windows.release(dados.row)
+        for key in [key for key in self.active_activities if key[0] == cat_id]:
+            del self.active_activities[key]
+
     def set_activity_notifier(self, notifier):
         """Define o notificador de atividades"""
         self.activity_notifier = notifier
 
 
-    def _on_activity_start(self, cat_id: int, activity_type: str):
-        """Chamado quando uma atividade inicia"""
+    def _uses_outbox(self) -> bool:
+        """
+        Com a fila durável a notificação só grava em disco e pode ser feita no próprio loop;
+        o mesmo vale para notificadores que apenas repassam o evento (`non_blocking`)
+        """
+        if getattr(self.activity_notifier, "non_blocking", False):
+            return True
+        return getattr(self.activity_notifier, "outbox", None) is not None
+
+    def _on_activity_start(self, cat_id: int, activity_type: str, timestamp: datetime = None):
+        """Chamado quando uma atividade inicia (timestamp: instante de captura do frame)"""
         if hasattr(self, 'activity_notifier'):
+            if self._uses_outbox():
+                self.activity_notifier.notify_activity_start(cat_id, activity_type, timestamp)
+                return
             # Executa a notificação em uma thread separada para não bloquear o fluxo principal
-            threading.Thread(target=self.activity_notifier.notify_activity_start, args=(cat_id, activity_type), daemon=True).start()
+            threading.Thread(target=self.activity_notifier.notify_activity_start, args=(cat_id, activity_type, timestamp), daemon=True).start()
 
-    def _on_activity_end(self, cat_id: int, activity_type: str, start_time):
-        """Chamado quando uma atividade termina"""
+    def _on_activity_end(self, cat_id: int, activity_type: str, start_time, end_time: datetime = None):
+        """Chamado quando uma atividade termina (end_time: instante de captura do frame)"""
         if hasattr(self, 'activity_notifier'):
+            if self._uses_outbox():
+                self._notify_activity_end_with_timeout(cat_id, activity_type, start_time, end_time)
+                return
             # Executa a notificação em uma thread separada para não bloquear o fluxo principal
             threading.Thread(
                 target=self._notify_activity_end_with_timeout,
-                args=(cat_id, activity_type, start_time),
+                args=(cat_id, activity_type, start_time, end_time),
                 daemon=True
             ).start()
 
-    def _notify_activity_end_with_timeout(self, cat_id: int, activity_type: str, start_time: datetime):
+    def _notify_activity_end_with_timeout(self, cat_id: int, activity_type: str, start_time: datetime,
+                                          end_time: datetime = None):
         """Notifica o fim da atividade com timeout para evitar travamentos"""
         try:
             if hasattr(self, 'activity_notifier'):
-                self.activity_notifier.notify_activity_end(cat_id, activity_type, start_time)
+                self.activity_notifier.notify_activity_end(cat_id, activity_type, start_time, end_time)
         except Exception as e:
             self.logger.error(f"Erro ao notificar fim da atividade: {e}")
 
     def remove_cat(self, cat_id: int):
         """Remove explicitamente um gato do rastreamento e do last_seen"""
         if cat_id in self.estado:
-            del self.estado[cat_id]
+            self._release_cat(cat_id)
         if cat_id in self.last_seen:
             del self.last_seen[cat_id]
         self.logger.info(f"Removido explicitamente rastreamento de gato ID {cat_id}")
\ No newline at end of file
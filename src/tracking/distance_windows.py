@@ -0,0 +1,103 @@
+import numpy as np
+
+
+class ZoneActivityState:
+    """Estado escalar da atividade de um gato em uma zona"""
+
+    __slots__ = (
+        "zona", "atividade", "em_atividade", "start_time",
+        "ultimo_estado", "tempo_estado", "row", "dist_media", "amostras"
+    )
+
+    def __init__(self, zona, atividade, row):
+        self.zona = zona
+        self.atividade = atividade
+        self.em_atividade = False
+        self.start_time = None
+        self.ultimo_estado = False
+        self.tempo_estado = 0
+        self.row = row  # Linha da janela de distâncias em DistanceWindows
+        self.dist_media = None  # Média móvel calculada na última atualização
+        self.amostras = 0  # Quantidade de distâncias na janela
+
+
+class DistanceWindows:
+    """
+    Janelas deslizantes de distâncias em estrutura de arrays.
+
+    Cada par (gato, zona) ocupa uma linha de um buffer circular pré-alocado. As somas são
+    mantidas incrementalmente, então a média móvel de todas as linhas visíveis é atualizada
+    em um único passo vetorizado, sem alocar uma estrutura por gato a cada frame.
+    """
+
+    def __init__(self, window_size: int, capacity: int = 16):
+        self.window_size = window_size
+        self.buffer = np.zeros((capacity, window_size), dtype=np.float64)
+        self.sums = np.zeros(capacity, dtype=np.float64)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.heads = np.zeros(capacity, dtype=np.int64)
+        self._free_rows = list(range(capacity - 1, -1, -1))
+
+    @property
+    def capacity(self) -> int:
+        return self.buffer.shape[0]
+
+    def _grow(self):
+        """Dobra a capacidade preservando as linhas existentes"""
+        old = self.capacity
+        new = old * 2
+        self.buffer = np.concatenate([self.buffer, np.zeros((old, self.window_size))])
+        self.sums = np.concatenate([self.sums, np.zeros(old)])
+        self.counts = np.concatenate([self.counts, np.zeros(old, dtype=np.int64)])
+        self.heads = np.concatenate([self.heads, np.zeros(old, dtype=np.int64)])
+        self._free_rows.extend(range(new - 1, old - 1, -1))
+
+    def allocate(self) -> int:
+        """Reserva uma linha vazia e retorna seu índice"""
+        if not self._free_rows:
+            self._grow()
+        return self._free_rows.pop()
+
+    def release(self, row: int):
+        """Libera a linha para reutilização"""
+        self.buffer[row] = 0.0
+        self.sums[row] = 0.0
+        self.counts[row] = 0
+        self.heads[row] = 0
+        self._free_rows.append(row)
+
+    def push(self, rows, values):
+        """
+        Adiciona uma distância em cada linha e retorna as médias móveis atualizadas
+
+        Args:
+            rows: Índices das linhas (sem repetição)
+            values: Distância correspondente a cada linha
+
+        Returns:
+            np.ndarray: Média móvel de cada linha após a inserção
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        heads = self.heads[rows]
+
+        # O valor substituído é zero enquanto a janela não está cheia
+        self.sums[rows] += values - self.buffer[rows, heads]
+        self.buffer[rows, heads] = values
+        self.counts[rows] = np.minimum(self.counts[rows] + 1, self.window_size)
+        heads = (heads + 1) % self.window_size
+        self.heads[rows] = heads
+
+        # Recalcula a soma a cada volta completa para não acumular erro de arredondamento
+        wrapped = rows[heads == 0]
+        if wrapped.size:
+            self.sums[wrapped] = self.buffer[wrapped].sum(axis=1)
+
+        return self.sums[rows] / self.counts[rows]
+
+    def mean(self, row: int):
+        """Média móvel da linha (None se ainda não houver distâncias)"""
+        count = self.counts[row]
+        if count == 0:
+            return None
+        return float(self.sums[row] / count)
@@ -0,0 +1,137 @@
+# Testes para a fila durável de eventos de atividade
+
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tracking.activity_notifier import ActivityNotifier
+from src.tracking.activity_outbox import ActivityOutbox
+
+
+class FakeAPIClient:
+    """Cliente da API que falha enquanto `online` for False"""
+
+    def __init__(self, online=True):
+        self.online = online
+        self.calls = []
+        self._next_id = 100
+
+    def test_connection(self):
+        return self.online
+
+    def create_activity(self, cat_id, activity_title, timestamp=None, camera_id=1):
+        if not self.online:
+            return None
+        self._next_id += 1
+        self.calls.append(("create", cat_id, activity_title, self._next_id))
+        return self._next_id
+
+    def finish_activity(self, activity_id, end_time=None):
+        if not self.online:
+            return False
+        self.calls.append(("finish", activity_id))
+        return True
+
+
+def wait_until(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class TestActivityOutbox(unittest.TestCase):
+    """Testes de entrega, ordem e reenvio dos eventos da fila"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "outbox.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _notifier(self, api):
+        return ActivityNotifier(api, {"eating": "eat"}, True, outbox=ActivityOutbox(self.path),
+                                backoff_base=0.01, backoff_max=0.05)
+
+    def test_events_are_retried_in_order(self):
+        api = FakeAPIClient(online=False)
+        notifier = self._notifier(api)
+
+        self.assertTrue(notifier.notify_activity_start(7, "eating"))
+        self.assertTrue(notifier.notify_activity_end(7, "eating"))
+        time.sleep(0.05)
+        self.assertEqual(notifier.outbox.pending_count(), 2)
+
+        api.online = True
+        self.assertTrue(wait_until(lambda: notifier.outbox.pending_count() == 0))
+        self.assertEqual(api.calls, [("create", 7, "eat", 101), ("finish", 101)])
+        self.assertEqual(notifier.get_active_activities(), {})
+        notifier.close()
+
+    def test_pending_events_are_replayed_after_restart(self):
+        api = FakeAPIClient(online=False)
+        notifier = self._notifier(api)
+        notifier.notify_activity_start(3, "eating")
+        notifier.notify_activity_end(3, "eating")
+        notifier.close(drain_timeout=0.1)
+
+        api.online = True
+        restarted = self._notifier(api)
+        self.assertTrue(wait_until(lambda: restarted.outbox.pending_count() == 0))
+        self.assertEqual([call[0] for call in api.calls], ["create", "finish"])
+        restarted.close()
+
+    def test_open_session_is_finished_after_restart(self):
+        api = FakeAPIClient()
+        notifier = self._notifier(api)
+        notifier.notify_activity_start(4, "eating", camera_id=2)
+        self.assertTrue(wait_until(lambda: notifier.outbox.pending_count() == 0))
+        # Queda no meio da atividade: o fim nunca é notificado
+        notifier.close(drain_timeout=0.1)
+
+        restarted = self._notifier(api)
+        self.assertTrue(wait_until(lambda: restarted.outbox.pending_count() == 0))
+        self.assertEqual(api.calls, [("create", 4, "eat", 101), ("finish", 101)])
+        self.assertIsNone(restarted.outbox.session_activity_id(next(iter(notifier.sessions))))
+        restarted.close()
+
+    def test_pending_start_is_finished_after_restart(self):
+        api = FakeAPIClient(online=False)
+        notifier = self._notifier(api)
+        notifier.notify_activity_start(6, "eating")
+        notifier.close(drain_timeout=0.1)
+
+        api.online = True
+        restarted = self._notifier(api)
+        self.assertTrue(wait_until(lambda: restarted.outbox.pending_count() == 0))
+        self.assertEqual([call[0] for call in api.calls], ["create", "finish"])
+        restarted.close()
+
+    def test_end_without_start_is_rejected(self):
+        notifier = self._notifier(FakeAPIClient())
+        self.assertFalse(notifier.notify_activity_end(5, "eating"))
+        self.assertEqual(notifier.outbox.pending_count(), 0)
+        notifier.close()
+
+    def test_cleanup_enqueues_open_activities(self):
+        api = FakeAPIClient()
+        notifier = self._notifier(api)
+        notifier.notify_activity_start(1, "eating")
+        notifier.notify_activity_start(2, "eating")
+
+        self.assertEqual(notifier.cleanup_all_activities(), 2)
+        notifier.close()
+
+        self.assertEqual(sorted(call[0] for call in api.calls), ["create", "create", "finish", "finish"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# Testes para as sessões de atividade com ID local
+
+import unittest
+import sys
+import os
+import threading
+from datetime import datetime, timedelta
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tracking.activity_notifier import ActivityNotifier
+from src.tracking.activity_session import ActivitySession, SessionState
+
+
+class SlowCreateAPIClient:
+    """Cliente da API cuja criação só retorna quando `release` é sinalizado"""
+
+    def __init__(self):
+        self.calls = []
+        self.create_started = threading.Event()
+        self.release = threading.Event()
+
+    def test_connection(self):
+        return True
+
+    def create_activity(self, cat_id, activity_title, timestamp=None, camera_id=1):
+        self.create_started.set()
+        self.release.wait(3.0)
+        self.calls.append(("create", cat_id))
+        return 42
+
+    def finish_activity(self, activity_id, end_time=None):
+        self.calls.append(("finish", activity_id, end_time))
+        return True
+
+
+class TestActivitySession(unittest.TestCase):
+    """Testes das transições de estado da sessão"""
+
+    def test_normal_lifecycle(self):
+        session = ActivitySession(1, "eating", datetime.now())
+        self.assertEqual(session.state, SessionState.PENDING_CREATE)
+        self.assertEqual(len(session.session_id), 32)
+
+        self.assertFalse(session.created(7))
+        self.assertEqual(session.state, SessionState.OPEN)
+        self.assertTrue(session.request_finish(datetime.now()))
+        self.assertEqual(session.state, SessionState.PENDING_FINISH)
+        session.close()
+        self.assertEqual(session.state, SessionState.CLOSED)
+
+    def test_finish_before_create_is_queued(self):
+        session = ActivitySession(1, "eating", datetime.now())
+        self.assertFalse(session.request_finish(datetime.now()))
+        self.assertEqual(session.state, SessionState.PENDING_FINISH)
+        # O ID chega depois do fim: a finalização deve ser enviada agora
+        self.assertTrue(session.created(7))
+        self.assertEqual(session.activity_id, 7)
+
+    def test_invalid_transition(self):
+        session = ActivitySession(1, "eating", datetime.now())
+        session.created(7)
+        with self.assertRaises(ValueError):
+            session.created(8)
+        session.close()
+        with self.assertRaises(ValueError):
+            session.request_finish(datetime.now())
+
+
+class TestNotifierSessions(unittest.TestCase):
+    """Testes da corrida entre criação e finalização no notificador"""
+
+    def test_end_during_slow_create_finishes_with_api_id(self):
+        api = SlowCreateAPIClient()
+        notifier = ActivityNotifier(api)
+        start = datetime.now()
+        end = start + timedelta(seconds=5)
+
+        results = []
+        creator = threading.Thread(target=lambda: results.append(notifier.notify_activity_start(1, "eating", start)))
+        creator.start()
+        self.assertTrue(api.create_started.wait(3.0))
+
+        # O fim chega enquanto a criação ainda aguarda a resposta da API
+        self.assertTrue(notifier.notify_activity_end(1, "eating", end_time=end))
+        self.assertEqual(api.calls, [])
+
+        api.release.set()
+        creator.join(3.0)
+
+        self.assertEqual(results, [True])
+        self.assertEqual(api.calls, [("create", 1), ("finish", 42, end)])
+        self.assertEqual(notifier.get_active_activities(), {})
+        self.assertEqual(notifier.sessions, {})
+
+    def test_new_session_after_end_is_independent(self):
+        api = SlowCreateAPIClient()
+        api.release.set()
+        notifier = ActivityNotifier(api)
+
+        notifier.notify_activity_start(1, "eating")
+        notifier.notify_activity_end(1, "eating")
+        notifier.notify_activity_start(1, "eating")
+        self.assertEqual(notifier.get_active_activities(), {(1, "eating"): 42})
+        self.assertEqual(len(notifier.sessions), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# Testes para o cliente assíncrono da API usando a API simulada local
+
+import unittest
+import sys
+import os
+import tempfile
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.async_api_client import AsyncAPIClient
+from src.api.event_loop import EventLoopThread
+from src.api.stand_in_server import StandInServer
+from src.tracking.activity_notifier import ActivityNotifier
+from src.tracking.activity_outbox import ActivityOutbox
+from tests.test_activity_outbox import wait_until
+
+
+class TestAsyncAPIClient(unittest.TestCase):
+    """Testes do cliente assíncrono com conexões keep-alive"""
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.client = AsyncAPIClient(self.server.base_url, "chave", timeout=2, max_connections=2)
+        self.loop = EventLoopThread()
+
+    def tearDown(self):
+        self.loop.run(self.client.close())
+        self.loop.stop()
+        self.server.stop()
+
+    def test_create_and_finish_reuse_connection(self):
+        ids = [self.loop.run(self.client.create_activity(cat_id, "eat")) for cat_id in range(5)]
+        self.assertEqual(ids, [1, 2, 3, 4, 5])
+        self.assertTrue(self.loop.run(self.client.finish_activity(ids[0])))
+        self.assertFalse(self.loop.run(self.client.finish_activity(999)))
+
+        # Requisições sequenciais usam a mesma conexão do pool
+        self.assertEqual(self.server.api.connections, 1)
+
+    def test_unavailable_api_returns_none(self):
+        self.server.api.online = False
+        self.assertIsNone(self.loop.run(self.client.create_activity(1, "eat")))
+        self.assertFalse(self.loop.run(self.client.finish_activity(1)))
+
+
+class TestNotifierWithAsyncClient(unittest.TestCase):
+    """Testes do notificador executando o cliente assíncrono em um único loop"""
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_outbox_events_are_delivered(self):
+        client = AsyncAPIClient(self.server.base_url, "chave", timeout=2)
+        outbox = ActivityOutbox(os.path.join(self.tmp.name, "outbox.db"))
+        notifier = ActivityNotifier(client, {"eating": "eat"}, True, outbox=outbox, backoff_base=0.01)
+
+        for cat_id in range(1, 7):
+            notifier.notify_activity_start(cat_id, "eating")
+        notifier.notify_activity_end(1, "eating")
+
+        self.assertTrue(wait_until(lambda: outbox.pending_count() == 0))
+        self.assertEqual(len(self.server.api.activities), 6)
+        self.assertEqual(set(notifier.get_active_activities()), {(cat_id, "eating") for cat_id in range(2, 7)})
+        notifier.close()
+
+    def test_direct_notifications_without_outbox(self):
+        client = AsyncAPIClient(self.server.base_url, "chave", timeout=2)
+        notifier = ActivityNotifier(client, {"eating": "eat"}, True)
+
+        self.assertTrue(notifier.notify_activity_start(9, "eating"))
+        self.assertTrue(notifier.notify_activity_end(9, "eating"))
+        self.assertEqual([method for method, _ in self.server.api.requests], ["GET", "POST", "PATCH"])
+        notifier.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# Testes para o envio em lote das atividades usando a API simulada local
+
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.api_client import APIClient
+from src.api.stand_in_server import StandInServer
+from src.tracking.activity_notifier import ActivityNotifier
+from src.tracking.activity_outbox import ActivityOutbox
+from tests.test_activity_outbox import wait_until
+
+
+class TestBulkActivities(unittest.TestCase):
+    """Testes do envio em lote e da união de criação/finalização"""
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.client = APIClient(self.server.base_url, "chave", timeout=2)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def _notifier(self, batch_max_age=0.3):
+        outbox = ActivityOutbox(os.path.join(self.tmp.name, "outbox.db"))
+        return ActivityNotifier(self.client, {"eating": "eat"}, True, outbox=outbox,
+                                backoff_base=0.01, batch_max_size=50, batch_max_age=batch_max_age)
+
+    def _bulk_requests(self):
+        return [request for request in self.server.api.requests if request == ("POST", "/activities/bulk")]
+
+    def test_single_requests_against_stand_in(self):
+        activity_id = self.client.create_activity(4, "eat")
+        self.assertIsNotNone(activity_id)
+        self.assertTrue(self.client.finish_activity(activity_id))
+        self.assertFalse(self.client.finish_activity(999))
+
+    def test_short_session_is_coalesced_into_one_record(self):
+        notifier = self._notifier()
+        started = datetime.now()
+        notifier.notify_activity_start(1, "eating", started)
+        notifier.notify_activity_end(1, "eating", end_time=started + timedelta(milliseconds=1))
+        notifier.notify_activity_start(2, "eating", started)
+
+        self.assertTrue(wait_until(lambda: notifier.outbox.pending_count() == 0))
+        self.assertEqual(len(self._bulk_requests()), 1)
+
+        activities = {activity["catId"]: activity for activity in self.server.api.activities.values()}
+        self.assertGreater(activities[1]["endedAt"], activities[1]["startedAt"])
+        self.assertEqual(activities[2]["endedAt"], activities[2]["startedAt"])
+        self.assertIn((2, "eating"), notifier.get_active_activities())
+
+        # O fim da sessão em andamento vira uma finalização em um novo lote
+        notifier.notify_activity_end(2, "eating")
+        self.assertTrue(wait_until(lambda: notifier.outbox.pending_count() == 0))
+        self.assertEqual(len(self._bulk_requests()), 2)
+        self.assertGreater(activities[2]["endedAt"], activities[2]["startedAt"])
+        notifier.close()
+
+    def test_failed_batch_is_retried(self):
+        self.server.api.online = False
+        notifier = self._notifier(batch_max_age=0.0)
+        notifier.notify_activity_start(3, "eating")
+        self.assertTrue(wait_until(lambda: len(self._bulk_requests()) >= 1))
+
+        self.server.api.online = True
+        self.assertTrue(wait_until(lambda: notifier.outbox.pending_count() == 0))
+        self.assertEqual(len(self.server.api.activities), 1)
+        notifier.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
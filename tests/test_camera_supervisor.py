@@ -0,0 +1,162 @@
+# Testes para o modo de várias câmeras (ID da câmera nas atividades e supervisor de processos)
+
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.api_client import APIClient
+from src.managers.camera_supervisor import CameraSupervisor, apply_camera_overrides
+from src.tracking.activity_notifier import ActivityNotifier
+from src.tracking.activity_outbox import ActivityOutbox
+
+
+class FakeAPIClient:
+    """Cliente da API que registra as câmeras das atividades criadas"""
+
+    def __init__(self):
+        self.calls = []
+        self._next_id = 100
+        self._lock = threading.Lock()
+
+    def test_connection(self):
+        return True
+
+    def create_activity(self, cat_id, activity_title, timestamp=None, camera_id=1):
+        with self._lock:
+            self._next_id += 1
+            self.calls.append(("create", camera_id, cat_id, self._next_id))
+            return self._next_id
+
+    def finish_activity(self, activity_id, end_time=None):
+        with self._lock:
+            self.calls.append(("finish", activity_id))
+        return True
+
+
+def crashing_worker(camera, event_queue, frame_sink, stop_event, latency_metrics=None):
+    """Processo de câmera que registra uma atividade e falha logo em seguida"""
+    event_queue.put(("start", int(camera["id"]), 5, "eating", datetime.now()))
+    time.sleep(0.05)
+    os._exit(3)
+
+
+def healthy_worker(camera, event_queue, frame_sink, stop_event, latency_metrics=None):
+    """Processo de câmera que roda até o supervisor pedir o encerramento"""
+    stop_event.wait(10.0)
+
+
+def worker(camera, *args):
+    target = crashing_worker if camera.get("crash") else healthy_worker
+    target(camera, *args)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+class TestCameraIdPayload(unittest.TestCase):
+    """Testes do ID da câmera nas atividades"""
+
+    def test_payload_carries_camera_id(self):
+        payload = APIClient.activity_payload(2, "eat", datetime(2024, 1, 1), camera_id=4)
+        self.assertEqual(payload["cameraId"], 4)
+        self.assertEqual(APIClient.activity_payload(2, "eat", datetime(2024, 1, 1))["cameraId"], 1)
+
+    def test_camera_overrides(self):
+        class Config:
+            RTSP_URL = None
+            CAMERA_WIDTH = 1920
+
+        config = apply_camera_overrides(Config(), {"id": "3", "url": "rtsp://cam3", "CAMERA_WIDTH": 640, "nome": "x"})
+        self.assertEqual((config.CAMERA_ID, config.RTSP_URL, config.CAMERA_WIDTH), (3, "rtsp://cam3", 640))
+        self.assertFalse(hasattr(config, "nome"))
+
+    def test_same_cat_on_two_cameras_opens_two_sessions(self):
+        api = FakeAPIClient()
+        notifier = ActivityNotifier(api, enabled=True)
+        notifier.notify_activity_start(1, "eating", camera_id=1)
+        notifier.notify_activity_start(1, "eating", camera_id=2)
+        self.assertEqual(sorted(call[1] for call in api.calls), [1, 2])
+
+        self.assertEqual(notifier.cleanup_all_activities(camera_id=2), 1)
+        self.assertEqual(notifier.get_active_activities(camera_id=2), {})
+        self.assertIn((1, "eating"), notifier.get_active_activities())
+
+    def test_outbox_migrates_and_orders_per_camera(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "outbox.db")
+            # Fila criada por uma versão anterior, sem a coluna camera_id
+            conn = sqlite3.connect(path)
+            conn.execute(
+                """CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL,
+                   cat_id INTEGER NOT NULL, activity_type TEXT NOT NULL, event TEXT NOT NULL,
+                   timestamp TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,
+                   next_attempt_at REAL NOT NULL DEFAULT 0)"""
+            )
+            conn.execute(
+                "INSERT INTO events (session_id, cat_id, activity_type, event, timestamp) VALUES ('s1', 1, 'eating', 'start', ?)",
+                (datetime.now().isoformat(),)
+            )
+            conn.commit()
+            conn.close()
+
+            outbox = ActivityOutbox(path)
+            try:
+                outbox.enqueue("start", "s2", 1, "eating", datetime.now(), camera_id=2)
+                # Mesma chave em câmeras diferentes: os dois eventos são elegíveis ao mesmo tempo
+                events = outbox.due_events(time.time())
+                self.assertEqual([(event["session_id"], event["camera_id"]) for event in events], [("s1", 1), ("s2", 2)])
+            finally:
+                outbox.close()
+
+
+class TestCameraSupervisor(unittest.TestCase):
+    """Testes do supervisor de processos das câmeras"""
+
+    def test_crashed_worker_restarts_without_affecting_others(self):
+        api = FakeAPIClient()
+        notifier = ActivityNotifier(api, enabled=True)
+        supervisor = CameraSupervisor(
+            [{"id": 1}, {"id": 2, "crash": True}], notifier,
+            restart_delay=0.05, restart_max_delay=0.2, start_method="fork", worker_target=worker
+        )
+        supervisor.start()
+        try:
+            healthy_pid = supervisor.workers[1].process.pid
+            poller = threading.Thread(target=supervisor.run, args=(0.02,), daemon=True)
+            poller.start()
+
+            self.assertTrue(wait_until(lambda: supervisor.workers[2].restarts >= 2))
+            stats = supervisor.stats()
+            self.assertEqual(stats[2]["last_exitcode"], 3)
+            self.assertTrue(stats[1]["alive"])
+            self.assertEqual(stats[1]["pid"], healthy_pid)
+            self.assertEqual(stats[1]["restarts"], 0)
+
+            # As atividades da câmera que falhou chegam com o ID real e são finalizadas após cada queda
+            self.assertTrue(wait_until(lambda: sum(1 for call in api.calls if call[0] == "finish") >= 2))
+            self.assertTrue(all(call[1] == 2 for call in api.calls if call[0] == "create"))
+        finally:
+            supervisor.stop()
+        self.assertFalse(supervisor.stats()[1]["alive"])
+
+    def test_rejects_duplicate_camera_ids(self):
+        with self.assertRaises(ValueError):
+            CameraSupervisor([{"id": 1}, {"id": 1}], None)
+
+
+if __name__ == '__main__':
+    unittest.main()
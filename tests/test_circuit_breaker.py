@@ -0,0 +1,182 @@
+# Testes para o disjuntor (circuit breaker) da API
+
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.api_client import APIClient
+from src.api.async_api_client import AsyncAPIClient
+from src.api.circuit_breaker import CircuitBreaker
+from src.api.stand_in_server import StandInServer
+from src.tracking.activity_notifier import ActivityNotifier
+from src.tracking.activity_outbox import ActivityOutbox, OutboxSender
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Testes das transições closed -> open -> half_open -> closed"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.changes = []
+        self.breaker = CircuitBreaker(
+            failure_rate_threshold=0.5, latency_threshold=1.0, window_size=10, min_requests=4,
+            open_seconds=10.0, on_state_change=lambda old, new: self.changes.append((old, new)),
+            clock=self.clock
+        )
+
+    def test_trips_on_failure_rate(self):
+        for success in (True, False, True):
+            self.assertTrue(self.breaker.allow_request())
+            (self.breaker.record_success if success else self.breaker.record_failure)(0.01)
+        # Abaixo de min_requests não avalia
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+        self.breaker.record_failure(0.01)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.trip_count, 1)
+        self.assertFalse(self.breaker.allow_request())
+        self.assertEqual(self.breaker.rejected_count, 1)
+        self.assertAlmostEqual(self.breaker.retry_in(), 10.0)
+
+    def test_trips_on_latency_percentile(self):
+        for _ in range(4):
+            self.breaker.record_success(3.0)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        for _ in range(4):
+            self.breaker.record_failure()
+        self.clock.now = 10.0
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(self.breaker.retry_in(), 0.0)
+
+        # Apenas uma requisição de teste por vez
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.trip_count, 2)
+
+        self.clock.now = 20.0
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success(0.01)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.changes, [
+            ("closed", "open"), ("open", "half_open"), ("half_open", "open"),
+            ("open", "half_open"), ("half_open", "closed")
+        ])
+        self.assertEqual(self.breaker.stats()["state_changes"], 5)
+
+
+class TestCircuitBreakerWithAPI(unittest.TestCase):
+    """Testes do disjuntor com a API simulada fora do ar"""
+
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(min_requests=2, open_seconds=30.0, clock=self.clock)
+        self.client = APIClient(self.server.base_url, "chave", timeout=2, breaker=self.breaker)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_open_circuit_fails_fast_without_requests(self):
+        self.server.api.online = False
+        self.assertIsNone(self.client.create_activity(1, "eat"))
+        self.assertFalse(self.client.finish_activity(1))
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        requests_before = len(self.server.api.requests)
+        self.assertIsNone(self.client.create_activity(1, "eat"))
+        self.assertIsNone(self.client.bulk_activities([{"op": "finish", "id": 1, "endedAt": "x"}]))
+        self.assertEqual(len(self.server.api.requests), requests_before)
+
+        # Recuperação: a requisição de teste fecha o circuito
+        self.server.api.online = True
+        self.clock.now = 30.0
+        self.assertEqual(self.client.create_activity(1, "eat"), 1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_client_errors_do_not_trip(self):
+        for _ in range(4):
+            self.assertFalse(self.client.finish_activity(999))
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_outbox_keeps_events_while_open(self):
+        outbox = ActivityOutbox(os.path.join(self.tmp.name, "outbox.db"))
+        delivered = []
+        sender = OutboxSender(outbox, lambda event: delivered.append(event) or True, breaker=self.breaker)
+
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        outbox.enqueue("start", "s1", 1, "eating", datetime.now())
+
+        self.assertEqual(sender.process_due(), 0)
+        self.assertEqual(delivered, [])
+        self.assertEqual(outbox.due_events(float("inf"))[0]["attempts"], 0)
+        self.assertAlmostEqual(sender._next_wait(), 30.0, delta=0.5)
+
+        self.clock.now = 30.0
+        self.assertEqual(sender.process_due(), 1)
+        self.assertEqual(outbox.pending_count(), 0)
+        outbox.close()
+
+    def test_outbox_round_stops_when_circuit_opens(self):
+        self.server.api.online = False
+        breaker = CircuitBreaker(window_size=3, min_requests=3, open_seconds=30.0, clock=self.clock)
+        client = APIClient(self.server.base_url, "chave", timeout=2, breaker=breaker)
+        outbox = ActivityOutbox(os.path.join(self.tmp.name, "outbox.db"))
+        sender = OutboxSender(outbox, lambda event: client.create_activity(event["cat_id"], "eat") is not None,
+                              breaker=breaker)
+        for cat_id in range(1, 11):
+            outbox.enqueue("start", f"s{cat_id}", cat_id, "eating", datetime.now())
+
+        self.assertEqual(sender.process_due(), 0)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        # Só as três chamadas que abriram o circuito contam tentativa; as demais não foram feitas
+        attempts = sorted(event["attempts"] for event in outbox.due_events(float("inf")))
+        self.assertEqual(attempts, [0] * 7 + [1] * 3)
+        self.assertEqual(len(self.server.api.requests), 3)
+        self.assertEqual(breaker.rejected_count, 0)
+        outbox.close()
+
+    def test_concurrent_delivery_sends_single_probe_when_half_open(self):
+        self.server.api.online = False
+        client = AsyncAPIClient(self.server.base_url, "chave", timeout=2, breaker=self.breaker)
+        notifier = ActivityNotifier(client, {"eating": "eat"}, enabled=False)
+        try:
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+            self.clock.now = 30.0
+            self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+
+            events = [
+                {"id": cat_id, "event": "start", "cat_id": cat_id, "activity_type": "eating",
+                 "camera_id": 1, "timestamp": datetime.now(), "session_id": f"s{cat_id}"}
+                for cat_id in range(1, 6)
+            ]
+            # A chamada de teste falha e reabre o circuito; os outros eventos ficam sem tentativa
+            self.assertEqual(notifier._deliver_concurrently(events), {1: False})
+            self.assertEqual(len(self.server.api.requests), 1)
+            self.assertEqual(self.breaker.rejected_count, 0)
+        finally:
+            notifier.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
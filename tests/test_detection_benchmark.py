@@ -0,0 +1,99 @@
+# Testes para o gerador de cenas ArUco sintéticas e o benchmark de detecção
+
+import unittest
+import sys
+import os
+import json
+
+import cv2
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks import detection_benchmark
+from benchmarks.detection_benchmark import SyntheticArucoScene, compare, parse_resolution, scaled_camera_matrix
+from config.config import Config
+
+
+class TestSyntheticArucoScene(unittest.TestCase):
+    """Testes da renderização das cenas sintéticas"""
+
+    def setUp(self):
+        config = Config()
+        self.scene = SyntheticArucoScene(
+            640, 360, config.camera_matrix, config.dist_coeffs, [5, 9, 23],
+            marker_size=0.05, distance=(0.3, 0.6), blur=0.0, noise=0.0
+        )
+
+    def test_camera_matrix_scaled_to_resolution(self):
+        matrix = scaled_camera_matrix(Config().camera_matrix, 3840, 2160)
+        self.assertAlmostEqual(matrix[0, 2], 1920.0)
+        self.assertAlmostEqual(matrix[1, 2], 1080.0)
+        self.assertAlmostEqual(matrix[0, 0], 3000.0)
+        self.assertEqual(parse_resolution("4K"), ("4k", (3840, 2160)))
+        self.assertEqual(parse_resolution("800x600"), ("800x600", (800, 600)))
+        with self.assertRaises(ValueError):
+            parse_resolution("grande")
+
+    def test_rendered_corners_match_ground_truth(self):
+        frame, truth = self.scene.render(3)
+        self.assertEqual(frame.shape, (360, 640, 3))
+        self.assertFalse(frame.flags.writeable)
+        self.assertEqual(sorted(truth), [5, 9, 23])
+
+        detector = cv2.aruco.ArucoDetector(cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_ARUCO_ORIGINAL))
+        corners, ids, _ = detector.detectMarkers(frame)
+        self.assertEqual(sorted(ids.ravel().tolist()), [5, 9, 23])
+        for marker_corners, marker_id in zip(corners, ids.ravel()):
+            error = np.abs(marker_corners.reshape(4, 2) - truth[int(marker_id)]["corners"]).max()
+            self.assertLess(error, 1.5)
+
+    def test_markers_move_between_frames(self):
+        _, first = self.scene.render(0)
+        _, later = self.scene.render(10)
+        self.assertFalse(np.allclose(first[5]["tvec"], later[5]["tvec"]))
+
+
+class TestDetectionBenchmark(unittest.TestCase):
+    """Testes do relatório do benchmark de detecção"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.report = detection_benchmark.run(
+            ["640x360"], ["full", "roi"], num_markers=3, num_frames=6, warmup=1,
+            marker_size=0.05, distance=(0.3, 0.6), blur=0.5, noise=2.0
+        )
+
+    def test_report_is_machine_readable(self):
+        report = json.loads(json.dumps(self.report))
+        self.assertEqual(report["benchmark"], "detection")
+        self.assertEqual([(r["resolution"], r["mode"]) for r in report["results"]], [("640x360", "full"), ("640x360", "roi")])
+        for result in report["results"]:
+            self.assertEqual(result["frames"], 6)
+            self.assertGreater(result["fps"], 0)
+            self.assertEqual(result["recall"], 1.0)
+            self.assertEqual(result["false_positives"], 0)
+            self.assertLess(result["translation_error_mm_p95"], 30.0)
+
+    def test_roi_mode_uses_tracked_regions(self):
+        roi = next(r for r in self.report["results"] if r["mode"] == "roi")
+        self.assertGreater(roi["detection_stats"]["roi_scans"], 0)
+
+    def test_compare_flags_regressions(self):
+        baseline = json.loads(json.dumps(self.report))
+        self.assertEqual(compare(self.report, baseline), [])
+
+        for result in baseline["results"]:
+            result["fps"] *= 10
+            result["recall"] = 1.5
+        regressions = compare(self.report, baseline)
+        self.assertEqual(len(regressions), 4)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            detection_benchmark.run(["640x360"], ["rapido"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# Testes para as janelas deslizantes de distância do ActivityTracker
+
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tracking.distance_windows import DistanceWindows, ZoneActivityState
+
+
+class TestDistanceWindows(unittest.TestCase):
+    """Testes das médias móveis com somas incrementais"""
+
+    def test_running_mean_matches_window_mean(self):
+        rng = np.random.default_rng(0)
+        windows = DistanceWindows(window_size=8, capacity=2)
+        rows = [windows.allocate() for _ in range(5)]  # Força o crescimento da capacidade
+        history = {row: [] for row in rows}
+
+        for _ in range(30):
+            values = rng.uniform(0.0, 2.0, len(rows))
+            means = windows.push(rows, values)
+            for row, value, mean in zip(rows, values, means):
+                history[row].append(value)
+                self.assertAlmostEqual(mean, np.mean(history[row][-8:]))
+
+        self.assertEqual(windows.capacity, 8)
+        self.assertEqual(windows.counts[rows[0]], 8)
+
+    def test_released_row_starts_empty(self):
+        windows = DistanceWindows(window_size=4)
+        row = windows.allocate()
+        windows.push([row], [1.5])
+        windows.release(row)
+
+        reused = windows.allocate()
+        self.assertEqual(reused, row)
+        self.assertIsNone(windows.mean(reused))
+        self.assertAlmostEqual(windows.push([reused], [0.5])[0], 0.5)
+
+    def test_state_has_no_instance_dict(self):
+        state = ZoneActivityState("food", "eating", 0)
+        with self.assertRaises(AttributeError):
+            state.distancias = []
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# Testes para o buffer circular de frames
+
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.frame_ring_buffer import FrameRingBuffer
+
+
+class TestFrameRingBuffer(unittest.TestCase):
+    """Testes do empréstimo de frames sem cópia entre captura e consumidores"""
+
+    def _frame(self, value):
+        return np.full((4, 6, 3), value, dtype=np.uint8)
+
+    def test_empty_buffer_returns_none(self):
+        ring = FrameRingBuffer(3)
+        self.assertIsNone(ring.acquire())
+        self.assertIsNone(ring.writable_slot())
+        self.assertEqual(ring.latest_seq, -1)
+
+    def test_lease_is_read_only_view_of_latest_frame(self):
+        ring = FrameRingBuffer(3)
+        ring.publish(self._frame(1))
+        seq = ring.publish(self._frame(2))
+
+        with ring.acquire() as lease:
+            self.assertEqual(lease.seq, seq)
+            self.assertTrue((lease.frame == 2).all())
+            self.assertFalse(lease.frame.flags.writeable)
+
+    def test_acquire_only_returns_newer_frames(self):
+        ring = FrameRingBuffer(3)
+        seq = ring.publish(self._frame(1))
+        self.assertIsNone(ring.acquire(after_seq=seq))
+        ring.publish(self._frame(2))
+        lease = ring.acquire(after_seq=seq)
+        self.assertIsNotNone(lease)
+        lease.release()
+
+    def test_writable_slot_is_published_without_copy(self):
+        ring = FrameRingBuffer(3)
+        ring.publish(self._frame(1))
+        copies = ring.frames_copied
+
+        slot = ring.writable_slot()
+        slot[:] = 7
+        ring.publish(slot)
+
+        self.assertEqual(ring.frames_copied, copies)
+        with ring.acquire() as lease:
+            self.assertTrue((lease.frame == 7).all())
+
+    def test_leased_slot_is_not_overwritten(self):
+        ring = FrameRingBuffer(3)
+        ring.publish(self._frame(1))
+        lease = ring.acquire()
+
+        # Com 3 slots e 1 emprestado, o escritor ainda alterna entre os outros dois
+        ring.publish(self._frame(2))
+        ring.publish(self._frame(3))
+        self.assertTrue((lease.frame == 1).all())
+
+        # O último publicado também passa a estar emprestado: resta só um slot livre
+        second = ring.acquire()
+        self.assertIsNotNone(ring.publish(self._frame(4)))
+        self.assertTrue((second.frame == 3).all())
+
+        # Com o frame 4 como último publicado e os outros dois emprestados, não há slot livre
+        self.assertIsNone(ring.publish(self._frame(5)))
+        self.assertEqual(ring.frames_dropped, 1)
+
+        lease.release()
+        second.release()
+        self.assertIsNotNone(ring.publish(self._frame(6)))
+
+    def test_shape_change_reallocates_slots(self):
+        ring = FrameRingBuffer(2)
+        ring.publish(self._frame(1))
+        old_lease = ring.acquire()
+        ring.publish(np.zeros((8, 8, 3), dtype=np.uint8))
+
+        with ring.acquire() as lease:
+            self.assertEqual(lease.frame.shape, (8, 8, 3))
+        # Devolver um empréstimo da alocação anterior não deve falhar
+        old_lease.release()
+        old_lease.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+# Testes para as fontes de frames (câmera, replays e sintética)
+
+import unittest
+import tempfile
+import time
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config.config import Config
+from src.managers.camera_manager import CameraManager
+from src.managers.frame_sources import (
+    FrameSource,
+    ImageSequenceFrameSource,
+    SyntheticFrameSource,
+    VideoFileFrameSource,
+    create_frame_source,
+)
+
+
+class TestFrameSources(unittest.TestCase):
+    """Testes das fontes gravadas e sintéticas"""
+
+    def test_synthetic_source_is_finite_and_timestamped(self):
+        source = SyntheticFrameSource(320, 240, fps=10, marker_size_px=40, num_frames=5)
+        self.assertTrue(source.open())
+
+        frames = list(source.frames())
+        self.assertEqual(len(frames), 5)
+        self.assertTrue(source.exhausted)
+
+        timestamps = [timestamp for _, timestamp in frames]
+        self.assertAlmostEqual(timestamps[1] - timestamps[0], 0.1, places=6)
+        self.assertEqual(frames[0][0].shape, (240, 320, 3))
+
+    def test_synthetic_markers_are_detectable(self):
+        source = SyntheticFrameSource(640, 480, marker_ids=(0, 7), marker_size_px=80, num_frames=1)
+        source.open()
+        ret, frame = source.read()
+        self.assertTrue(ret)
+
+        detector = cv2.aruco.ArucoDetector(
+            cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_ARUCO_ORIGINAL),
+            cv2.aruco.DetectorParameters()
+        )
+        _, ids, _ = detector.detectMarkers(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        self.assertEqual(sorted(ids.flatten().tolist()), [0, 7])
+
+    def test_image_sequence_replay_and_loop(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for i in range(3):
+                cv2.imwrite(os.path.join(directory, f"{i:03d}.png"), np.full((8, 8, 3), i * 50, np.uint8))
+
+            source = ImageSequenceFrameSource(directory, fps=5, loop=True)
+            self.assertTrue(source.open())
+            values, timestamps = [], []
+            for _ in range(4):
+                ret, frame = source.read()
+                self.assertTrue(ret)
+                values.append(int(frame[0, 0, 0]))
+                timestamps.append(source.last_timestamp)
+
+        self.assertEqual(values, [0, 50, 100, 0])
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertAlmostEqual(timestamps[3] - timestamps[2], 0.2, places=6)
+
+    def test_video_file_replay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "video.avi")
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+            for i in range(4):
+                writer.write(np.full((48, 64, 3), i * 60, np.uint8))
+            writer.release()
+
+            source = VideoFileFrameSource(path)
+            self.assertTrue(source.open())
+            frames = list(source.frames())
+
+        self.assertEqual(len(frames), 4)
+        self.assertTrue(source.exhausted)
+        self.assertAlmostEqual(frames[3][1] - frames[0][1], 0.3, places=3)
+
+    def test_unknown_source_raises(self):
+        config = Config()
+        config.FRAME_SOURCE = "webcam"
+        with self.assertRaises(ValueError):
+            create_frame_source(config)
+
+    def test_incomplete_source_cannot_be_created(self):
+        class GrabOnlySource(FrameSource):
+            def grab(self):
+                return True
+
+        with self.assertRaises(TypeError):
+            FrameSource()
+        with self.assertRaises(TypeError):
+            GrabOnlySource()
+
+
+class TestCameraManagerReplay(unittest.TestCase):
+    """Testes do CameraManager alimentado por uma fonte sintética"""
+
+    def test_camera_manager_publishes_until_source_ends(self):
+        config = Config()
+        config.FRAME_SOURCE = "synthetic"
+        config.FRAME_SOURCE_REALTIME = False
+        config.FRAME_SOURCE_NUM_FRAMES = 6
+        config.CAMERA_WIDTH = 320
+        config.CAMERA_HEIGHT = 240
+
+        camera_manager = CameraManager(config)
+        try:
+            deadline = time.time() + 5
+            while not camera_manager.is_source_exhausted() and time.time() < deadline:
+                time.sleep(0.01)
+
+            self.assertTrue(camera_manager.is_source_exhausted())
+            self.assertEqual(camera_manager.get_latest_seq(), 5)
+            with camera_manager.get_frame_lease() as lease:
+                self.assertEqual(lease.frame.shape, (240, 320, 3))
+                self.assertIsNotNone(lease.timestamp)
+
+            stats = camera_manager.get_capture_stats()
+            self.assertEqual(stats["frames_grabbed"], 6)
+            self.assertEqual(stats["frames_decoded"], 6)
+        finally:
+            camera_manager.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+# Testes para o distribuidor de JPEG do streaming
+
+import unittest
+import sys
+import os
+import time
+import asyncio
+import threading
+
+import cv2
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.managers.jpeg_broadcaster import JpegBroadcaster
+
+
+def make_frame(value):
+    frame = np.full((48, 64, 3), value, dtype=np.uint8)
+    frame[::4, ::4] = 255 - value
+    return frame
+
+
+async def wait_for_subscribers(broadcaster, count):
+    while broadcaster.subscriber_count < count:
+        await asyncio.sleep(0.005)
+
+
+class TestJpegBroadcaster(unittest.TestCase):
+    """Testes de codificação única e distribuição para vários clientes"""
+
+    def setUp(self):
+        self.broadcaster = JpegBroadcaster(quality=80, max_fps=None)
+        self.broadcaster.start()
+
+    def tearDown(self):
+        self.broadcaster.stop()
+
+    def test_frame_is_encoded_once_for_all_clients(self):
+        async def scenario():
+            clients = [self.broadcaster.frames() for _ in range(4)]
+            tasks = [asyncio.ensure_future(client.__anext__()) for client in clients]
+            await wait_for_subscribers(self.broadcaster, 4)
+            self.broadcaster.publish(make_frame(40))
+            received = await asyncio.wait_for(asyncio.gather(*tasks), 2.0)
+            for client in clients:
+                await client.aclose()
+            return received
+
+        received = asyncio.run(scenario())
+        self.assertEqual(len(set(received)), 1)
+        self.assertTrue(received[0].startswith(b'\xff\xd8'))
+        self.assertEqual(self.broadcaster.frames_encoded, 1)
+        self.assertEqual(self.broadcaster.subscriber_count, 0)
+
+    def test_publish_keeps_capture_timestamp(self):
+        self.broadcaster.publish(make_frame(10), timestamp=1000.0)
+        self.assertEqual(self.broadcaster.frame_timestamp, 1000.0)
+        self.broadcaster.publish(make_frame(20))
+        self.assertAlmostEqual(self.broadcaster.frame_timestamp, time.time(), delta=1.0)
+
+    def test_no_encoding_without_clients(self):
+        self.broadcaster.publish(make_frame(10))
+        self.broadcaster.publish(make_frame(20))
+        self.assertEqual(self.broadcaster.frames_encoded, 0)
+        self.assertEqual(self.broadcaster.latest(), (-1, None))
+
+    def test_slow_client_does_not_block_others(self):
+        async def scenario():
+            slow = self.broadcaster.frames()
+            fast = self.broadcaster.frames()
+            slow_task = asyncio.ensure_future(slow.__anext__())
+            first = asyncio.ensure_future(fast.__anext__())
+            await wait_for_subscribers(self.broadcaster, 2)
+
+            self.broadcaster.publish(make_frame(10))
+            await asyncio.wait_for(first, 2.0)
+            await slow_task  # O cliente lento recebe o primeiro frame e para de consumir
+
+            received = []
+            for value in (60, 120, 180):
+                self.broadcaster.publish(make_frame(value))
+                received.append(await asyncio.wait_for(fast.__anext__(), 2.0))
+
+            # O cliente lento recebe apenas o JPEG mais recente, sem os intermediários
+            latest = await asyncio.wait_for(slow.__anext__(), 2.0)
+            await slow.aclose()
+            await fast.aclose()
+            return received, latest
+
+        received, latest = asyncio.run(scenario())
+        self.assertEqual(len(set(received)), 3)
+        self.assertEqual(latest, received[-1])
+        self.assertEqual(self.broadcaster.frames_encoded, 4)
+
+
+class TestJpegBroadcasterVariants(unittest.TestCase):
+    """Testes das versões do stream (largura, qualidade e FPS)"""
+
+    def setUp(self):
+        self.broadcaster = JpegBroadcaster(quality=75, max_fps=None, max_variants=3)
+        self.broadcaster.start()
+
+    def tearDown(self):
+        self.broadcaster.stop()
+
+    def test_variant_normalization(self):
+        self.assertEqual(self.broadcaster.variant(), self.broadcaster.default_variant)
+        self.assertEqual(self.broadcaster.variant(width=324, quality=52), self.broadcaster.variant(width=318, quality=48))
+        self.assertEqual(self.broadcaster.variant(width=10, quality=500).width, 64)
+        self.assertEqual(self.broadcaster.variant(quality=500).quality, 95)
+
+    def test_each_variant_encoded_once_per_frame(self):
+        small = self.broadcaster.variant(width=64)
+        low = self.broadcaster.variant(quality=30)
+
+        async def scenario():
+            clients = [self.broadcaster.frames(v) for v in (small, small, low, low)]
+            tasks = [asyncio.ensure_future(client.__anext__()) for client in clients]
+            await wait_for_subscribers(self.broadcaster, 4)
+            frame = np.random.default_rng(1).integers(0, 255, (96, 128, 3), dtype=np.uint8)
+            self.broadcaster.publish(frame)
+            received = await asyncio.wait_for(asyncio.gather(*tasks), 2.0)
+            for client in clients:
+                await client.aclose()
+            return received
+
+        received = asyncio.run(scenario())
+        self.assertEqual(received[0], received[1])
+        self.assertEqual(received[2], received[3])
+        self.assertNotEqual(received[0], received[2])
+        self.assertEqual(self.broadcaster.frames_encoded, 2)
+
+        image = cv2.imdecode(np.frombuffer(received[0], np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(image.shape, (48, 64, 3))
+
+    def test_snapshot_reuses_encoded_frame(self):
+        self.assertIsNone(self.broadcaster.snapshot_sync(timeout=0.05))
+        self.assertTrue(self.broadcaster.has_demand)
+
+        self.broadcaster.publish(make_frame(30))
+        first = self.broadcaster.snapshot_sync()
+        second = self.broadcaster.snapshot_sync()
+        self.assertEqual(first, second)
+        self.assertEqual(self.broadcaster.frames_encoded, 1)
+
+        self.broadcaster.publish(make_frame(90))
+        self.assertNotEqual(self.broadcaster.snapshot_sync(), first)
+        self.assertEqual(self.broadcaster.frames_encoded, 2)
+
+    def test_snapshot_after_demand_lapsed_waits_for_new_frame(self):
+        self.broadcaster.snapshot_ttl = 0.05
+        self.broadcaster.publish(make_frame(30))
+        stale = self.broadcaster.snapshot_sync()
+        self.assertIsNotNone(stale)
+
+        # Sem demanda os produtores param; o frame guardado não serve para um novo snapshot
+        time.sleep(0.1)
+        self.assertFalse(self.broadcaster.has_demand)
+        self.assertIsNone(self.broadcaster.snapshot_sync(timeout=0.05))
+
+        time.sleep(0.1)
+        publisher = threading.Timer(0.05, self.broadcaster.publish, args=(make_frame(90),))
+        publisher.start()
+        try:
+            fresh = self.broadcaster.snapshot_sync(timeout=2.0)
+        finally:
+            publisher.join()
+        self.assertIsNotNone(fresh)
+        self.assertNotEqual(fresh, stale)
+
+    def test_unused_variants_are_evicted(self):
+        self.broadcaster.publish(make_frame(30))
+        for width in (64, 128, 192, 256):
+            self.broadcaster.snapshot_sync(self.broadcaster.variant(width=width))
+        self.assertLessEqual(self.broadcaster.variant_count, 3)
+
+        self.broadcaster.variant_ttl = 0.0
+        # Com variant_ttl=0 a thread codificadora descarta as versões sem clientes no próximo frame
+        self.broadcaster.publish(make_frame(60))
+        for _ in range(100):
+            if self.broadcaster.variant_count == 0:
+                break
+            asyncio.run(asyncio.sleep(0.01))
+        self.assertEqual(self.broadcaster.variant_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# Testes para o filtro de Kalman das poses dos marcadores
+
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.kalman_filter import ConstantVelocityKalman, MarkerFilterBank
+from tests.test_marker_detector import make_detector, synthetic_frames
+
+
+class TestConstantVelocityKalman(unittest.TestCase):
+    """Testes do filtro de velocidade constante"""
+
+    def test_tracks_moving_marker_and_predicts_ahead(self):
+        rng = np.random.default_rng(0)
+        velocity = np.array([0.2, -0.1, 0.0])
+        start = np.array([0.0, 0.0, 1.0])
+        kalman = ConstantVelocityKalman(start, 0.0, process_noise=0.05, measurement_noise=0.01)
+
+        for step in range(1, 26):
+            t = step * 0.2
+            kalman.update(start + velocity * t + rng.normal(0, 0.01, 3), t)
+
+        position, _ = kalman.predict(5.0 + 0.4)
+        np.testing.assert_allclose(position, start + velocity * 5.4, atol=0.02)
+
+    def test_uncertainty_grows_while_predicting(self):
+        kalman = ConstantVelocityKalman(np.zeros(3), 0.0, process_noise=0.5, measurement_noise=0.01)
+        kalman.update(np.zeros(3), 0.04)
+
+        _, near = kalman.predict(0.1)
+        _, far = kalman.predict(1.0)
+        self.assertGreater(np.trace(far), np.trace(near))
+
+    def test_measurements_reduce_uncertainty(self):
+        kalman = ConstantVelocityKalman(np.zeros(3), 0.0, process_noise=0.005, measurement_noise=0.01)
+        initial = np.trace(kalman.position_covariance)
+        for step in range(1, 20):
+            kalman.update(np.zeros(3), step * 0.04)
+        self.assertLess(np.trace(kalman.position_covariance), initial)
+
+
+class TestMarkerFilterBank(unittest.TestCase):
+    """Testes do conjunto de filtros por marcador"""
+
+    def test_prediction_expires(self):
+        bank = MarkerFilterBank(max_predict_seconds=1.0)
+        bank.update(5, np.array([0.0, 0.0, 1.0]), 0.0)
+        bank.update(5, np.array([0.0, 0.0, 1.0]), 0.2)
+
+        self.assertIsNotNone(bank.predict(5, 0.5))
+        self.assertIsNone(bank.predict(5, 1.5))
+        self.assertIsNone(bank.predict(7, 0.5))
+
+    def test_prediction_dropped_when_too_uncertain(self):
+        bank = MarkerFilterBank(process_noise=5.0, max_predict_seconds=10.0, max_position_std=0.05)
+        bank.update(5, np.zeros(3), 0.0)
+        bank.update(5, np.zeros(3), 0.04)
+        self.assertIsNone(bank.predict(5, 2.0))
+
+
+class TestDetectorPrediction(unittest.TestCase):
+    """Testes da previsão de gatos não detectados no MarkerDetector"""
+
+    def test_missing_cat_is_predicted(self):
+        detector = make_detector("full", POSE_FILTER_ENABLED=True)
+        with_cat = synthetic_frames(marker_ids=(0, 3), num_frames=1)[0]
+        without_cat = synthetic_frames(marker_ids=(0,), num_frames=1)[0]
+
+        # Instantes de captura: a incerteza prevista depende do intervalo entre os frames, não
+        # da duração da detecção na máquina de testes
+        detected = detector.detect_markers(with_cat, timestamp=1000.0)
+        self.assertIn("pos_cov", detected[3])
+        self.assertNotIn("predicted", detected[3])
+
+        result = detector.detect_markers(without_cat, timestamp=1000.04)
+        self.assertTrue(result[3]["predicted"])
+        np.testing.assert_allclose(result[3]["pos"], detected[3]["pos"], atol=0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+# Testes para os modos de detecção do MarkerDetector
+
+import unittest
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config.config import Config
+from src.core.marker_detector import MarkerDetector
+from src.managers.frame_sources import SyntheticFrameSource
+
+
+def make_detector(mode, **overrides):
+    config = Config()
+    config.MOTION_GATE_ENABLED = False
+    config.DEBUG_SHOW_TEST_MARKER = False
+    config.DETECTION_MODE = mode
+    config.PYRAMID_ENABLED = False
+    config.POSE_FILTER_ENABLED = False
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    return MarkerDetector(config)
+
+
+def synthetic_frames(marker_ids=(0, 3, 5), num_frames=12):
+    source = SyntheticFrameSource(960, 540, marker_ids=marker_ids, marker_size_px=50, num_frames=num_frames)
+    source.open()
+    return [frame for frame, _ in source.frames()]
+
+
+class TestRoiDetection(unittest.TestCase):
+    """Testes do rastreamento por regiões de interesse"""
+
+    def test_roi_mode_matches_full_mode(self):
+        frames = synthetic_frames()
+        full = make_detector("full")
+        roi = make_detector("roi", ROI_FULL_SCAN_INTERVAL=5)
+
+        for frame in frames:
+            expected = full.detect_markers(frame)
+            result = roi.detect_markers(frame)
+            self.assertEqual(set(result), set(expected))
+            for key in expected:
+                self.assertLess(abs(result[key]["pos"] - expected[key]["pos"]).max(), 1e-3)
+
+        stats = roi.get_detection_stats()
+        self.assertEqual(stats["full_scans"], 3)
+        self.assertEqual(stats["roi_scans"], 9)
+
+    def test_full_scan_runs_periodically(self):
+        detector = make_detector("roi", ROI_FULL_SCAN_INTERVAL=3)
+        frame = synthetic_frames(marker_ids=(0, 3), num_frames=1)[0]
+
+        for _ in range(4):
+            self.assertIn(3, detector.detect_markers(frame))
+
+        stats = detector.get_detection_stats()
+        self.assertEqual(stats["full_scans"], 2)
+        self.assertEqual(stats["roi_scans"], 2)
+
+    def test_missing_marker_triggers_full_scan(self):
+        detector = make_detector("roi", ROI_FULL_SCAN_INTERVAL=100)
+        with_cat = synthetic_frames(marker_ids=(0, 3), num_frames=1)[0]
+        without_cat = synthetic_frames(marker_ids=(0,), num_frames=1)[0]
+
+        detector.detect_markers(with_cat)
+        result = detector.detect_markers(without_cat)
+
+        self.assertNotIn(3, result)
+        self.assertEqual(detector.get_detection_stats()["roi_misses"], 1)
+
+    def test_full_scan_keeps_markers_found_in_regions(self):
+        detector = make_detector("roi", ROI_FULL_SCAN_INTERVAL=100)
+        with_cat = synthetic_frames(marker_ids=(0, 3), num_frames=1)[0]
+        detector.detect_markers(with_cat)
+        # Mesmo frame sem o gato: o pote continua na mesma posição
+        x0, y0 = detector._tracked_corners[3].reshape(4, 2).min(axis=0).astype(int) - 10
+        x1, y1 = detector._tracked_corners[3].reshape(4, 2).max(axis=0).astype(int) + 10
+        without_cat = with_cat.copy()
+        without_cat[y0:y1, x0:x1] = with_cat[0, 0]
+
+        # Varredura completa que falha (ex.: imagem reduzida): o pote 0 visto na sua região continua
+        detector._find_markers_full = lambda gray: ((), None)
+        result = detector.detect_markers(without_cat)
+
+        self.assertEqual([dados["id"] for dados in result.values()], [0])
+        self.assertEqual(set(detector._tracked_corners), {0})
+
+
+class TestPyramidDetection(unittest.TestCase):
+    """Testes da detecção em pirâmide com refinamento sub-pixel"""
+
+    def _corners_by_id(self, corners, ids):
+        return {int(marker_id): corner.reshape(4, 2) for corner, marker_id in zip(corners, ids.flatten())}
+
+    def test_refined_corners_match_full_resolution(self):
+        gray = cv2.cvtColor(synthetic_frames(num_frames=1)[0], cv2.COLOR_BGR2GRAY)
+        detector = make_detector("full", PYRAMID_ENABLED=True, PYRAMID_AUTO_SCALE=False, PYRAMID_SCALE=0.5)
+
+        expected = self._corners_by_id(*detector.detector.detectMarkers(gray)[:2])
+        result = self._corners_by_id(*detector._find_markers_full(gray))
+
+        self.assertEqual(set(result), set(expected))
+        for marker_id, corners in expected.items():
+            self.assertLess(np.abs(result[marker_id] - corners).max(), 1.0)
+
+    def test_scale_adapts_to_marker_size(self):
+        frame = synthetic_frames(num_frames=1)[0]
+        detector = make_detector(
+            "full", PYRAMID_ENABLED=True, PYRAMID_SCALE=1.0, PYRAMID_TARGET_MARKER_PX=25, PYRAMID_MIN_SCALE=0.25
+        )
+        for _ in range(10):
+            detector.detect_markers(frame)
+
+        # Marcadores de 50 px: a escala converge para cerca de 25 / 50
+        self.assertAlmostEqual(detector.pyramid_scale, 0.5, delta=0.1)
+
+    def test_small_marker_is_not_lost_by_reduced_scan(self):
+        source = SyntheticFrameSource(960, 540, marker_ids=(0, 3), marker_size_px=20, num_frames=4)
+        source.open()
+        frames = [frame for frame, _ in source.frames()]
+        # Escala fixa: o marcador de 20 px fica com 10 px na imagem reduzida e não é decodificado
+        detector = make_detector("full", PYRAMID_ENABLED=True, PYRAMID_AUTO_SCALE=False, PYRAMID_SCALE=0.5)
+
+        for frame in frames:
+            self.assertIn(3, detector.detect_markers(frame))
+
+        stats = detector.get_detection_stats()
+        self.assertGreater(stats["pyramid_misses"], 0)
+        # Só a primeira varredura e as refeitas após uma perda usam a resolução cheia
+        self.assertEqual(stats["pyramid_full_res_scans"], 1 + stats["pyramid_misses"])
+
+    def test_scale_rises_at_once_for_small_markers(self):
+        detector = make_detector("full", PYRAMID_ENABLED=True, PYRAMID_SCALE=0.5, PYRAMID_TARGET_MARKER_PX=40)
+        detector._adapt_pyramid_scale([np.array([[0, 0], [20, 0], [20, 20], [0, 20]], dtype=np.float32)])
+        self.assertEqual(detector.pyramid_scale, 1.0)
+
+
+class TestTiledDetection(unittest.TestCase):
+    """Testes da detecção em blocos paralelos"""
+
+    def _scene(self):
+        gray = np.full((720, 1280), 128, dtype=np.uint8)
+        aruco_dict = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_ARUCO_ORIGINAL)
+        # O marcador 4 fica exatamente sobre o encontro dos quatro blocos
+        for marker_id, (x, y) in {1: (100, 100), 4: (600, 320), 9: (1000, 550)}.items():
+            marker = cv2.aruco.generateImageMarker(aruco_dict, marker_id, 80)
+            gray[y - 10:y + 90, x - 10:x + 90] = 255
+            gray[y:y + 80, x:x + 80] = marker
+        return gray
+
+    def test_tiled_matches_full_frame_without_duplicates(self):
+        gray = self._scene()
+        detector = make_detector("full", TILED_DETECTION_ENABLED=True, TILE_MIN_FRAME_WIDTH=0, TILE_OVERLAP_PX=120)
+
+        corners, ids = detector._find_markers_full(gray)
+        expected_corners, expected_ids, _ = detector.detector.detectMarkers(gray)
+
+        self.assertEqual(sorted(ids.flatten().tolist()), [1, 4, 9])
+        expected = {int(i): c for c, i in zip(expected_corners, expected_ids.flatten())}
+        for corner, marker_id in zip(corners, ids.flatten()):
+            np.testing.assert_allclose(corner, expected[int(marker_id)], atol=1e-3)
+        detector.close()
+
+    def test_small_frames_are_not_tiled(self):
+        detector = make_detector("full", TILED_DETECTION_ENABLED=True, TILE_MIN_FRAME_WIDTH=2560)
+        detector._find_markers_full(self._scene())
+        self.assertIsNone(detector._tile_pool)
+
+    def test_pyramid_tiling_uses_full_resolution_width(self):
+        # Com a pirâmide a imagem reduzida tem 640 px, mas o frame tem os 1280 px exigidos
+        detector = make_detector("full", TILED_DETECTION_ENABLED=True, TILE_MIN_FRAME_WIDTH=1280,
+                                 PYRAMID_ENABLED=True, PYRAMID_SCALE=0.5, PYRAMID_AUTO_SCALE=False)
+        corners, ids = detector._find_markers_full(self._scene())
+        self.assertIsNotNone(detector._tile_pool)
+        self.assertEqual(sorted(ids.flatten().tolist()), [1, 4, 9])
+        # Sobreposição de 160 px no frame vira 80 px na imagem reduzida
+        self.assertEqual(detector._tile_layout((360, 640), 0.5)[0], (0, 0, 360, 220))
+        detector.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
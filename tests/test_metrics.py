@@ -0,0 +1,159 @@
+# Testes para os histogramas de latência por etapa e o endpoint /metrics
+
+import unittest
+import sys
+import os
+import asyncio
+import multiprocessing
+from types import SimpleNamespace
+
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core import metrics
+from src.core.frame_ring_buffer import FrameRingBuffer
+from src.core.metrics import LatencyMetrics
+
+
+def observe_in_child(latency_metrics, results):
+    """Registra medições em outro processo, nas métricas recebidas pelo nome"""
+    metrics.install(latency_metrics, 2)
+    metrics.observe("detect_markers", 0.004)
+    metrics.observe("detect_markers", 0.02)
+    latency_metrics.close()
+    results.put(True)
+
+
+class TestLatencyMetrics(unittest.TestCase):
+    """Testes dos histogramas de latência"""
+
+    def setUp(self):
+        self.metrics = LatencyMetrics.create([1], buckets=(0.01, 0.02, 0.04))
+
+    def tearDown(self):
+        metrics.install(None)
+        self.metrics.close()
+
+    def test_observations_fall_in_buckets(self):
+        for seconds in (0.005, 0.01, 0.015, 0.03, 0.5):
+            self.metrics.observe("track_update", seconds, 1)
+
+        snapshot = self.metrics.snapshot("track_update", 1)
+        self.assertEqual(snapshot["buckets"], [2, 1, 1, 1])
+        self.assertEqual(snapshot["count"], 5)
+        self.assertAlmostEqual(snapshot["sum"], 0.56)
+        # Outras câmeras e etapas não são afetadas; câmeras desconhecidas são ignoradas
+        self.metrics.observe("track_update", 0.001, 99)
+        self.assertEqual(self.metrics.snapshot("track_update")["count"], 0)
+        self.assertEqual(self.metrics.snapshot("detect_pose", 1)["count"], 0)
+
+    def test_quantile_interpolates_within_bucket(self):
+        for _ in range(50):
+            self.metrics.observe("capture_to_decision", 0.005, 1)
+        for _ in range(50):
+            self.metrics.observe("capture_to_decision", 0.03, 1)
+
+        self.assertAlmostEqual(self.metrics.quantile("capture_to_decision", 0.5, 1), 0.01)
+        self.assertAlmostEqual(self.metrics.quantile("capture_to_decision", 0.75, 1), 0.03)
+        self.assertIsNone(self.metrics.quantile("detect_pose", 0.5, 1))
+
+    def test_prometheus_text(self):
+        self.metrics.observe("jpeg_encode", 0.015, 1)
+        self.metrics.observe("api_request", 0.2)
+        text = self.metrics.render_prometheus()
+
+        self.assertIn("# TYPE cat_monitor_stage_latency_seconds histogram", text)
+        self.assertIn('cat_monitor_stage_latency_seconds_bucket{stage="jpeg_encode",camera="1",le="0.01"} 0', text)
+        self.assertIn('cat_monitor_stage_latency_seconds_bucket{stage="jpeg_encode",camera="1",le="0.02"} 1', text)
+        self.assertIn('cat_monitor_stage_latency_seconds_bucket{stage="jpeg_encode",camera="1",le="+Inf"} 1', text)
+        self.assertIn('cat_monitor_stage_latency_seconds_count{stage="api_request"} 1', text)
+        self.assertIn('cat_monitor_stage_latency_quantile_seconds{stage="api_request",quantile="0.99"} 0.04', text)
+        # Etapas sem medições ficam fora do texto
+        self.assertNotIn('stage="detect_pose"', text)
+
+    def test_module_timer_is_noop_without_metrics(self):
+        metrics.install(None)
+        with metrics.timer("draw_info"):
+            pass
+        metrics.observe("draw_info", 0.001)
+        self.assertEqual(self.metrics.snapshot("draw_info", 1)["count"], 0)
+
+        metrics.install(self.metrics, 1)
+        with metrics.timer("draw_info"):
+            pass
+        with self.assertRaises(RuntimeError):
+            with metrics.timer("draw_info"):
+                raise RuntimeError("falha na etapa")
+        self.assertEqual(self.metrics.snapshot("draw_info", 1)["count"], 2)
+
+    def test_local_metrics_cannot_be_pickled(self):
+        import pickle
+
+        with self.assertRaises(TypeError):
+            pickle.dumps(self.metrics)
+
+    def test_frame_lease_carries_publish_instant(self):
+        ring = FrameRingBuffer(num_slots=2)
+        ring.publish(np.zeros((2, 2), dtype=np.uint8), timestamp=5.0)
+        with ring.acquire() as lease:
+            self.assertEqual(lease.timestamp, 5.0)
+            self.assertIsNotNone(lease.published_at)
+
+
+class TestSharedLatencyMetrics(unittest.TestCase):
+    """Testes das métricas em memória compartilhada entre processos"""
+
+    def test_child_process_observations_are_visible(self):
+        shared = LatencyMetrics.create([1, 2], shared=True)
+        try:
+            ctx = multiprocessing.get_context("spawn")
+            results = ctx.Queue()
+            process = ctx.Process(target=observe_in_child, args=(shared, results))
+            process.start()
+            try:
+                self.assertTrue(results.get(timeout=30))
+            finally:
+                process.join(10)
+            self.assertEqual(process.exitcode, 0)
+
+            self.assertEqual(shared.snapshot("detect_markers", 2)["count"], 2)
+            self.assertEqual(shared.snapshot("detect_markers", 1)["count"], 0)
+            self.assertIn('stage="detect_markers",camera="2"', shared.render_prometheus())
+        finally:
+            shared.close()
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """Testes do endpoint /metrics do app de streaming"""
+
+    def setUp(self):
+        from src.managers.streaming_manager import StreamingManager
+
+        config = SimpleNamespace(STREAMING_ENABLED=True, CAMERA_ID=1, CAMERAS=[])
+        self.streaming = StreamingManager(config)
+        self.endpoint = next(route.endpoint for route in self.streaming.app.routes if getattr(route, "path", None) == "/metrics")
+
+    def tearDown(self):
+        metrics.install(None)
+
+    def test_metrics_disabled_returns_404(self):
+        from fastapi import HTTPException
+
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(self.endpoint())
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    def test_metrics_in_prometheus_format(self):
+        latency_metrics = LatencyMetrics.create([1])
+        metrics.install(latency_metrics, 1)
+        metrics.observe("detect_grayscale", 0.0002)
+
+        response = asyncio.run(self.endpoint())
+        self.assertTrue(response.media_type.startswith("text/plain; version=0.0.4"))
+        self.assertIn(b'stage="detect_grayscale",camera="1",le="0.0005"} 1', response.body)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# Testes para o filtro de movimento da detecção
+
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.motion_gate import MotionGate
+
+
+class TestMotionGate(unittest.TestCase):
+    """Testes da decisão de pular a detecção em frames estáticos"""
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.frame = rng.integers(0, 255, (360, 640, 3), dtype=np.uint8)
+        self.gate = MotionGate(max_skip_seconds=2.0)
+
+    def test_first_frame_is_always_detected(self):
+        self.assertTrue(self.gate.should_detect(self.frame, now=0.0))
+
+    def test_static_frame_is_skipped(self):
+        self.gate.should_detect(self.frame, now=0.0)
+        noisy = np.clip(self.frame.astype(np.int16) + 2, 0, 255).astype(np.uint8)
+        self.assertFalse(self.gate.should_detect(noisy, now=0.1))
+        self.assertEqual(self.gate.get_stats()["frames_skipped"], 1)
+
+    def test_local_motion_triggers_detection(self):
+        self.gate.should_detect(self.frame, now=0.0)
+        moved = self.frame.copy()
+        moved[100:160, 200:260] = 0
+        self.assertTrue(self.gate.should_detect(moved, now=0.1))
+
+    def test_detection_is_forced_after_max_skip(self):
+        self.gate.should_detect(self.frame, now=0.0)
+        self.assertFalse(self.gate.should_detect(self.frame, now=1.0))
+        self.assertTrue(self.gate.should_detect(self.frame, now=2.5))
+        self.assertFalse(self.gate.should_detect(self.frame, now=3.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
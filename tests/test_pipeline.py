@@ -0,0 +1,109 @@
+# Testes para os estágios e filas do pipeline do loop principal
+
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.pipeline import FramePacket, PipelineStage, StageQueue
+
+
+class TestStageQueue(unittest.TestCase):
+    """Testes das políticas de backpressure"""
+
+    def test_drop_oldest_keeps_latest(self):
+        queue = StageQueue("render", 2, StageQueue.DROP_OLDEST)
+        for item in range(5):
+            self.assertTrue(queue.put(item))
+        self.assertEqual([queue.get(0), queue.get(0)], [3, 4])
+        self.assertEqual(queue.stats()["dropped"], 3)
+        self.assertIsNone(queue.get(0))
+
+    def test_block_waits_for_space(self):
+        queue = StageQueue("track", 1, StageQueue.BLOCK)
+        queue.put(1)
+        done = threading.Event()
+        threading.Thread(target=lambda: (queue.put(2), done.set()), daemon=True).start()
+        self.assertFalse(done.wait(0.2))
+        self.assertEqual(queue.get(0), 1)
+        self.assertTrue(done.wait(1.0))
+        self.assertEqual(queue.get(0), 2)
+        self.assertEqual(queue.stats()["dropped"], 0)
+
+    def test_block_put_honors_stop_event(self):
+        queue = StageQueue("track", 1, StageQueue.BLOCK)
+        queue.put(1)
+        stop = threading.Event()
+        stop.set()
+        self.assertFalse(queue.put(2, stop))
+
+    def test_close_returns_remaining_items_then_closed(self):
+        queue = StageQueue("track", 4)
+        queue.put(1)
+        queue.close()
+        self.assertFalse(queue.put(2))
+        self.assertEqual(queue.get(0), 1)
+        self.assertIs(queue.get(0), StageQueue.CLOSED)
+
+
+class TestPipelineStages(unittest.TestCase):
+    """Testes do encadeamento de estágios"""
+
+    def test_packets_flow_in_order_and_end_propagates(self):
+        stop = threading.Event()
+        source = iter(range(20))
+
+        def produce(_):
+            seq = next(source, None)
+            if seq is None:
+                return PipelineStage.END
+            return FramePacket(seq, 1000.0 + seq, markers={seq: {"tipo": "gato"}})
+
+        seen = []
+
+        def track(packet):
+            time.sleep(0.001)  # Estágio mais lento que a origem: a fila bloqueia, sem perdas
+            seen.append((packet.seq, packet.timestamp))
+            return packet if packet.seq % 5 == 0 else None
+
+        track_queue = StageQueue("track", 2, StageQueue.BLOCK)
+        render_queue = StageQueue("render", 1, StageQueue.DROP_OLDEST)
+        stages = [
+            PipelineStage("detect", produce, stop, output_queue=track_queue),
+            PipelineStage("track", track, stop, input_queue=track_queue, output_queue=render_queue)
+        ]
+        for stage in stages:
+            stage.start()
+        for stage in stages:
+            stage.join(2.0)
+
+        self.assertEqual(seen, [(seq, 1000.0 + seq) for seq in range(20)])
+        self.assertEqual(stages[1].items_processed, 20)
+        # A renderização recebe o pacote mais recente e depois o fim do pipeline
+        packet = render_queue.get(0)
+        self.assertEqual(packet.seq, 15)
+        self.assertIs(render_queue.get(0), StageQueue.CLOSED)
+        self.assertFalse(stop.is_set())
+
+    def test_stage_error_stops_pipeline(self):
+        stop = threading.Event()
+        output = StageQueue("track", 4)
+
+        def fail(_):
+            raise RuntimeError("falha de teste")
+
+        stage = PipelineStage("detect", fail, stop, output_queue=output)
+        stage.start()
+        stage.join(2.0)
+
+        self.assertTrue(stop.is_set())
+        self.assertIsInstance(stage.error, RuntimeError)
+        self.assertIs(output.get(0), StageQueue.CLOSED)
+
+
+if __name__ == '__main__':
+    unittest.main()
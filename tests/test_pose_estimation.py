@@ -0,0 +1,57 @@
+# Testes para a estimativa de pose em lote
+
+import unittest
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config.config import Config
+from src.core.pose_estimation import PoseEstimator
+
+
+class TestPoseEstimator(unittest.TestCase):
+    """Testes dos métodos de pose contra poses conhecidas"""
+
+    def setUp(self):
+        self.config = Config()
+        self.sizes = [0.02, 0.05, 0.02]
+        self.tvecs = np.array([[0.05, -0.02, 0.4], [-0.1, 0.05, 0.8], [0.0, 0.0, 0.3]])
+        self.rvecs = np.array([[np.pi, 0.2, 0.1], [3.0, -0.3, 0.2], [3.1, 0.05, 0.0]])
+
+        estimator = PoseEstimator(self.config.camera_matrix, self.config.dist_coeffs)
+        self.corners = []
+        for rvec, tvec, size in zip(self.rvecs, self.tvecs, self.sizes):
+            img_pts, _ = cv2.projectPoints(
+                estimator.object_points(size), rvec, tvec, self.config.camera_matrix, self.config.dist_coeffs
+            )
+            self.corners.append(img_pts.reshape(1, 4, 2).astype(np.float32))
+
+    def test_all_methods_recover_known_poses(self):
+        for method in PoseEstimator.METHODS:
+            estimator = PoseEstimator(self.config.camera_matrix, self.config.dist_coeffs, method)
+            poses = estimator.estimate(self.corners, self.sizes)
+            self.assertEqual(len(poses), 3)
+            for (rvec, tvec), rvec_true, tvec_true in zip(poses, self.rvecs, self.tvecs):
+                np.testing.assert_allclose(tvec.ravel(), tvec_true, atol=1e-4, err_msg=method)
+                R = cv2.Rodrigues(np.asarray(rvec, dtype=np.float64))[0]
+                np.testing.assert_allclose(R, cv2.Rodrigues(rvec_true)[0], atol=1e-3, err_msg=method)
+
+    def test_object_points_are_cached_per_size(self):
+        estimator = PoseEstimator(self.config.camera_matrix, self.config.dist_coeffs)
+        self.assertIs(estimator.object_points(0.02), estimator.object_points(0.02))
+        self.assertAlmostEqual(float(estimator.object_points(0.05)[1, 0]), 0.025)
+
+    def test_empty_frame_and_unknown_method(self):
+        estimator = PoseEstimator(self.config.camera_matrix, self.config.dist_coeffs, "homography")
+        self.assertEqual(estimator.estimate([], []), [])
+        with self.assertRaises(ValueError):
+            PoseEstimator(self.config.camera_matrix, self.config.dist_coeffs, "epnp")
+
+
+if __name__ == '__main__':
+    unittest.main()
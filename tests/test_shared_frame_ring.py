@@ -0,0 +1,156 @@
+# Testes para o buffer de frames em memória compartilhada e o streaming em processo separado
+
+import unittest
+import sys
+import os
+import pickle
+import multiprocessing
+from types import SimpleNamespace
+
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.shared_frame_ring import SharedFrameRing
+from src.managers.streaming_process import StreamingProcess, check_shm_space
+
+
+def read_in_child(name, results):
+    """Lê o último frame de outro processo, mapeando o buffer pelo nome"""
+    ring = SharedFrameRing.attach(name)
+    shared = ring.read()
+    results.put((shared.seq, shared.camera_id, shared.frame.shape, int(shared.frame.sum())))
+    ring.close()
+
+
+class TestSharedFrameRing(unittest.TestCase):
+    """Testes da publicação e leitura de frames entre processos"""
+
+    def setUp(self):
+        self.ring = SharedFrameRing.create(8 * 6 * 3, num_slots=3)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def _frame(self, value, shape=(8, 6, 3)):
+        return np.full(shape, value, dtype=np.uint8)
+
+    def test_read_returns_copy_with_header(self):
+        self.assertIsNone(self.ring.read())
+        seq = self.ring.publish(self._frame(5), timestamp=123.5, camera_id=2)
+
+        shared = self.ring.read()
+        self.assertEqual((shared.seq, shared.timestamp, shared.camera_id), (seq, 123.5, 2))
+        self.assertTrue((shared.frame == 5).all())
+        self.assertIsNone(self.ring.read(after_seq=seq))
+
+        # A leitura é uma cópia: publicar de novo não altera o frame já lido
+        for value in range(3):
+            self.ring.publish(self._frame(value))
+        self.assertTrue((shared.frame == 5).all())
+
+    def test_latest_frame_after_wraparound(self):
+        for value in range(7):
+            self.ring.publish(self._frame(value))
+        shared = self.ring.read()
+        self.assertEqual(shared.seq, 6)
+        self.assertTrue((shared.frame == 6).all())
+
+    def test_grayscale_and_oversized_frames(self):
+        self.ring.publish(self._frame(9, (4, 6)))
+        self.assertEqual(self.ring.read().frame.shape, (4, 6))
+        self.assertIsNone(self.ring.publish(self._frame(1, (80, 60, 3))))
+        self.assertEqual(self.ring.frames_oversized, 1)
+
+    def test_demand_expires(self):
+        reader = pickle.loads(pickle.dumps(self.ring))
+        try:
+            self.assertFalse(self.ring.has_demand())
+            reader.request_frames(10.0)
+            self.assertTrue(self.ring.has_demand())
+            reader.request_frames(-1.0)
+            self.assertFalse(self.ring.has_demand())
+        finally:
+            reader.close()
+
+    def test_attach_rejects_unrelated_memory(self):
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(create=True, size=256)
+        try:
+            with self.assertRaises(ValueError):
+                SharedFrameRing.attach(shm.name)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_reader_in_another_process(self):
+        self.ring.publish(self._frame(1), camera_id=4)
+        seq = self.ring.publish(self._frame(2), camera_id=4)
+
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        process = ctx.Process(target=read_in_child, args=(self.ring.name, results))
+        process.start()
+        try:
+            self.assertEqual(results.get(timeout=30), (seq, 4, (8, 6, 3), 2 * 8 * 6 * 3))
+        finally:
+            process.join(10)
+        self.assertEqual(process.exitcode, 0)
+
+
+class TestStreamingProcess(unittest.TestCase):
+    """Testes da publicação dos frames para o processo de streaming"""
+
+    def setUp(self):
+        config = SimpleNamespace(STREAMING_ENABLED=True, CAMERA_ID=1, CAMERAS=[], CAMERA_WIDTH=32, CAMERA_HEIGHT=24)
+        self.streaming = StreamingProcess(config)
+        self.ring = self.streaming.rings[1]
+        # Simula o processo de streaming já iniciado
+        self.streaming.is_running = True
+
+    def tearDown(self):
+        self.streaming.stop_server()
+
+    def test_frames_published_only_on_demand(self):
+        frame = np.full((24, 32, 3), 7, dtype=np.uint8)
+        self.streaming.update_frame(frame)
+        self.assertIsNone(self.ring.read())
+
+        self.ring.request_frames(10.0)
+        self.assertTrue(self.streaming.has_viewers())
+        self.streaming.update_frame(frame)
+        shared = self.ring.read()
+        self.assertEqual(shared.camera_id, 1)
+        self.assertTrue((shared.frame == 7).all())
+
+    def test_frame_keeps_capture_timestamp(self):
+        self.ring.request_frames(10.0)
+        self.streaming.update_frame(np.zeros((24, 32, 3), dtype=np.uint8), timestamp=123.5)
+        self.assertEqual(self.ring.read().timestamp, 123.5)
+
+    def test_oversized_frame_is_reduced(self):
+        self.ring.request_frames(10.0)
+        self.streaming.update_frame(np.zeros((48, 64, 3), dtype=np.uint8))
+        shared = self.ring.read()
+        self.assertLessEqual(shared.frame.nbytes, self.ring.slot_bytes)
+        self.assertEqual(shared.frame.shape[2], 3)
+
+    def test_unknown_camera_has_no_viewers(self):
+        self.ring.request_frames(10.0)
+        self.assertFalse(self.streaming.has_viewers(99))
+
+    def test_shm_space_check(self):
+        # 1080p com 4 slots: cerca de 25 MB por câmera
+        required = SharedFrameRing.required_bytes(1920 * 1080 * 3, 4)
+        self.assertAlmostEqual(required / (1024 * 1024), 23.7, delta=0.5)
+        with self.assertLogs("src.managers.streaming_process", level="ERROR") as logs:
+            self.assertFalse(check_shm_space(1 << 60, path=os.path.dirname(__file__)))
+        self.assertIn("shm_size", logs.output[0])
+        self.assertTrue(check_shm_space(1, path=os.path.dirname(__file__)))
+        self.assertTrue(check_shm_space(1 << 60, path="/caminho/inexistente"))
+
+
+if __name__ == '__main__':
+    unittest.main()
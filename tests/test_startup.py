@@ -0,0 +1,77 @@
+# Testes para a inicialização rápida (sondagens em segundo plano e imports tardios)
+
+import unittest
+import sys
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config.config import Config
+from src.managers.camera_manager import CameraManager
+from src.tracking.activity_notifier import ActivityNotifier
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+class SlowProbeAPIClient:
+    """Cliente da API cujo teste de conexão demora"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.probed = threading.Event()
+
+    def test_connection(self):
+        time.sleep(self.delay)
+        self.probed.set()
+        return True
+
+
+class TestFastStartup(unittest.TestCase):
+    """Testes de inicialização sem bloqueios"""
+
+    def test_api_probe_runs_in_background(self):
+        api = SlowProbeAPIClient(0.5)
+        start = time.monotonic()
+        ActivityNotifier(api, probe_in_background=True)
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertTrue(api.probed.wait(2.0))
+
+    def test_camera_retries_do_not_hold_lock(self):
+        with tempfile.TemporaryDirectory() as empty_dir:
+            config = Config()
+            config.FRAME_SOURCE = "images"
+            config.FRAME_SOURCE_PATH = empty_dir
+            config.CAMERA_CONNECT_RETRIES = 3
+            config.CAMERA_CONNECT_RETRY_DELAY = 30.0
+
+            camera_manager = CameraManager(config)
+            time.sleep(0.1)
+
+            # Entre tentativas o estado da conexão responde na hora
+            start = time.monotonic()
+            self.assertFalse(camera_manager.is_camera_connected())
+            self.assertLess(time.monotonic() - start, 0.1)
+
+            # release() interrompe a espera entre tentativas
+            camera_manager.release()
+            deadline = time.monotonic() + 2.0
+            while camera_manager.reconnecting and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertFalse(camera_manager.reconnecting)
+
+    def test_streaming_manager_does_not_import_fastapi(self):
+        code = (
+            "import sys; import src.managers.streaming_manager; "
+            "print('fastapi' in sys.modules or 'uvicorn' in sys.modules)"
+        )
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
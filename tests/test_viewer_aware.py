@@ -0,0 +1,66 @@
+# Testes para o pipeline que pula renderização sem consumidores
+
+import unittest
+import sys
+import os
+import asyncio
+from unittest import mock
+
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config.config import Config
+from src.managers.display_manager import DisplayManager
+from src.managers.streaming_manager import StreamingManager
+
+
+class TestViewerAwarePipeline(unittest.TestCase):
+    """Testes da detecção de consumidores de frames"""
+
+    def test_headless_show_frame_does_not_poll_gui(self):
+        config = Config()
+        config.DISPLAY_ENABLED = False
+        display_manager = DisplayManager(config)
+
+        with mock.patch("src.managers.display_manager.cv2.waitKey") as wait_key:
+            self.assertFalse(display_manager.show_frame(np.zeros((10, 10, 3), np.uint8)))
+        wait_key.assert_not_called()
+        self.assertFalse(display_manager.is_active)
+
+    def test_stream_viewers_drive_frame_updates(self):
+        config = Config()
+        config.STREAMING_ENABLED = False
+        streaming_manager = StreamingManager(config)
+        # Simula o servidor em execução sem iniciar o uvicorn
+        config.STREAMING_ENABLED = True
+        streaming_manager.is_running = True
+        streaming_manager.broadcaster.start()
+        frame = np.zeros((48, 64, 3), np.uint8)
+
+        try:
+            self.assertFalse(streaming_manager.has_viewers())
+            streaming_manager.update_frame(frame)
+            self.assertEqual(streaming_manager.broadcaster.frames_published, 0)
+
+            async def scenario():
+                client = streaming_manager.broadcaster.frames()
+                first = asyncio.ensure_future(client.__anext__())
+                while not streaming_manager.has_viewers():
+                    await asyncio.sleep(0.005)
+                # O próximo frame após a conexão já é publicado e entregue
+                streaming_manager.update_frame(frame)
+                data = await asyncio.wait_for(first, 2.0)
+                await client.aclose()
+                return data
+
+            self.assertTrue(asyncio.run(scenario()).startswith(b'\xff\xd8'))
+            self.assertEqual(streaming_manager.broadcaster.frames_published, 1)
+            self.assertFalse(streaming_manager.has_viewers())
+        finally:
+            streaming_manager.broadcaster.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
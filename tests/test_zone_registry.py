@@ -0,0 +1,175 @@
+# Testes para as zonas monitoradas e o rastreamento de atividades por zona
+
+import unittest
+import sys
+import os
+from datetime import datetime
+
+import numpy as np
+
+# Adicionar a raiz do projeto ao path para importar os módulos
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config.config import Config
+from src.core.zone_registry import ZoneRegistry
+from src.tracking.activity_tracker import ActivityTracker
+
+
+def make_config():
+    config = Config()
+    config.ZONES = {
+        0: {"nome": "Pote Racao", "zona": "food", "size": 0.02},
+        1: {"nome": "Bebedouro", "zona": "water", "size": 0.02, "enter_thresh": 0.10, "exit_thresh": 0.15},
+    }
+    config.MIN_TIME_START = 0.0
+    config.MIN_TIME_STOP = 0.0
+    config.WINDOW_SIZE = 1
+    return config
+
+
+class TestZoneRegistry(unittest.TestCase):
+    """Testes do registro de zonas"""
+
+    def test_distance_matrix(self):
+        cats = [[0.0, 0.0, 1.0], [1.0, 0.0, 1.0]]
+        zones = [[0.0, 0.0, 1.0], [0.0, 3.0, 5.0], [1.0, 0.0, 1.0]]
+
+        distances = ZoneRegistry.distance_matrix(cats, zones)
+
+        self.assertEqual(distances.shape, (2, 3))
+        np.testing.assert_allclose(distances[0], [0.0, 5.0, 1.0])
+        np.testing.assert_allclose(distances[1], [1.0, np.sqrt(26.0), 0.0])
+
+    def test_zone_thresholds_and_activity(self):
+        registry = ZoneRegistry(make_config())
+        water = registry.get(1)
+        self.assertEqual(water["atividade"], "drinking")
+        self.assertEqual(water["enter_thresh"], 0.10)
+        self.assertEqual(registry.get(0)["enter_thresh"], Config().ENTER_THRESH)
+        self.assertIsNone(registry.get(7))
+
+    def test_legacy_bowl_config(self):
+        config = Config()
+        config.ZONES = None
+        registry = ZoneRegistry(config)
+        self.assertEqual(registry.ids(), [config.POTE_RACAO_ID])
+        self.assertEqual(registry.get(config.POTE_RACAO_ID)["atividade"], "eating")
+
+    def test_unknown_zone_type_is_rejected(self):
+        config = make_config()
+        config.ZONES[2] = {"nome": "Caixa", "zona": "box"}
+        with self.assertRaises(ValueError):
+            ZoneRegistry(config)
+
+
+class TestZoneActivities(unittest.TestCase):
+    """Testes das atividades disparadas por cada zona"""
+
+    def setUp(self):
+        self.tracker = ActivityTracker(make_config())
+        self.started = []
+        self.tracker._on_activity_start = lambda cat_id, activity, timestamp=None: self.started.append((cat_id, activity))
+
+    def _posicoes(self, cat_pos):
+        return {
+            "Pote Racao": {"tipo": "zona", "zona": "food", "pos": np.array([1.0, 0.0, 1.0]), "id": 0},
+            "Bebedouro": {"tipo": "zona", "zona": "water", "pos": np.array([0.0, 0.0, 1.0]), "id": 1},
+            7: {"tipo": "gato", "pos": np.array(cat_pos), "id": 7},
+        }
+
+    def test_drinking_at_water_zone(self):
+        for _ in range(2):
+            self.tracker.update(self._posicoes([0.05, 0.0, 1.0]))
+
+        self.assertEqual(self.started, [(7, "drinking")])
+        estado = self.tracker.get_estado()[7]
+        self.assertTrue(estado["Bebedouro"].em_atividade)
+        self.assertFalse(estado["Pote Racao"].em_atividade)
+
+    def test_zone_threshold_is_respected(self):
+        # Dentro do threshold global, mas fora do threshold do bebedouro
+        for _ in range(2):
+            self.tracker.update(self._posicoes([0.5, 0.0, 1.0]))
+
+        self.assertNotIn((7, "drinking"), self.started)
+        self.assertIn((7, "eating"), self.started)
+
+
+class RecordingNotifier:
+    """Notificador que apenas registra os eventos recebidos"""
+
+    non_blocking = True
+
+    def __init__(self):
+        self.events = []
+        self.timestamps = []
+
+    def notify_activity_start(self, cat_id, activity_type, timestamp=None):
+        self.events.append(("start", cat_id, activity_type))
+        self.timestamps.append(timestamp)
+        return True
+
+    def notify_activity_end(self, cat_id, activity_type, start_time=None, end_time=None):
+        self.events.append(("end", cat_id, activity_type))
+        self.timestamps.append(end_time)
+        return True
+
+
+class TestSameTypeZones(unittest.TestCase):
+    """Testes de várias zonas com a mesma atividade (dois potes de ração)"""
+
+    def setUp(self):
+        config = make_config()
+        config.ZONES = {
+            0: {"nome": "Pote A", "zona": "food", "size": 0.02},
+            2: {"nome": "Pote B", "zona": "food", "size": 0.02},
+        }
+        config.MIN_ACTIVITY_DURATION_TO_REGISTER = 0
+        self.tracker = ActivityTracker(config)
+        self.notifier = RecordingNotifier()
+        self.tracker.set_activity_notifier(self.notifier)
+        self.now = 1000.0
+
+    def _update(self, cat_x, frames=2):
+        posicoes = {
+            "Pote A": {"tipo": "zona", "zona": "food", "pos": np.array([0.0, 0.0, 1.0]), "id": 0},
+            "Pote B": {"tipo": "zona", "zona": "food", "pos": np.array([1.2, 0.0, 1.0]), "id": 2},
+            7: {"tipo": "gato", "pos": np.array([cat_x, 0.0, 1.0]), "id": 7},
+        }
+        for _ in range(frames):
+            self.now += 1.0
+            self.tracker.update(posicoes, self.now)
+
+    def test_moving_between_bowls_is_one_activity(self):
+        # Entre os dois potes (em alcance de ambos), depois só no pote B
+        self._update(0.6)
+        self._update(1.2)
+        estado = self.tracker.get_estado()[7]
+        self.assertFalse(estado["Pote A"].em_atividade)
+        self.assertTrue(estado["Pote B"].em_atividade)
+        self.assertEqual(self.notifier.events, [("start", 7, "eating")])
+
+        # Saindo do pote B a atividade termina
+        self._update(4.0)
+        self.assertEqual(self.notifier.events, [("start", 7, "eating"), ("end", 7, "eating")])
+        self.assertEqual(self.tracker.active_activities, {})
+
+    def test_inactive_cat_ends_activity_once(self):
+        self._update(0.6)
+        self.tracker.cleanup_inactive_cats([], self.now + 60)
+        self.assertEqual(self.notifier.events, [("start", 7, "eating"), ("end", 7, "eating")])
+        self.assertEqual(self.tracker.active_activities, {})
+
+    def test_notifications_use_capture_time(self):
+        self._update(0.6)
+        start_time = self.tracker.active_activities[(7, "eating")]["start_time"]
+        self.tracker.cleanup_inactive_cats([], self.now + 60)
+        # Instantes dos frames (replay), não o relógio do sistema no momento da notificação
+        self.assertEqual(self.notifier.timestamps, [
+            datetime.fromtimestamp(start_time), datetime.fromtimestamp(self.now + 60)
+        ])
+        self.assertLess(start_time, 1010.0)
+
+
+if __name__ == '__main__':
+    unittest.main()